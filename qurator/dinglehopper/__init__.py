@@ -1,5 +1,76 @@
-from .ocr_files import *
-from .extracted_text import *
-from .character_error_rate import *
-from .word_error_rate import *
-from .align import *
+import importlib
+import importlib.util
+import sys
+import types
+
+# The public API is re-exported from these modules. To keep the startup of the
+# command line tools fast, they are only imported when one of their names is
+# accessed, see test_import_time.
+_API_MODULES = (
+    "ocr_files",
+    "extracted_text",
+    "character_error_rate",
+    "word_error_rate",
+    "align",
+    "alignment_export",
+    "confusion",
+    "api",
+    "async_api",
+    "batch",
+    "pair_cache",
+    "engines",
+)
+
+
+def _api_module_names(module):
+    """Return the names "from module import *" would import."""
+    if hasattr(module, "__all__"):
+        return module.__all__
+    return [name for name in vars(module) if not name.startswith("_")]
+
+
+def _api_names():
+    """Import the API modules, yielding each module and its API names."""
+    for module_name in _API_MODULES:
+        module = importlib.import_module("." + module_name, __name__)
+        yield module, _api_module_names(module)
+
+
+class _Package(types.ModuleType):
+    def __getattr__(self, name):
+        # For "from qurator.dinglehopper import *"
+        if name == "__all__":
+            return sorted(set(n for _, names in _api_names() for n in names))
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        # "from . import submodule" checks for the attribute before importing it
+        if name not in _API_MODULES and (
+            importlib.util.find_spec("." + name, __name__) is not None
+        ):
+            return importlib.import_module("." + name, __name__)
+
+        for module, names in _api_names():
+            if name in names:
+                value = getattr(module, name)
+                setattr(self, name, value)
+                return value
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    def __setattr__(self, name, value):
+        # Importing a submodule sets it as an attribute of the package. The
+        # functions align(), character_error_rate() and word_error_rate() shadow
+        # their modules of the same name in the API.
+        if (
+            isinstance(value, types.ModuleType)
+            and name in _API_MODULES
+            and name in _api_module_names(value)
+        ):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(self.__all__))
+
+
+sys.modules[__name__].__class__ = _Package
@@ -8,23 +8,26 @@ def align(t1, t2):
     return seq_align(s1, s2)
 
 
-def seq_align(s1, s2):
-    """Align general sequences."""
+def seq_align(s1, s2, max_memory=None):
+    """Align general sequences.
+
+    With max_memory, the alignment takes at most max_memory bytes, see
+    seq_editops().
+    """
     s1 = list(s1)
     s2 = list(s2)
-    ops = seq_editops(s1, s2)
+    ops = seq_editops(s1, s2, max_memory)
+    k = 0  # Index of the next edit operation
     i = 0
     j = 0
 
     while i < len(s1) or j < len(s2):
         o = None
-        try:
-            ot = ops[0]
+        if k < len(ops):
+            ot = ops[k]
             if ot[1] == i and ot[2] == j:
-                ops = ops[1:]
+                k += 1
                 o = ot
-        except IndexError:
-            pass
 
         if o:
             if o[0] == "insert":
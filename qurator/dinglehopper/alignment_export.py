@@ -0,0 +1,167 @@
+import numpy as np
+from uniseg.graphemecluster import grapheme_clusters
+
+from .align import seq_align
+from .extracted_text import ExtractedText
+from .word_error_rate import words_normalized
+
+# Codes of the alignment operations in the "op" column
+OP_EQUAL = 0
+OP_REPLACE = 1
+OP_INSERT = 2
+OP_DELETE = 3
+
+# Codes of the alignment levels in the "level" column
+LEVEL_CHARACTER = 0
+LEVEL_WORD = 1
+
+ALIGNMENT_EXPORT_FORMATS = ("npz", "arrow", "parquet")
+
+
+def _alignment_columns(gt_things, ocr_things, max_memory=None):
+    """Return the op, gt_pos and ocr_pos columns of the alignment of two sequences.
+
+    Positions are indices into the given sequences, -1 if the element is missing.
+    """
+    ops = []
+    gt_pos = []
+    ocr_pos = []
+    i = 0
+    j = 0
+    for g, o in seq_align(gt_things, ocr_things, max_memory):
+        if g is None:
+            ops.append(OP_INSERT)
+        elif o is None:
+            ops.append(OP_DELETE)
+        elif g != o:
+            ops.append(OP_REPLACE)
+        else:
+            ops.append(OP_EQUAL)
+        gt_pos.append(i if g is not None else -1)
+        ocr_pos.append(j if o is not None else -1)
+        if g is not None:
+            i += 1
+        if o is not None:
+            j += 1
+    return (
+        np.array(ops, dtype=np.uint8),
+        np.array(gt_pos, dtype=np.int32),
+        np.array(ocr_pos, dtype=np.int32),
+    )
+
+
+def _segment_column(text: ExtractedText, things, pos, segment_index):
+    """Return the segment id indices for the given grapheme positions.
+
+    Segment ids are interned in segment_index, -1 means no segment.
+    """
+    # Character offset of each grapheme cluster
+    offsets = np.zeros(len(things) + 1, dtype=np.int64)
+    np.cumsum([len(t) for t in things], out=offsets[1:])
+
+    segments = np.full(len(pos), -1, dtype=np.int32)
+    for k in np.flatnonzero(pos >= 0):
+        segment_id = text.segment_id_for_pos(int(offsets[pos[k]]))
+        if segment_id is not None:
+            segments[k] = segment_index.setdefault(segment_id, len(segment_index))
+    return segments
+
+
+def alignment_arrays(gt_text: ExtractedText, ocr_text: ExtractedText, max_memory=None):
+    """Compute the character and word alignment of GT and OCR as columnar arrays.
+
+    Returns a dict of NumPy arrays, with one row per aligned element:
+
+    * level: LEVEL_CHARACTER or LEVEL_WORD (uint8)
+    * op: OP_EQUAL, OP_REPLACE, OP_INSERT or OP_DELETE (uint8)
+    * gt_pos, ocr_pos: index of the grapheme cluster or word, -1 if missing (int32)
+    * gt_segment, ocr_segment: index into segment_ids, -1 if missing (int32)
+
+    and segment_ids, the table of segment ids. Segment ids are only available for
+    characters.
+
+    With max_memory, the alignments use at most max_memory bytes, see seq_align().
+    """
+    gt_things = list(grapheme_clusters(gt_text.text))
+    ocr_things = list(grapheme_clusters(ocr_text.text))
+    c_op, c_gt_pos, c_ocr_pos = _alignment_columns(gt_things, ocr_things, max_memory)
+
+    segment_index = {}
+    c_gt_segment = _segment_column(gt_text, gt_things, c_gt_pos, segment_index)
+    c_ocr_segment = _segment_column(ocr_text, ocr_things, c_ocr_pos, segment_index)
+
+    w_op, w_gt_pos, w_ocr_pos = _alignment_columns(
+        list(words_normalized(gt_text)), list(words_normalized(ocr_text)), max_memory
+    )
+    w_segment = np.full(len(w_op), -1, dtype=np.int32)
+
+    return {
+        "level": np.concatenate(
+            [
+                np.full(len(c_op), LEVEL_CHARACTER, dtype=np.uint8),
+                np.full(len(w_op), LEVEL_WORD, dtype=np.uint8),
+            ]
+        ),
+        "op": np.concatenate([c_op, w_op]),
+        "gt_pos": np.concatenate([c_gt_pos, w_gt_pos]),
+        "ocr_pos": np.concatenate([c_ocr_pos, w_ocr_pos]),
+        "gt_segment": np.concatenate([c_gt_segment, w_segment]),
+        "ocr_segment": np.concatenate([c_ocr_segment, w_segment]),
+        "segment_ids": np.array(list(segment_index), dtype=np.str_),
+    }
+
+
+def write_alignment(arrays, filename, format="npz"):
+    """Write the alignment arrays (see alignment_arrays()) to a file.
+
+    Supported formats are "npz" (uncompressed NumPy archive) and, if pyarrow is
+    installed, "arrow" (Arrow IPC file, which can be memory-mapped) and "parquet".
+    In the Arrow formats, the segment columns are dictionary-encoded segment ids.
+    """
+    if format == "npz":
+        with open(filename, "wb") as f:
+            np.savez(f, **arrays)
+        return
+
+    if format not in ALIGNMENT_EXPORT_FORMATS:
+        raise ValueError('Unknown alignment export format "{}"'.format(format))
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise RuntimeError(
+            'Alignment export format "{}" needs pyarrow'.format(format)
+        ) from None
+
+    segment_ids = pa.array(arrays["segment_ids"], type=pa.string())
+
+    def segment_array(indices):
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, mask=indices < 0), segment_ids
+        )
+
+    table = pa.table(
+        {
+            "level": arrays["level"],
+            "op": arrays["op"],
+            "gt_pos": arrays["gt_pos"],
+            "ocr_pos": arrays["ocr_pos"],
+            "gt_segment": segment_array(arrays["gt_segment"]),
+            "ocr_segment": segment_array(arrays["ocr_segment"]),
+        }
+    )
+    if format == "arrow":
+        with pa.OSFile(filename, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, filename)
+
+
+def export_alignment(gt_text, ocr_text, filename, format="npz", max_memory=None):
+    """Align GT and OCR and write the alignment to a file.
+
+    See alignment_arrays() and write_alignment() for details.
+    """
+    write_alignment(alignment_arrays(gt_text, ocr_text, max_memory), filename, format)
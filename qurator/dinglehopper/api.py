@@ -0,0 +1,149 @@
+from typing import List, Optional, Tuple
+
+import attr
+from lxml import etree as ET
+
+from .character_error_rate import character_error_rate_n
+from .cli import diff_alignment, gen_diff_reports, template_environment
+from .confusion import character_confusion, confusion_to_json
+from .edit_distance import levenshtein_matrix_cache_clear
+from .extracted_text import ExtractedText
+from .ocr_files import extract_string, extract_tree
+from .word_error_rate import word_error_rate_n, words_normalized
+
+__all__ = ["EvaluationResult", "evaluate", "load_document"]
+
+REPORT_FORMATS = ("html", "json")
+
+
+@attr.s(frozen=True)
+class EvaluationResult:
+    """
+    The result of evaluate().
+
+    The alignments are lists of (gt, ocr) pairs of grapheme clusters or words,
+    None standing for an insertion or deletion. The confusion is the character
+    confusion as in the JSON report, i.e. a list of [gt, ocr, count]. The
+    rendered reports map the format ("html" or "json") to the UTF-8 encoded
+    report.
+    """
+
+    cer = attr.ib(type=float)
+    wer = attr.ib(type=float)
+    n_characters = attr.ib(type=int)
+    n_words = attr.ib(type=int)
+    gt_text = attr.ib(type=ExtractedText, repr=False)
+    ocr_text = attr.ib(type=ExtractedText, repr=False)
+    character_alignment = attr.ib(type=Optional[List[Tuple]], default=None, repr=False)
+    word_alignment = attr.ib(type=Optional[List[Tuple]], default=None, repr=False)
+    confusion = attr.ib(type=Optional[list], default=None, repr=False)
+    reports = attr.ib(factory=dict, repr=False)
+
+
+def load_document(document, *, textequiv_level="region"):
+    """Extract the text from a document in memory.
+
+    The document may be the contents of a PAGE, ALTO or plain text file as str or
+    bytes, a parsed PAGE or ALTO document as lxml ElementTree or root element, or
+    an ExtractedText, which is returned as is.
+    """
+    if isinstance(document, ExtractedText):
+        return document
+    if isinstance(document, (str, bytes)):
+        return extract_string(document, textequiv_level=textequiv_level)
+    if isinstance(document, ET._Element):
+        document = ET.ElementTree(document)
+    if isinstance(document, ET._ElementTree):
+        return extract_tree(document, textequiv_level=textequiv_level)
+    raise TypeError("Cannot extract text from {}".format(type(document).__name__))
+
+
+def evaluate(
+    gt,
+    ocr,
+    *,
+    textequiv_level="region",
+    metrics_only=False,
+    reports=(),
+    metrics=True,
+    diff_context=None,
+    lazy_html=False,
+    gt_name="gt",
+    ocr_name="ocr"
+):
+    """Check OCR result against GT, in memory.
+
+    This is the in-memory counterpart of cli.process(): GT and OCR are documents
+    as accepted by load_document() and nothing is read from or written to disk.
+
+    With metrics_only, only the error rates are computed, skipping the
+    alignments and the character confusion. The reports to render are given as
+    formats in reports, e.g. ("html", "json"); the options metrics, diff_context
+    and lazy_html are those of process(), gt_name and ocr_name are shown in the
+    reports instead of the file names.
+    """
+    reports = tuple(reports)
+    unknown = sorted(set(reports) - set(REPORT_FORMATS))
+    if unknown:
+        raise ValueError("Unknown report formats: {}".format(", ".join(unknown)))
+    if metrics_only and "html" in reports:
+        raise ValueError("The HTML report needs the alignment, not metrics_only")
+
+    gt_text = load_document(gt, textequiv_level=textequiv_level)
+    ocr_text = load_document(ocr, textequiv_level=textequiv_level)
+
+    cer, n_characters = character_error_rate_n(gt_text, ocr_text)
+    wer, n_words = word_error_rate_n(gt_text, ocr_text)
+
+    character_alignment = None
+    word_alignment = None
+    confusion = None
+    if metrics_only:
+        # Nothing will use the cached matrices for an alignment
+        levenshtein_matrix_cache_clear()
+    else:
+        character_alignment = diff_alignment(gt_text, ocr_text)
+        word_alignment = diff_alignment(
+            list(words_normalized(gt_text)), list(words_normalized(ocr_text))
+        )
+        confusion = confusion_to_json(character_confusion(gt_text, ocr_text))
+
+    rendered = {}
+    if reports:
+        char_diff_report = None
+        word_diff_report = None
+        if "html" in reports:
+            char_diff_report, word_diff_report = gen_diff_reports(
+                gt_text, ocr_text, diff_context=diff_context, lazy_html=lazy_html
+            )
+        env = template_environment()
+        for report_format in reports:
+            template = env.get_template("report." + report_format + ".j2")
+            rendered[report_format] = "".join(
+                template.generate(
+                    gt=gt_name,
+                    ocr=ocr_name,
+                    cer=cer,
+                    n_characters=n_characters,
+                    wer=wer,
+                    n_words=n_words,
+                    confusion=confusion,
+                    char_diff_report=char_diff_report,
+                    word_diff_report=word_diff_report,
+                    metrics=metrics,
+                    profile=None,
+                )
+            ).encode("utf-8")
+
+    return EvaluationResult(
+        cer=cer,
+        wer=wer,
+        n_characters=n_characters,
+        n_words=n_words,
+        gt_text=gt_text,
+        ocr_text=ocr_text,
+        character_alignment=character_alignment,
+        word_alignment=word_alignment,
+        confusion=confusion,
+        reports=rendered,
+    )
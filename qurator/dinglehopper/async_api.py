@@ -0,0 +1,164 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from lxml import etree as ET
+
+from .api import evaluate
+
+__all__ = ["AsyncEvaluator"]
+
+
+class AsyncEvaluator:
+    """Evaluate documents from asyncio code without blocking the event loop.
+
+    The evaluations (extraction, distances, alignment and reports, see
+    api.evaluate()) run on an executor, by default a pool of max_workers threads
+    or, with processes=True, processes. As the evaluation is CPU-bound, only a
+    process pool evaluates pages in parallel; a thread pool just keeps the event
+    loop responsive. An existing executor may be given instead, it is not shut
+    down by close() then.
+
+    For backpressure, at most max_pending evaluations (default: max_workers) are
+    submitted to the executor at a time, further evaluate() calls wait for a
+    free slot. Cancelling an evaluate() call that waits for a slot or whose job
+    did not start yet cancels the job. Jobs already running can not be
+    interrupted, they still occupy their slot until they are done.
+
+    Use it as an asynchronous context manager or call close() when done:
+
+        async with AsyncEvaluator(max_workers=4, processes=True) as evaluator:
+            result = await evaluator.evaluate(gt, ocr)
+            async for i, result in evaluator.evaluate_many(pairs):
+                ...
+    """
+
+    def __init__(
+        self, *, max_workers=None, processes=False, executor=None, max_pending=None
+    ):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if executor is None:
+            if processes:
+                executor = ProcessPoolExecutor(max_workers)
+            else:
+                executor = ThreadPoolExecutor(max_workers)
+            self._owns_executor = True
+        else:
+            self._owns_executor = False
+        self.executor = executor
+        self.max_pending = max_pending or max_workers
+        # The semaphore is bound to the event loop, so it is created on first use
+        self._semaphore = None
+
+    def _slots(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        return self._semaphore
+
+    async def evaluate(self, gt, ocr, **options):
+        """Evaluate OCR against GT, see api.evaluate() for the arguments."""
+        if isinstance(self.executor, ProcessPoolExecutor):
+            # Parsed documents can not be sent to another process
+            gt = _picklable_document(gt)
+            ocr = _picklable_document(ocr)
+
+        loop = asyncio.get_event_loop()
+        slots = self._slots()
+        await slots.acquire()
+        try:
+            job = self.executor.submit(functools.partial(evaluate, gt, ocr, **options))
+        except BaseException:
+            slots.release()
+            raise
+        # Free the slot when the job is done, even if the caller stopped waiting
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(slots.release))
+        return await asyncio.wrap_future(job)
+
+    def evaluate_many(self, pairs, *, return_exceptions=False, **options):
+        """Evaluate (gt, ocr) pairs, returning the results as they complete.
+
+        Returns an asynchronous iterator of (index, result) tuples, index being
+        the position of the pair in pairs. Pairs are only taken from pairs when
+        there is a free slot, so pairs may be a (lazy) iterator of any length.
+        With return_exceptions, failed evaluations yield (index, exception)
+        instead of raising the exception. If an evaluation fails, the pending
+        ones are cancelled; when leaving the iteration early, call its aclose()
+        to cancel them.
+        """
+        return _ResultStream(self, pairs, return_exceptions, options)
+
+    def close(self):
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _ResultStream:
+    """Asynchronous iterator of the results of AsyncEvaluator.evaluate_many()."""
+
+    def __init__(self, evaluator, pairs, return_exceptions, options):
+        self.evaluator = evaluator
+        self.pairs = enumerate(pairs)
+        self.return_exceptions = return_exceptions
+        self.options = options
+        self.pending = set()
+        self.done = []
+        self.exhausted = False
+
+    def _fill(self):
+        while not self.exhausted and len(self.pending) < self.evaluator.max_pending:
+            try:
+                index, (gt, ocr) = next(self.pairs)
+            except StopIteration:
+                self.exhausted = True
+                break
+            self.pending.add(asyncio.ensure_future(self._evaluate(index, gt, ocr)))
+
+    async def _evaluate(self, index, gt, ocr):
+        try:
+            return index, await self.evaluator.evaluate(gt, ocr, **self.options)
+        except Exception as e:
+            if not self.return_exceptions:
+                raise
+            return index, e
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            while not self.done:
+                self._fill()
+                if not self.pending:
+                    raise StopAsyncIteration
+                done, self.pending = await asyncio.wait(
+                    self.pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                self.done.extend(done)
+            return self.done.pop().result()
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        """Cancel the pending evaluations."""
+        for task in self.pending:
+            task.cancel()
+        if self.pending:
+            await asyncio.wait(self.pending)
+        self.pending = set()
+        self.done = []
+        self.exhausted = True
+
+
+def _picklable_document(document):
+    if isinstance(document, (ET._Element, ET._ElementTree)):
+        return ET.tostring(document)
+    return document
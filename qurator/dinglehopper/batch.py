@@ -0,0 +1,123 @@
+import unicodedata
+from multiprocessing import Pool
+
+import numpy as np
+from uniseg.graphemecluster import grapheme_clusters
+
+from . import instrumentation
+from .engines import engine_name, get_engine
+from .extracted_text import ExtractedText
+from .word_error_rate import words_normalized
+
+__all__ = ["batch_distance"]
+
+UNITS = ("grapheme", "word")
+
+
+def batch_distance(
+    pairs,
+    *,
+    unit="grapheme",
+    processes=None,
+    chunk_size=1000,
+    cache=None,
+    engine=None,
+):
+    """Compute the Levenshtein distances of many (reference, compared) pairs.
+
+    The texts (str or ExtractedText) are split into grapheme clusters (after NFC
+    normalization, as distance() does) or, with unit="word", into words (as
+    word_error_rate_n() does). Each distinct text is split only once, each
+    distinct pair is computed only once and all symbols are interned as
+    integers, so the distances are computed in a tight loop without the overhead
+    of calling distance() for each pair. With processes, the pairs are
+    distributed over that many worker processes in chunks of chunk_size pairs.
+
+    With a PairCache (see pair_cache) as cache, the results of pairs seen before,
+    e.g. in other documents, are taken from the cache.
+
+    The distances are computed by the given edit distance engine or by default,
+    the selected or fastest one, see engines.
+
+    Returns two NumPy arrays: the distances and the lengths of the references.
+    The error rates are distances / lengths, except that they are 0 for a
+    distance of 0 and inf for an empty reference with a distance > 0.
+    """
+    if unit not in UNITS:
+        raise ValueError(
+            'Unknown unit "{}", must be one of {}'.format(unit, ", ".join(UNITS))
+        )
+    split = _split_graphemes if unit == "grapheme" else _split_words
+    # Resolved here, so the worker processes use the same engine
+    engine = engine_name(engine)
+    kind = "distance_" + unit
+
+    # The indices of each distinct pair to compute
+    todo = {}
+    distances = []
+    lengths = []
+    for k, (reference, compared) in enumerate(pairs):
+        if isinstance(reference, ExtractedText):
+            reference = reference.text
+        if isinstance(compared, ExtractedText):
+            compared = compared.text
+        result = None
+        if cache is not None and (reference, compared) not in todo:
+            result = cache.get(kind, reference, compared)
+        if result is None:
+            todo.setdefault((reference, compared), []).append(k)
+            result = 0, 0
+        distances.append(result[0])
+        lengths.append(result[1])
+    distances = np.array(distances, np.int64).reshape(len(distances))
+    lengths = np.array(lengths, np.int64).reshape(len(lengths))
+
+    sequences = {}
+    symbols = {}
+
+    def intern(text):
+        try:
+            return sequences[text]
+        except KeyError:
+            sequence = tuple(symbols.setdefault(s, len(symbols)) for s in split(text))
+            sequences[text] = sequence
+            return sequence
+
+    interned = [(intern(reference), intern(compared)) for reference, compared in todo]
+    if processes and len(interned) > chunk_size:
+        chunks = [
+            interned[k : k + chunk_size] for k in range(0, len(interned), chunk_size)
+        ]
+        with Pool(processes) as pool:
+            computed = [
+                d
+                for chunk in pool.starmap(
+                    _distances, [(chunk, engine) for chunk in chunks]
+                )
+                for d in chunk
+            ]
+    else:
+        computed = _distances(interned, engine)
+
+    for (pair, indices), (reference, _), d in zip(todo.items(), interned, computed):
+        distances[indices] = d
+        lengths[indices] = len(reference)
+        if cache is not None:
+            cache.put(kind, pair[0], pair[1], [d, len(reference)])
+
+    if instrumentation.enabled():
+        instrumentation.count("dp_cells", sum(len(r) * len(c) for r, c in interned))
+    return distances, lengths
+
+
+def _split_graphemes(text):
+    return grapheme_clusters(unicodedata.normalize("NFC", text))
+
+
+def _split_words(text):
+    return words_normalized(text)
+
+
+def _distances(pairs, engine):
+    distance = get_engine(engine)
+    return [distance(a, b) for a, b in pairs]
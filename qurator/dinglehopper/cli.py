@@ -1,21 +1,63 @@
+import json
 import os
+import re
+from functools import lru_cache
 
 import click
-from jinja2 import Environment, FileSystemLoader
-from markupsafe import escape
 from uniseg.graphemecluster import grapheme_clusters
 
 from .character_error_rate import character_error_rate_n
+from .confusion import alignment_confusion, character_confusion, confusion_to_json
 from .word_error_rate import word_error_rate_n, words_normalized
+from . import instrumentation
 from .align import seq_align
+from .alignment_export import ALIGNMENT_EXPORT_FORMATS, export_alignment
+from .edit_distance import alignment_algorithm, levenshtein_matrix_cache_clear
+from .engines import available_engines, set_engine
 from .extracted_text import ExtractedText
+from .incremental import (
+    LEVELS,
+    LineCache,
+    alignment_error_rate_n,
+    incremental_alignments,
+)
 from .ocr_files import extract
-from .config import Config
+from .pair_cache import SharedPairCache
+from .parallel import parallel_alignments
+from .profiling import Profile
+from .progress import Progress
+
+
+def diff_alignment(gt_in, ocr_in):
+    """Align GT and OCR (ExtractedTexts or sequences) for the diff reports."""
+    if isinstance(gt_in, ExtractedText):
+        if not isinstance(ocr_in, ExtractedText):
+            raise TypeError()
+        # XXX splitting should be done in ExtractedText
+        gt_things = list(grapheme_clusters(gt_in.text))
+        ocr_things = list(grapheme_clusters(ocr_in.text))
+    else:
+        gt_things = gt_in
+        ocr_things = ocr_in
+
+    return list(seq_align(gt_things, ocr_things))
+
 
+def gen_diff_report(
+    gt_in, ocr_in, css_prefix, joiner, none, context=None, alignment=None
+):
+    """Generate the HTML diff report for the given GT and OCR.
 
-def gen_diff_report(gt_in, ocr_in, css_prefix, joiner, none):
-    gtx = ""
-    ocrx = ""
+    The alignment is computed right away, but the HTML is returned as a generator of
+    string chunks, so that the (potentially huge) report can be streamed to the output
+    file by Jinja's template.stream() without building it in memory.
+
+    If context is given, only the differences and context elements (e.g. graphemes or
+    words) around them are rendered, longer equal runs are collapsed into a marker.
+
+    A precomputed alignment of GT and OCR may be given as alignment.
+    """
+    from markupsafe import escape
 
     def format_thing(t, css_classes=None, id_=None):
         if t is None:
@@ -24,99 +66,278 @@ def gen_diff_report(gt_in, ocr_in, css_prefix, joiner, none):
         elif t == "\n":
             html_t = "<br>"
         else:
-            html_t = escape(t)
+            html_t = str(escape(t))
 
         html_custom_attrs = ""
 
         # Set Bootstrap tooltip to the segment id
         if id_:
-            html_custom_attrs += 'data-toggle="tooltip" title="{}"'.format(id_)
+            html_custom_attrs += 'data-toggle="tooltip" title="' + id_ + '"'
 
         if css_classes:
-            return '<span class="{css_classes}" {html_custom_attrs}>{html_t}</span>'.format(
-                css_classes=css_classes,
-                html_t=html_t,
-                html_custom_attrs=html_custom_attrs,
+            return (
+                '<span class="'
+                + css_classes
+                + '" '
+                + html_custom_attrs
+                + ">"
+                + html_t
+                + "</span>"
             )
         else:
-            return "{html_t}".format(html_t=html_t)
+            return html_t
+
+    if alignment is None:
+        alignment = diff_alignment(gt_in, ocr_in)
+    collapsed = collapsed_runs(alignment, context) if context is not None else {}
+
+    def column(side):
+        """Generate the HTML of one side (0 = GT, 1 = OCR) of the alignment"""
+        text_in = (gt_in, ocr_in)[side]
+        pos = 0
+        k = 0
+        while k < len(alignment):
+            if k in collapsed:
+                stop = collapsed[k]
+                for pair in alignment[k:stop]:
+                    pos += len(pair[side])
+                yield '<span class="ellipsis collapsed">[… {} …]</span>'.format(
+                    stop - k
+                )
+                k = stop
+                continue
+
+            pair = alignment[k]
+            t = pair[side]
+            css_classes = None
+            id_ = None
+            if pair[0] != pair[1]:
+                css_classes = css_prefix + "diff" + str(k) + " diff"
+                if isinstance(text_in, ExtractedText) and t is not None:
+                    id_ = text_in.segment_id_for_pos(pos)
+                    # Deletions and inserts only produce one id + None, UI must
+                    # support this, i.e. display for the one id produced
+
+            yield joiner + format_thing(t, css_classes, id_)
+
+            if t is not None:
+                pos += len(t)
+            k += 1
+
+    def chunks():
+        yield """
+        <div class="row">
+           <div class="col-md-6 gt">"""
+        yield from column(0)
+        yield """</div>
+           <div class="col-md-6 ocr">"""
+        yield from column(1)
+        yield """</div>
+        </div>
+        """
+
+    return chunks()
 
-    if isinstance(gt_in, ExtractedText):
-        if not isinstance(ocr_in, ExtractedText):
-            raise TypeError()
-        # XXX splitting should be done in ExtractedText
-        gt_things = list(grapheme_clusters(gt_in.text))
-        ocr_things = list(grapheme_clusters(ocr_in.text))
-    else:
-        gt_things = gt_in
-        ocr_things = ocr_in
 
-    g_pos = 0
-    o_pos = 0
-    for k, (g, o) in enumerate(seq_align(gt_things, ocr_things)):
-        css_classes = None
-        gt_id = None
-        ocr_id = None
+def collapsed_runs(alignment, context):
+    """Find the runs of equal elements in the alignment that are to be collapsed.
+
+    Equal elements that are more than context elements away from any difference are
+    collapsed. Returns a dict mapping the start index of each collapsed run to its
+    stop index.
+    """
+    runs = {}
+    start = 0
+    for k, (g, o) in enumerate(alignment + [(None, False)]):
         if g != o:
-            css_classes = "{css_prefix}diff{k} diff".format(css_prefix=css_prefix, k=k)
+            # Keep context after the previous difference and before this one
+            run_start = start + context if start > 0 else start
+            run_stop = k - context if k < len(alignment) else k
+            if run_stop > run_start:
+                runs[run_start] = run_stop
+            start = k + 1
+    return runs
+
+
+def gen_diff_data(
+    gt_in, ocr_in, css_prefix, joiner, none, context=None, alignment=None
+):
+    """Generate the data-driven HTML diff report for the given GT and OCR.
+
+    Instead of one HTML element per grapheme/word, this embeds the alignment as a
+    compact JSON array that is rendered lazily by report.html.js, chunk by chunk as
+    it becomes visible. The array contains:
+
+    * strings for runs of equal elements (joined by the joiner),
+    * [gt, ocr, gt_id, ocr_id] lists for differences, None meaning a gap or no id,
+    * numbers for collapsed runs of equal elements (see context in gen_diff_report).
+
+    Like gen_diff_report(), this computes the alignment right away and returns a
+    generator of string chunks.
+    """
+    from markupsafe import escape
+
+    def to_json(value):
+        # Escape "<" so that the data cannot end the surrounding <script> element
+        return json.dumps(value, ensure_ascii=False).replace("<", "\\u003c")
+
+    if alignment is None:
+        alignment = diff_alignment(gt_in, ocr_in)
+    collapsed = collapsed_runs(alignment, context) if context is not None else {}
+
+    def items():
+        """Generate the JSON items of the alignment data"""
+        g_pos = 0
+        o_pos = 0
+        run = []
+        k = 0
+        while k < len(alignment):
+            g, o = alignment[k]
+            if g == o and k not in collapsed:
+                run.append(g)
+                g_pos += len(g)
+                o_pos += len(o)
+                k += 1
+                continue
+
+            if run:
+                yield to_json(joiner.join(run))
+                run = []
+
+            if k in collapsed:
+                stop = collapsed[k]
+                for g, o in alignment[k:stop]:
+                    g_pos += len(g)
+                    o_pos += len(o)
+                yield to_json(stop - k)
+                k = stop
+                continue
+
+            gt_id = None
+            ocr_id = None
             if isinstance(gt_in, ExtractedText):
                 gt_id = gt_in.segment_id_for_pos(g_pos) if g is not None else None
                 ocr_id = ocr_in.segment_id_for_pos(o_pos) if o is not None else None
-                # Deletions and inserts only produce one id + None, UI must
-                # support this, i.e. display for the one id produced
-
-        gtx += joiner + format_thing(g, css_classes, gt_id)
-        ocrx += joiner + format_thing(o, css_classes, ocr_id)
-
-        if g is not None:
-            g_pos += len(g)
-        if o is not None:
-            o_pos += len(o)
+            yield to_json([g, o, gt_id, ocr_id])
 
-    return """
-        <div class="row">
-           <div class="col-md-6 gt">{}</div>
-           <div class="col-md-6 ocr">{}</div>
-        </div>
-        """.format(
-        gtx, ocrx
-    )
+            if g is not None:
+                g_pos += len(g)
+            if o is not None:
+                o_pos += len(o)
+            k += 1
 
+        if run:
+            yield to_json(joiner.join(run))
 
-def process(gt, ocr, report_prefix, *, metrics=True, textequiv_level="region"):
-    """Check OCR result against GT.
+    def chunks():
+        yield (
+            '\n<div class="diff-data" data-css-prefix="{}" data-joiner="{}"'
+            ' data-none="{}"><script type="application/json">['
+        ).format(escape(css_prefix), escape(joiner), escape(none))
+        for i, item in enumerate(items()):
+            yield item if i == 0 else "," + item
+        yield "]</script></div>\n"
 
-    The @click decorators change the signature of the decorated functions, so we keep this undecorated version and use
-    Click on a wrapper.
-    """
+    return chunks()
 
-    gt_text = extract(gt, textequiv_level=textequiv_level)
-    ocr_text = extract(ocr, textequiv_level=textequiv_level)
 
-    cer, n_characters = character_error_rate_n(gt_text, ocr_text)
-    wer, n_words = word_error_rate_n(gt_text, ocr_text)
+def gen_diff_reports(
+    gt_text, ocr_text, *, diff_context=None, lazy_html=False, alignments=None
+):
+    """Generate the character and the word diff report for the HTML report.
 
-    char_diff_report = gen_diff_report(
-        gt_text, ocr_text, css_prefix="c", joiner="", none="·"
+    The character and word alignment may be given precomputed as alignments.
+    """
+    if alignments is None:
+        alignments = None, None
+    if lazy_html:
+        _gen_diff_report = gen_diff_data
+    else:
+        _gen_diff_report = gen_diff_report
+
+    char_diff_report = _gen_diff_report(
+        gt_text,
+        ocr_text,
+        css_prefix="c",
+        joiner="",
+        none="·",
+        context=diff_context,
+        alignment=alignments[0],
     )
 
     gt_words = words_normalized(gt_text)
     ocr_words = words_normalized(ocr_text)
-    word_diff_report = gen_diff_report(
-        gt_words, ocr_words, css_prefix="w", joiner=" ", none="⋯"
+    word_diff_report = _gen_diff_report(
+        gt_words,
+        ocr_words,
+        css_prefix="w",
+        joiner=" ",
+        none="⋯",
+        context=diff_context,
+        alignment=alignments[1],
     )
 
-    def json_float(value):
-        """Convert a float value to an JSON float.
+    return char_diff_report, word_diff_report
+
+
+# Binary units of parse_size()
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(size):
+    """Parse a size in bytes, like "512M" or "2G" (binary units)."""
+    match = re.fullmatch(r"\s*(\d+)\s*([KMGT]?)(?:i?B)?\s*", size, re.IGNORECASE)
+    if not match:
+        raise ValueError('Invalid size "{}", use e.g. 512M or 2G'.format(size))
+    return int(match.group(1)) * SIZE_UNITS[match.group(2).upper()]
+
+
+def _size_callback(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        return parse_size(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def bounded_alignments(gt_text, ocr_text, max_memory):
+    """Return the character and word alignment, each using at most max_memory bytes.
+
+    Also returns the algorithm used for each alignment, see alignment_algorithm().
+    """
+    algorithms = {}
+    alignments = []
+    for level in ("characters", "words"):
+        split = LEVELS[level]
+        gt_seq = list(split(gt_text.text))
+        ocr_seq = list(split(ocr_text.text))
+        algorithms[level] = alignment_algorithm(gt_seq, ocr_seq, max_memory)
+        alignments.append(list(seq_align(gt_seq, ocr_seq, max_memory)))
+    return algorithms, tuple(alignments)
 
-        This is here so that float('inf') yields "Infinity", not "inf".
-        """
-        if value == float("inf"):
-            return "Infinity"
-        elif value == float("-inf"):
-            return "-Infinity"
-        else:
-            return str(value)
+
+def json_float(value):
+    """Convert a float value to an JSON float.
+
+    This is here so that float('inf') yields "Infinity", not "inf".
+    """
+    if value == float("inf"):
+        return "Infinity"
+    elif value == float("-inf"):
+        return "-Infinity"
+    else:
+        return str(value)
+
+
+@lru_cache(maxsize=None)
+def template_environment():
+    """Return the Jinja environment for the reports.
+
+    The environment is created once, so that compiled templates are reused by
+    later calls of process(), e.g. in the evaluation server.
+    """
+    from jinja2 import Environment, FileSystemLoader
 
     env = Environment(
         loader=FileSystemLoader(
@@ -124,23 +345,178 @@ def process(gt, ocr, report_prefix, *, metrics=True, textequiv_level="region"):
         )
     )
     env.filters["json_float"] = json_float
+    return env
+
+
+def process(
+    gt,
+    ocr,
+    report_prefix,
+    *,
+    metrics=True,
+    textequiv_level="region",
+    diff_context=None,
+    lazy_html=False,
+    metrics_only=False,
+    export_alignment_format=None,
+    profile=False,
+    incremental=False,
+    pair_cache=None,
+    processes=None,
+    max_memory=None,
+):
+    """Check OCR result against GT.
+
+    The @click decorators change the signature of the decorated functions, so we keep this undecorated version and use
+    Click on a wrapper.
+
+    With metrics_only, only the distances are computed and only the JSON report is
+    written, skipping the alignment and the HTML report.
+
+    With export_alignment_format ("npz", "arrow" or "parquet"), the alignment is also
+    written to $REPORT_PREFIX.alignment.$FORMAT, see alignment_export.
 
-    for report_suffix in (".html", ".json"):
-        template_fn = "report" + report_suffix + ".j2"
-        out_fn = report_prefix + report_suffix
+    With profile, the wall time, CPU time and peak memory of each stage, the
+    sequence lengths and the number of DP matrix cells computed are written to the
+    JSON report, see profiling.Profile.
 
-        template = env.get_template(template_fn)
-        template.stream(
-            gt=gt,
-            ocr=ocr,
-            cer=cer,
-            n_characters=n_characters,
-            wer=wer,
-            n_words=n_words,
-            char_diff_report=char_diff_report,
-            word_diff_report=word_diff_report,
-            metrics=metrics,
-        ).dump(out_fn)
+    With incremental, the line alignments are cached in
+    $REPORT_PREFIX.incremental.json and only the changed lines are aligned again in
+    the next run, see incremental.LineCache.
+
+    With a PairCache as pair_cache, the page alignment is assembled from line
+    alignments like with incremental, and the line alignments are shared with other
+    documents using the cache, see pair_cache.
+
+    With processes, the comparison is split into blocks at unique words and the
+    blocks are aligned in that many worker processes, see parallel.
+
+    With max_memory (in bytes), the alignments use at most max_memory bytes each,
+    choosing the alignment algorithm by the lengths of GT and OCR, see
+    alignment_algorithm(). This also applies to the alignments of lines or blocks
+    with incremental, pair_cache or processes. Otherwise, the algorithms used are
+    written to the JSON report.
+    """
+
+    with Profile(enabled=profile) as prof:
+        with prof.stage("extract"):
+            gt_text = extract(gt, textequiv_level=textequiv_level)
+            ocr_text = extract(ocr, textequiv_level=textequiv_level)
+
+        alignments = None
+        alignment_algorithms = None
+        if incremental or pair_cache is not None:
+            cache_fn = report_prefix + ".incremental.json"
+            with prof.stage("incremental"):
+                if incremental:
+                    cache = LineCache.load(cache_fn, pair_cache)
+                else:
+                    cache = LineCache(pair_cache=pair_cache)
+                alignments = incremental_alignments(
+                    gt_text, ocr_text, cache, max_memory
+                )
+                if incremental:
+                    cache.save(cache_fn)
+            cer, n_characters = alignment_error_rate_n(alignments[0])
+            wer, n_words = alignment_error_rate_n(alignments[1])
+        elif processes:
+            with prof.stage("parallel"):
+                alignments = parallel_alignments(
+                    gt_text, ocr_text, processes, max_memory
+                )
+            cer, n_characters = alignment_error_rate_n(alignments[0])
+            wer, n_words = alignment_error_rate_n(alignments[1])
+        elif max_memory is not None and not metrics_only:
+            with prof.stage("bounded_alignment"):
+                alignment_algorithms, alignments = bounded_alignments(
+                    gt_text, ocr_text, max_memory
+                )
+            cer, n_characters = alignment_error_rate_n(alignments[0])
+            wer, n_words = alignment_error_rate_n(alignments[1])
+        else:
+            with prof.stage("character_error_rate"):
+                cer, n_characters = character_error_rate_n(gt_text, ocr_text)
+            with prof.stage("word_error_rate"):
+                wer, n_words = word_error_rate_n(gt_text, ocr_text)
+
+        if export_alignment_format:
+            with prof.stage("export_alignment"):
+                export_alignment(
+                    gt_text,
+                    ocr_text,
+                    report_prefix + ".alignment." + export_alignment_format,
+                    format=export_alignment_format,
+                    max_memory=max_memory,
+                )
+
+        if metrics_only:
+            # Nothing will use the cached matrices for an alignment
+            levenshtein_matrix_cache_clear()
+            confusion = None
+            char_diff_report = None
+            word_diff_report = None
+        else:
+            with prof.stage("confusion"):
+                if alignments is not None:
+                    confusion = confusion_to_json(alignment_confusion(alignments[0]))
+                else:
+                    confusion = confusion_to_json(
+                        character_confusion(gt_text, ocr_text)
+                    )
+            with prof.stage("align"):
+                char_diff_report, word_diff_report = gen_diff_reports(
+                    gt_text,
+                    ocr_text,
+                    diff_context=diff_context,
+                    lazy_html=lazy_html,
+                    alignments=alignments,
+                )
+
+        env = template_environment()
+
+        def render(report_suffix, profile_json=None):
+            template_fn = "report" + report_suffix + ".j2"
+            out_fn = report_prefix + report_suffix
+
+            template = env.get_template(template_fn)
+            template.stream(
+                gt=gt,
+                ocr=ocr,
+                cer=cer,
+                n_characters=n_characters,
+                wer=wer,
+                n_words=n_words,
+                confusion=confusion,
+                char_diff_report=char_diff_report,
+                word_diff_report=word_diff_report,
+                metrics=metrics,
+                alignment_algorithms=alignment_algorithms,
+                profile=profile_json,
+            ).dump(out_fn)
+
+        if not metrics_only:
+            with prof.stage("render"):
+                render(".html")
+
+        # The JSON report is written last, so it can include the profile
+        profile_json = None
+        if profile:
+            prof.info.update(sequence_lengths(gt_text, ocr_text))
+            profile_json = prof.to_json()
+        render(".json", profile_json)
+
+    instrumentation.count("pages")
+    instrumentation.count("graphemes", n_characters)
+
+
+def sequence_lengths(gt_text, ocr_text):
+    """Return the lengths of the GT and OCR grapheme cluster and word sequences."""
+    return {
+        "n_characters": len(list(grapheme_clusters(gt_text.text))),
+        "n_ocr_characters": len(list(grapheme_clusters(ocr_text.text))),
+        "n_words": len(list(words_normalized(gt_text))),
+        "n_ocr_words": len(list(words_normalized(ocr_text))),
+    }
 
 
 @click.command()
@@ -156,8 +532,102 @@ def process(gt, ocr, report_prefix, *, metrics=True, textequiv_level="region"):
     help="PAGE TextEquiv level to extract text from",
     metavar="LEVEL",
 )
-@click.option("--progress", default=False, is_flag=True, help="Show progress bar")
-def main(gt, ocr, report_prefix, metrics, textequiv_level, progress):
+@click.option(
+    "--diff-context",
+    type=click.IntRange(min=0),
+    help="Only show differences with N graphemes/words of context in the report",
+    metavar="N",
+)
+@click.option(
+    "--lazy-html",
+    default=False,
+    is_flag=True,
+    help="Render the HTML report lazily from embedded alignment data",
+)
+@click.option(
+    "--metrics-only",
+    "--json-only",
+    "metrics_only",
+    default=False,
+    is_flag=True,
+    help="Only compute the metrics and write the JSON report",
+)
+@click.option(
+    "--export-alignment",
+    "export_alignment_format",
+    type=click.Choice(ALIGNMENT_EXPORT_FORMATS),
+    help="Also write the alignment to $REPORT_PREFIX.alignment.FORMAT",
+    metavar="FORMAT",
+)
+@click.option(
+    "--profile",
+    default=False,
+    is_flag=True,
+    help="Record the time and memory of each stage in the JSON report",
+)
+@click.option(
+    "--incremental",
+    default=False,
+    is_flag=True,
+    help="Only align the lines changed since the last run with this REPORT_PREFIX",
+)
+@click.option(
+    "--pair-cache",
+    "pair_cache_fn",
+    type=click.Path(dir_okay=False),
+    help="Share the line pair alignments with other runs in this SQLite database",
+    metavar="FILE",
+)
+@click.option(
+    "--processes",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Split the comparison at unique words and align the parts in N processes",
+    metavar="N",
+)
+@click.option(
+    "--max-memory",
+    callback=_size_callback,
+    help="Align in at most SIZE bytes (e.g. 512M), slower if needed",
+    metavar="SIZE",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(available_engines()),
+    help="Compute the edit distances using this engine (default: the fastest)",
+    metavar="ENGINE",
+)
+@click.option(
+    "--prometheus-textfile",
+    type=click.Path(dir_okay=False),
+    help="Write instrumentation counters to FILE for the Prometheus node exporter",
+    metavar="FILE",
+)
+@click.option(
+    "--progress",
+    default=False,
+    is_flag=True,
+    help="Show progress (DP cells computed per second)",
+)
+def main(
+    gt,
+    ocr,
+    report_prefix,
+    metrics,
+    textequiv_level,
+    diff_context,
+    lazy_html,
+    metrics_only,
+    export_alignment_format,
+    profile,
+    incremental,
+    pair_cache_fn,
+    processes,
+    max_memory,
+    engine,
+    prometheus_textfile,
+    progress,
+):
     """
     Compare the PAGE/ALTO/text document GT against the document OCR.
 
@@ -175,9 +645,81 @@ def main(gt, ocr, report_prefix, metrics, textequiv_level, progress):
 
     By default, the text of PAGE files is extracted on 'region' level. You may
     use "--textequiv-level line" to extract from the level of TextLine tags.
+
+    For large documents, use "--diff-context N" to get a compact report showing
+    only the differences with N graphemes (or words) of context around them.
+    With "--lazy-html", the HTML report embeds the alignment data and renders
+    it only when scrolled into view, so that even huge reports open quickly.
+
+    If you only need the metrics, use "--metrics-only" to skip the alignment
+    and write just $REPORT_PREFIX.json.
+
+    For further analysis, "--export-alignment npz" writes the character and
+    word alignment to $REPORT_PREFIX.alignment.npz. If pyarrow is installed,
+    the formats "arrow" and "parquet" are available, too.
+
+    With "--profile", the JSON report also contains the wall time, CPU time and
+    peak memory of each stage of the comparison, the sequence lengths and the
+    number of edit distance matrix cells computed.
+
+    With "--incremental", the line alignments are kept in
+    $REPORT_PREFIX.incremental.json, so that the next run with the same
+    REPORT_PREFIX, e.g. for the output of a retrained model, only aligns the
+    changed lines. The error rates are the same as without "--incremental".
+
+    Running headers, page numbers and the like repeat across documents. With
+    "--pair-cache FILE", the line alignments are shared with other runs in the
+    SQLite database FILE, which may be used by concurrent runs.
+
+    For a single huge document, "--processes N" splits the comparison into
+    blocks at words that occur exactly once in GT and OCR and aligns the blocks
+    in N processes. The error rates are the same as without "--processes".
+
+    "--max-memory SIZE" caps the memory of each alignment at SIZE bytes, e.g.
+    512M or 2G. If the whole matrix of the alignment does not fit, only a band
+    around its diagonal is kept or, for very different texts, the alignment is
+    computed in linear space, which takes about twice as long.
+
+    The edit distances are computed by the fastest available engine, unless
+    another one is selected using "--engine" or the environment variable
+    DINGLEHOPPER_ENGINE. The engines "rapidfuzz" and "numba" are available if
+    RapidFuzz or Numba are installed.
+
+    "--prometheus-textfile FILE" writes counters like the DP matrix cells
+    computed, the bytes parsed and the stage timings to FILE, for the textfile
+    collector of the Prometheus node exporter.
     """
-    Config.progress = progress
-    process(gt, ocr, report_prefix, metrics=metrics, textequiv_level=textequiv_level)
+    set_engine(engine)
+    counters = instrumentation.Counters()
+    if prometheus_textfile:
+        instrumentation.add_listener(counters)
+    pair_cache = SharedPairCache(pair_cache_fn) if pair_cache_fn else None
+    try:
+        with Progress(pages=1, enabled=progress) as page_progress:
+            process(
+                gt,
+                ocr,
+                report_prefix,
+                metrics=metrics,
+                textequiv_level=textequiv_level,
+                diff_context=diff_context,
+                lazy_html=lazy_html,
+                metrics_only=metrics_only,
+                export_alignment_format=export_alignment_format,
+                profile=profile,
+                incremental=incremental,
+                pair_cache=pair_cache,
+                processes=processes,
+                max_memory=max_memory,
+            )
+            page_progress.page_done()
+        if prometheus_textfile:
+            instrumentation.write_prometheus_textfile(counters, prometheus_textfile)
+    finally:
+        if pair_cache is not None:
+            pair_cache.close()
+        if prometheus_textfile:
+            instrumentation.remove_listener(counters)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,360 @@
+import csv
+import json
+import math
+import random
+import time
+import tracemalloc
+import unicodedata
+from multiprocessing import Pool
+
+import click
+import numpy as np
+from uniseg.graphemecluster import grapheme_clusters
+
+from . import instrumentation
+from .align import seq_align
+from .cli import gen_diff_report
+from .edit_distance import levenshtein, levenshtein_matrix_cache_clear
+from .engines import available_engines, engine_name, set_engine
+from .extracted_text import substitute_equivalences
+from .ocr_files import extract
+from .progress import Progress, WorkerProgress, estimate_cost
+from .word_error_rate import words_normalized
+
+STAGES = ("extract", "normalize", "segment", "distance", "align", "render")
+
+
+def run_stages(gt, ocr, textequiv_level="region", trace_memory=False):
+    """Run the stages of process() on a GT/OCR pair, measuring each stage.
+
+    Returns a dict with the lengths of the pair and, for each stage, the wall time
+    in seconds and (with trace_memory) the peak traced memory in bytes.
+
+    The extract stage includes the normalization of the extracted text. The
+    normalize stage normalizes the extracted text again, which measures its share of
+    the extraction.
+    """
+    measurements = {}
+    results = {}
+
+    def stage(name, function):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            results[name] = function()
+        finally:
+            measurements[name + "_seconds"] = time.perf_counter() - start
+            if trace_memory:
+                measurements[name + "_peak_memory"] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+    levenshtein_matrix_cache_clear()
+
+    stage(
+        "extract",
+        lambda: (
+            extract(gt, textequiv_level=textequiv_level),
+            extract(ocr, textequiv_level=textequiv_level),
+        ),
+    )
+    gt_text, ocr_text = results["extract"]
+
+    stage(
+        "normalize",
+        lambda: (
+            substitute_equivalences(gt_text.text),
+            substitute_equivalences(ocr_text.text),
+        ),
+    )
+
+    def segment():
+        return (
+            list(grapheme_clusters(unicodedata.normalize("NFC", gt_text.text))),
+            list(grapheme_clusters(unicodedata.normalize("NFC", ocr_text.text))),
+            list(words_normalized(gt_text)),
+            list(words_normalized(ocr_text)),
+        )
+
+    stage("segment", segment)
+    gt_chars, ocr_chars, gt_words, ocr_words = results["segment"]
+
+    stage(
+        "distance",
+        lambda: (levenshtein(gt_chars, ocr_chars), levenshtein(gt_words, ocr_words)),
+    )
+    stage(
+        "align",
+        lambda: (
+            list(seq_align(gt_chars, ocr_chars)),
+            list(seq_align(gt_words, ocr_words)),
+        ),
+    )
+
+    def render():
+        for report in (
+            gen_diff_report(gt_text, ocr_text, css_prefix="c", joiner="", none="·"),
+            gen_diff_report(gt_words, ocr_words, css_prefix="w", joiner=" ", none="⋯"),
+        ):
+            for _ in report:
+                pass
+
+    stage("render", render)
+    levenshtein_matrix_cache_clear()
+    instrumentation.count("graphemes", len(gt_chars))
+
+    measurements.update(
+        {
+            "gt": gt,
+            "ocr": ocr,
+            "n_characters": len(gt_chars),
+            "n_ocr_characters": len(ocr_chars),
+            "n_words": len(gt_words),
+            "n_ocr_words": len(ocr_words),
+            "cells": len(gt_chars) * len(ocr_chars) + len(gt_words) * len(ocr_words),
+        }
+    )
+    return measurements
+
+
+# The progress of a worker process, see _init_worker()
+_worker_progress = None
+
+
+def _init_worker(progress_queue, engine=None):
+    global _worker_progress
+    set_engine(engine)
+    if progress_queue is not None:
+        _worker_progress = WorkerProgress(progress_queue)
+        instrumentation.add_listener(_worker_progress)
+
+
+def _run_stages_star(args):
+    result = run_stages(*args)
+    if _worker_progress is not None:
+        _worker_progress.page_done(estimate_cost(*args[:2]))
+    return result
+
+
+def fit_power_law(x, y):
+    """Fit y = coefficient * x ** exponent to the given measurements.
+
+    Returns None if there are not enough (positive) measurements to fit.
+    """
+    points = [(xi, yi) for xi, yi in zip(x, y) if xi > 0 and yi > 0]
+    if len(set(xi for xi, _ in points)) < 2:
+        return None
+    log_x = np.log([xi for xi, _ in points])
+    log_y = np.log([yi for _, yi in points])
+    exponent, log_coefficient = np.polyfit(log_x, log_y, 1)
+    return {"exponent": float(exponent), "coefficient": math.exp(log_coefficient)}
+
+
+def read_pairs(pairs_file):
+    """Read GT/OCR pairs from a file, one whitespace-separated pair per line."""
+    pairs = []
+    for line in pairs_file:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        gt, ocr = line.split()
+        pairs.append((gt, ocr))
+    return pairs
+
+
+def benchmark(
+    pairs,
+    *,
+    jobs=(1,),
+    engines=None,
+    textequiv_level="region",
+    trace_memory=True,
+    progress=None,
+):
+    """Benchmark the stages of process() on the given GT/OCR pairs.
+
+    Returns a capacity report as a dict, with:
+
+    * pairs: the stage measurements of each pair (see run_stages()) for each
+      engine, with the name of the engine in "engine"
+    * fits: for each engine and stage, a power law fit of time and memory against
+      the number of GT grapheme clusters
+    * throughput: for each engine and number of jobs, the pages and grapheme
+      clusters per second of processing all pairs in a process pool
+    * engines: the edit distance engines benchmarked, engines if given, else the
+      default engine (see engines)
+
+    Every run of a pair is reported to the given progress.Progress, if any. The
+    default engine is selected again afterwards.
+    """
+    engines = [engine_name(engine) for engine in engines or [None]]
+    if progress is None:
+        progress = Progress(enabled=False)
+
+    report = {"pairs": [], "fits": {}, "throughput": [], "engines": engines}
+    try:
+        for engine in engines:
+            set_engine(engine)
+            measurements, fits, throughput = _benchmark_engine(
+                pairs, engine, jobs, textequiv_level, trace_memory, progress
+            )
+            report["pairs"].extend(measurements)
+            report["fits"][engine] = fits
+            report["throughput"].extend(throughput)
+    finally:
+        set_engine(None)
+    return report
+
+
+def _benchmark_engine(pairs, engine, jobs, textequiv_level, trace_memory, progress):
+    costs = [estimate_cost(gt, ocr) for gt, ocr in pairs]
+
+    measurements = []
+    for (gt, ocr), cost in zip(pairs, costs):
+        m = run_stages(gt, ocr, textequiv_level)
+        m["engine"] = engine
+        measurements.append(m)
+        progress.page_done(cost)
+    if trace_memory:
+        for m, cost in zip(measurements, costs):
+            traced = run_stages(m["gt"], m["ocr"], textequiv_level, trace_memory=True)
+            for stage in STAGES:
+                m[stage + "_peak_memory"] = traced[stage + "_peak_memory"]
+            progress.page_done(cost)
+
+    n = [m["n_characters"] for m in measurements]
+    fits = {}
+    for stage in STAGES:
+        fits[stage] = {
+            "seconds": fit_power_law(n, [m[stage + "_seconds"] for m in measurements])
+        }
+        if trace_memory:
+            fits[stage]["peak_memory"] = fit_power_law(
+                n, [m[stage + "_peak_memory"] for m in measurements]
+            )
+
+    throughput = []
+    for j in jobs:
+        start = time.perf_counter()
+        progress_queue = progress.worker_queue() if progress.enabled else None
+        with Pool(j, _init_worker, (progress_queue, engine)) as pool:
+            pool.map(
+                _run_stages_star,
+                [(gt, ocr, textequiv_level) for gt, ocr in pairs],
+                chunksize=1,
+            )
+        wall_time = time.perf_counter() - start
+        throughput.append(
+            {
+                "engine": engine,
+                "jobs": j,
+                "seconds": wall_time,
+                "pages_per_second": len(pairs) / wall_time,
+                "characters_per_second": sum(n) / wall_time,
+            }
+        )
+    return measurements, fits, throughput
+
+
+@click.command()
+@click.argument("pairs_file", type=click.File("r"))
+@click.option(
+    "--sample",
+    type=click.IntRange(min=1),
+    help="Only benchmark a random sample of N pairs",
+    metavar="N",
+)
+@click.option("--seed", type=int, default=0, help="Seed for the random sample")
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    multiple=True,
+    help="Measure the throughput using N processes (may be given multiple times)",
+    metavar="N",
+)
+@click.option(
+    "--textequiv-level",
+    default="region",
+    help="PAGE TextEquiv level to extract text from",
+    metavar="LEVEL",
+)
+@click.option(
+    "--memory/--no-memory",
+    default=True,
+    help="Enable/disable measuring the peak memory of the stages",
+)
+@click.option(
+    "--engine",
+    "engines",
+    type=click.Choice(available_engines()),
+    multiple=True,
+    help="Measure using this edit distance engine (may be given multiple times)",
+    metavar="ENGINE",
+)
+@click.option("--progress", default=False, is_flag=True, help="Show progress")
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(),
+    default="capacity.json",
+    help="Write the capacity report to this .json or .csv file",
+)
+def main(
+    pairs_file, sample, seed, jobs, textequiv_level, memory, engines, progress, output
+):
+    """
+    Measure how dinglehopper scales on a corpus of GT/OCR pairs.
+
+    PAIRS_FILE lists the GT and OCR file of each pair on a line, separated by
+    whitespace.
+
+    For each pair, the wall time and the peak memory of the stages of a
+    comparison (extract, normalize, segment, distance, align, render) are
+    measured and fitted against the length of the GT. The throughput is measured
+    for each number of processes given by --jobs. All of this is done for each
+    edit distance engine given by --engine (default: the fastest), e.g. "--engine
+    numpy --engine rapidfuzz" compares these engines.
+
+    The capacity report is written to a JSON file or, if the output file name
+    ends in .csv, the measurements of the pairs are written to a CSV file and the
+    fits and throughputs are printed.
+    """
+    pairs = read_pairs(pairs_file)
+    if not pairs:
+        raise click.UsageError("No GT/OCR pairs in PAIRS_FILE")
+    if sample is not None and sample < len(pairs):
+        pairs = random.Random(seed).sample(pairs, sample)
+    jobs = jobs or (1,)
+    runs = (1 + (1 if memory else 0) + len(jobs)) * max(len(engines), 1)
+    with Progress(
+        pages=runs * len(pairs),
+        cost=runs * sum(estimate_cost(gt, ocr) for gt, ocr in pairs),
+        enabled=progress,
+    ) as p:
+        report = benchmark(
+            pairs,
+            jobs=jobs,
+            textequiv_level=textequiv_level,
+            trace_memory=memory,
+            progress=p,
+            engines=engines,
+        )
+
+    if output.endswith(".csv"):
+        with open(output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=sorted(report["pairs"][0]))
+            writer.writeheader()
+            writer.writerows(report["pairs"])
+        click.echo(
+            json.dumps(
+                {k: report[k] for k in ("engines", "fits", "throughput")}, indent=4
+            )
+        )
+    else:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import json
+import os
+from collections import Counter
+
+import click
+
+from .confusion import confusion_from_json, confusion_to_json
+from .profiling import summarize_profiles
+
+
+def is_report(report):
+    """Check if the given loaded JSON looks like a dinglehopper report."""
+    return isinstance(report, dict) and "n_characters" in report and "gt" in report
+
+
+def summarize(reports):
+    """Summarize the given loaded JSON reports.
+
+    The error rates are aggregated by weighting them with the length of the
+    reference, i.e. they are the error rates of the concatenated documents. The
+    profiles of the reports, if any, are aggregated by summarize_profiles().
+    """
+    summary = {
+        "num_reports": 0,
+        "n_characters": 0,
+        "n_words": 0,
+    }
+    char_distance = 0
+    word_distance = 0
+    has_metrics = False
+    confusion = Counter()
+    profiles = []
+    for report in reports:
+        summary["num_reports"] += 1
+        summary["n_characters"] += report["n_characters"]
+        summary["n_words"] += report["n_words"]
+        if "cer" in report:
+            has_metrics = True
+            # An error rate is infinite only for an empty reference, which does not
+            # contribute to the distance of the concatenated documents
+            if report["n_characters"] > 0:
+                char_distance += round(report["cer"] * report["n_characters"])
+            if report["n_words"] > 0:
+                word_distance += round(report["wer"] * report["n_words"])
+        if "confusion" in report:
+            confusion.update(confusion_from_json(report["confusion"]))
+        if "profile" in report:
+            profiles.append(report["profile"])
+
+    if has_metrics:
+        summary["cer"] = (
+            char_distance / summary["n_characters"] if summary["n_characters"] else None
+        )
+        summary["wer"] = (
+            word_distance / summary["n_words"] if summary["n_words"] else None
+        )
+    summary["confusion"] = confusion_to_json(confusion)
+    if profiles:
+        summary["profile"] = summarize_profiles(profiles)
+    return summary
+
+
+def load_reports(report_folder, summary_fn=None):
+    """Load all dinglehopper JSON reports in the given folder (recursively)."""
+    for dirpath, _, filenames in os.walk(report_folder):
+        for fn in sorted(filenames):
+            fn = os.path.join(dirpath, fn)
+            if not fn.endswith(".json") or (
+                summary_fn and os.path.abspath(fn) == os.path.abspath(summary_fn)
+            ):
+                continue
+            with open(fn, "r") as f:
+                try:
+                    report = json.load(f)
+                except ValueError:
+                    continue
+            if is_report(report):
+                yield report
+
+
+@click.command()
+@click.argument("report_folder", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(),
+    help="Write the summary to this file (default: REPORT_FOLDER/summary.json)",
+)
+def main(report_folder, output):
+    """
+    Summarize the dinglehopper JSON reports in REPORT_FOLDER.
+
+    The summary contains the number of reports, the total number of characters
+    and words, the CER and WER of all documents and the merged character
+    confusion statistics. If the reports were generated with --profile, the
+    summary also contains the aggregated profiles.
+    """
+    if output is None:
+        output = os.path.join(report_folder, "summary.json")
+    summary = summarize(load_reports(report_folder, summary_fn=output))
+    with open(output, "w") as f:
+        json.dump(summary, f, indent=4, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import json
+import os
+import socket
+import sys
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+import click
+
+DEFAULT_URL = "http://127.0.0.1:8089"
+
+
+class UnixHTTPConnection(HTTPConnection):
+    """HTTP connection over a Unix socket."""
+
+    def __init__(self, path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class EvaluationError(Exception):
+    """The evaluation server rejected or failed a job."""
+
+
+def evaluate(job, *, url=DEFAULT_URL, socket_path=None, timeout=None):
+    """Submit an evaluation job to a dinglehopper server and return the report.
+
+    See server.evaluate() for the job. The file names are resolved relative to the
+    current directory, as the server may run in another one.
+    """
+    job = dict(job)
+    for key in ("gt", "ocr", "report_prefix", "pair_cache"):
+        if job.get(key) is not None:
+            job[key] = os.path.abspath(job[key])
+
+    if socket_path is not None:
+        connection = UnixHTTPConnection(socket_path, timeout=timeout)
+    else:
+        parts = urlsplit(url)
+        connection = HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+    try:
+        connection.request(
+            "POST",
+            "/evaluate",
+            body=json.dumps(job).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        response = connection.getresponse()
+        result = json.loads(response.read().decode("utf-8"))
+    finally:
+        connection.close()
+    if response.status != 200:
+        raise EvaluationError(result.get("error", response.reason))
+    return result
+
+
+@click.command()
+@click.argument("gt", type=click.Path(exists=True))
+@click.argument("ocr", type=click.Path(exists=True))
+@click.argument("report_prefix", type=click.Path(), default="report")
+@click.option("--url", default=DEFAULT_URL, help="URL of the evaluation server")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(),
+    help="Connect to the evaluation server on this Unix socket",
+    metavar="PATH",
+)
+@click.option(
+    "--metrics/--no-metrics", default=True, help="Enable/disable metrics and green/red"
+)
+@click.option(
+    "--textequiv-level",
+    default="region",
+    help="PAGE TextEquiv level to extract text from",
+    metavar="LEVEL",
+)
+@click.option(
+    "--diff-context",
+    type=click.IntRange(min=0),
+    help="Only show differences with N graphemes/words of context in the report",
+    metavar="N",
+)
+@click.option(
+    "--lazy-html",
+    is_flag=True,
+    help="Render the HTML report lazily from embedded alignment data",
+)
+@click.option(
+    "--metrics-only",
+    "--json-only",
+    "metrics_only",
+    is_flag=True,
+    help="Only compute the metrics and write the JSON report",
+)
+@click.option(
+    "--export-alignment",
+    "export_alignment_format",
+    help="Also write the alignment to $REPORT_PREFIX.alignment.FORMAT",
+    metavar="FORMAT",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Record the time and memory of each stage in the JSON report",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Only align the lines changed since the last run with this REPORT_PREFIX",
+)
+@click.option(
+    "--pair-cache",
+    type=click.Path(dir_okay=False),
+    help="Share the line pair alignments with other runs in this SQLite database",
+    metavar="FILE",
+)
+@click.option(
+    "--processes",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Split the comparison at unique words and align the parts in N processes",
+    metavar="N",
+)
+@click.option(
+    "--max-memory",
+    help="Align in at most SIZE bytes (e.g. 512M), slower if needed",
+    metavar="SIZE",
+)
+@click.option(
+    "--engine",
+    help="Compute the edit distances using this engine (default: the fastest)",
+    metavar="ENGINE",
+)
+def main(
+    gt,
+    ocr,
+    report_prefix,
+    url,
+    socket_path,
+    metrics,
+    textequiv_level,
+    diff_context,
+    lazy_html,
+    metrics_only,
+    export_alignment_format,
+    profile,
+    incremental,
+    pair_cache,
+    processes,
+    max_memory,
+    engine,
+):
+    """
+    Compare GT against OCR using a dinglehopper server.
+
+    This works like dinglehopper, but submits the comparison to a running
+    dinglehopper-server, avoiding the startup time of dinglehopper. The
+    server writes the reports to $REPORT_PREFIX.{html,json}, so it must be
+    able to read the input files and write the reports. The JSON report is
+    also printed.
+    """
+    job = {
+        "gt": gt,
+        "ocr": ocr,
+        "report_prefix": report_prefix,
+        "metrics": metrics,
+        "textequiv_level": textequiv_level,
+        "diff_context": diff_context,
+        "lazy_html": lazy_html,
+        "metrics_only": metrics_only,
+        "export_alignment_format": export_alignment_format,
+        "profile": profile,
+        "incremental": incremental,
+        "pair_cache": pair_cache,
+        "processes": processes,
+        "max_memory": max_memory,
+        "engine": engine,
+    }
+    try:
+        report = evaluate(job, url=url, socket_path=socket_path)
+    except (EvaluationError, OSError) as e:
+        click.echo("Error: {}".format(e), err=True)
+        sys.exit(1)
+    click.echo(json.dumps(report, indent=4, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
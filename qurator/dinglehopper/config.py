@@ -1,2 +0,0 @@
-class Config:
-    progress = False
@@ -0,0 +1,96 @@
+import unicodedata
+from collections import Counter
+from typing import Sequence
+
+import numpy as np
+from multimethod import multimethod
+from uniseg.graphemecluster import grapheme_clusters
+
+from .edit_distance import seq_editops
+from .extracted_text import ExtractedText
+
+
+def seq_confusion(seq1: Sequence, seq2: Sequence) -> Counter:
+    """Count the confusions between two sequences.
+
+    Returns a Counter of (element in seq1, element in seq2) pairs for the
+    substitutions, (element in seq1, None) for deletions and (None, element in seq2)
+    for insertions of the edit operations transforming seq1 into seq2.
+
+    Counters can be merged using + or Counter.update(), e.g. for whole corpora.
+    """
+    seq1 = list(seq1)
+    seq2 = list(seq2)
+    ops = seq_editops(seq1, seq2)
+    if not ops:
+        return Counter()
+
+    # Integer-code the elements, 0 being the gap
+    vocabulary = {None: 0}
+    ids1 = np.array([vocabulary.setdefault(e, len(vocabulary)) for e in seq1] + [0])
+    ids2 = np.array([vocabulary.setdefault(e, len(vocabulary)) for e in seq2] + [0])
+
+    # Look up the ids of the edit operations, using the trailing gap at index -1 for
+    # the missing side of inserts and deletes
+    kinds = np.array([op[0][0] for op in ops])
+    i = np.array([op[1] for op in ops])
+    j = np.array([op[2] for op in ops])
+    i[kinds == "i"] = -1
+    j[kinds == "d"] = -1
+    keys = ids1[i] * len(vocabulary) + ids2[j]
+
+    # Count the distinct (id1, id2) pairs
+    pairs, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse.ravel())
+
+    elements = list(vocabulary)
+    return Counter(
+        {
+            (elements[pair // len(vocabulary)], elements[pair % len(vocabulary)]): count
+            for pair, count in zip(pairs.tolist(), counts.tolist())
+        }
+    )
+
+
+def alignment_confusion(alignment) -> Counter:
+    """Count the confusions in an alignment, i.e. its pairs of different elements.
+
+    For an alignment from seq_align(), this is the same as seq_confusion().
+    """
+    return Counter((g, o) for g, o in alignment if g != o)
+
+
+@multimethod
+def character_confusion(reference: str, compared: str) -> Counter:
+    """Count the grapheme cluster confusions between reference and compared text.
+
+    See seq_confusion() for the result.
+    """
+    seq1 = list(grapheme_clusters(unicodedata.normalize("NFC", reference)))
+    seq2 = list(grapheme_clusters(unicodedata.normalize("NFC", compared)))
+    return seq_confusion(seq1, seq2)
+
+
+@multimethod
+def character_confusion(reference: ExtractedText, compared: ExtractedText) -> Counter:
+    return character_confusion(reference.text, compared.text)
+
+
+def confusion_to_json(confusion: Counter):
+    """Convert confusion counts to a JSON-compatible list of [gt, ocr, count].
+
+    The list is sorted by descending count, gaps are None.
+    """
+
+    def sort_key(item):
+        (gt, ocr), count = item
+        return -count, str(gt), str(ocr)
+
+    return [
+        [gt, ocr, count] for (gt, ocr), count in sorted(confusion.items(), key=sort_key)
+    ]
+
+
+def confusion_from_json(confusion_json) -> Counter:
+    """Convert a list of [gt, ocr, count] back to confusion counts."""
+    return Counter({(gt, ocr): count for gt, ocr, count in confusion_json})
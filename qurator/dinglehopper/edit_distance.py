@@ -1,5 +1,7 @@
 from __future__ import division, print_function
 
+import os
+import tempfile
 import unicodedata
 from functools import partial, lru_cache
 from typing import Sequence, Tuple
@@ -7,10 +9,15 @@ from typing import Sequence, Tuple
 import numpy as np
 from multimethod import multimethod
 from uniseg.graphemecluster import grapheme_clusters
-from tqdm import tqdm
 
+from .engines import bitparallel_distance, engine_name, get_engine
 from .extracted_text import ExtractedText
-from .config import Config
+from . import instrumentation
+
+# Levenshtein matrices larger than this (in bytes) are stored in a temporary file
+MATRIX_MEMORY_BUDGET = int(
+    os.environ.get("DINGLEHOPPER_MATRIX_MEMORY_BUDGET", 2 * 1024**3)
+)
 
 
 def levenshtein_matrix(seq1: Sequence, seq2: Sequence):
@@ -24,7 +31,32 @@ def levenshtein_matrix(seq1: Sequence, seq2: Sequence):
 
     # Internally, we use a cached version. As the cache only works on hashable parameters, we convert the input
     # sequences to tuples to make them hashable.
-    return _levenshtein_matrix(tuple(seq1), tuple(seq2))
+    return _cached(_levenshtein_matrix, seq1, seq2)
+
+
+def levenshtein_directions(seq1: Sequence, seq2: Sequence):
+    """Compute the Levenshtein distance and the backtrace directions.
+
+    Instead of the whole Levenshtein matrix, this only keeps which predecessor of
+    each cell seq_editops() backtraces to, packed into 2 bits per cell. Returns the
+    distance and the packed matrix P, the direction of cell (i, j) is
+    P[i, j // 4] >> 2 * (j % 4) & 3, one of DELETE, INSERT, REPLACE and MATCH.
+    """
+    return _cached(_levenshtein_directions, seq1, seq2)
+
+
+def _cached(function, seq1, seq2, *args):
+    """Call the LRU cached function, counting the cache hits and misses."""
+    if not instrumentation.enabled():
+        return function(tuple(seq1), tuple(seq2), *args)
+
+    misses = function.cache_info().misses
+    result = function(tuple(seq1), tuple(seq2), *args)
+    if function.cache_info().misses == misses:
+        instrumentation.count("levenshtein_matrix_cache_hits")
+    else:
+        instrumentation.count("levenshtein_matrix_cache_misses")
+    return result
 
 
 @lru_cache(maxsize=10)
@@ -33,19 +65,61 @@ def _levenshtein_matrix(seq1: Tuple, seq2: Tuple):
 
     This is a LRU cached function not meant to be used directly. Use levenshtein_matrix() instead.
     """
+    return _levenshtein_matrix_numpy(seq1, seq2)
+
+
+def _matrix_dtype(m, n):
+    """Return the smallest unsigned dtype for a Levenshtein matrix.
+
+    The elements are at most max(m, n). One more must fit, as the backtrace
+    compares D[i, j] + 1 in the dtype of the matrix.
+    """
+    if max(m, n) < np.iinfo(np.uint16).max:
+        return np.uint16
+    return np.uint32
+
+
+def _matrix_zeros(m, n):
+    """Allocate a zeroed (m + 1) x (n + 1) Levenshtein matrix."""
+    return _zeros((m + 1, n + 1), _matrix_dtype(m, n))
+
+
+def _zeros(shape, dtype):
+    """Allocate a zeroed array for a matrix of the dynamic programming.
+
+    If the array is larger than MATRIX_MEMORY_BUDGET bytes, it is memory-mapped to
+    an anonymous temporary file (in TMPDIR), so the operating system pages it out
+    instead of running out of memory.
+    """
+    if shape[0] * shape[1] * np.dtype(dtype).itemsize <= MATRIX_MEMORY_BUDGET:
+        return np.zeros(shape, dtype)
+
+    instrumentation.count("levenshtein_matrix_memmaps")
+    # The memory map keeps the file open, it is deleted when the map is released
+    with tempfile.TemporaryFile(prefix="dinglehopper-") as f:
+        return np.memmap(f, dtype=dtype, mode="w+", shape=shape)
+
+
+def _levenshtein_matrix_python(seq1: Tuple, seq2: Tuple):
+    """Compute the Levenshtein matrix cell by cell.
+
+    This is the reference implementation for _levenshtein_matrix_numpy().
+    """
     m = len(seq1)
     n = len(seq2)
 
     def from_to(start, stop):
         return range(start, stop + 1, 1)
 
-    D = np.zeros((m + 1, n + 1), np.int)
+    D = _matrix_zeros(m, n)
     D[0, 0] = 0
     for i in from_to(1, m):
         D[i, 0] = i
     for j in from_to(1, n):
         D[0, j] = j
-    for i in tqdm(from_to(1, m), disable=not Config.progress):
+    # Report the cells computed row by row, for progress reporting
+    count_rows = instrumentation.enabled()
+    for i in from_to(1, m):
         for j in from_to(1, n):
             D[i, j] = min(
                 D[i - 1, j - 1]
@@ -53,17 +127,211 @@ def _levenshtein_matrix(seq1: Tuple, seq2: Tuple):
                 D[i, j - 1] + 1,  # Insertion
                 D[i - 1, j] + 1,  # Deletion
             )
+        if count_rows:
+            instrumentation.count("dp_cells", n)
 
     return D
 
 
+def _levenshtein_matrix_numpy(seq1: Tuple, seq2: Tuple):
+    """Compute the Levenshtein matrix row by row, using vectorized operations.
+
+    The elements of the sequences are coded as integers, so a row is compared to
+    the element of seq1 in one operation. Substitutions and deletions only depend
+    on the previous row. The insertions depend on the cell to the left, but as
+    D[i, j] = min over k <= j of (T[k] + j - k), where T is the row without the
+    insertions, D[i, j] - j is the cumulative minimum of T[k] - k.
+    """
+    m = len(seq1)
+    n = len(seq2)
+
+    codes = {}
+    a = np.array([codes.setdefault(x, len(codes)) for x in seq1], np.int64)
+    b = np.array([codes.setdefault(x, len(codes)) for x in seq2], np.int64)
+    a = a.reshape(m)
+    b = b.reshape(n)
+
+    D = _matrix_zeros(m, n)
+    D[:, 0] = np.arange(m + 1)
+    D[0, :] = np.arange(n + 1)
+    offsets = np.arange(n + 1)
+    row = np.empty(n + 1, np.int64)
+    # Report the cells computed row by row, for progress reporting
+    count_rows = instrumentation.enabled()
+    for i in range(1, m + 1):
+        previous = D[i - 1]
+        row[0] = i
+        # Same or Substitution
+        np.add(previous[:-1], b != a[i - 1], out=row[1:])
+        # Deletion
+        np.minimum(row[1:], previous[1:] + 1, out=row[1:])
+        # Insertion
+        row -= offsets
+        np.minimum.accumulate(row, out=row)
+        row += offsets
+        D[i] = row
+        if count_rows:
+            instrumentation.count("dp_cells", n)
+
+    return D
+
+
+# The backtrace directions, in the order of preference of seq_editops()
+DELETE, INSERT, REPLACE, MATCH = range(4)
+
+
+@lru_cache(maxsize=10)
+def _levenshtein_directions(seq1: Tuple, seq2: Tuple):
+    """Compute the Levenshtein distance and the packed backtrace directions.
+
+    This is a LRU cached function not meant to be used directly. Use
+    levenshtein_directions() instead.
+
+    The rows are computed like in _levenshtein_matrix_numpy(), but only the
+    previous row is kept. For each cell, the direction of the first optimal
+    predecessor in the order of preference (DELETE, INSERT, REPLACE, MATCH) is
+    stored in 2 bits, four cells per byte.
+    """
+    m = len(seq1)
+    n = len(seq2)
+
+    codes = {}
+    a = np.array([codes.setdefault(x, len(codes)) for x in seq1], np.int64)
+    b = np.array([codes.setdefault(x, len(codes)) for x in seq2], np.int64)
+    a = a.reshape(m)
+    b = b.reshape(n)
+
+    width = (n + 4) // 4
+    P = _zeros((m + 1, width), np.uint8)
+    directions = np.zeros(width * 4, np.uint8)
+    cells = directions.reshape(width, 4)
+
+    def pack(i):
+        P[i] = cells[:, 0] | cells[:, 1] << 2 | cells[:, 2] << 4 | cells[:, 3] << 6
+
+    # The distances are at most max(m, n), which fits in 32 bits
+    offsets = np.arange(n + 1, dtype=np.int32)
+    previous = np.arange(n + 1, dtype=np.int32)
+    row = np.empty(n + 1, np.int32)
+    directions[1 : n + 1] = INSERT
+    pack(0)
+    d = directions[: n + 1]
+    # Report the cells computed row by row, for progress reporting
+    count_rows = instrumentation.enabled()
+    for i in range(1, m + 1):
+        row[0] = i
+        np.add(previous[:-1], b != a[i - 1], out=row[1:])
+        np.minimum(row[1:], previous[1:] + 1, out=row[1:])
+        row -= offsets
+        np.minimum.accumulate(row, out=row)
+        row += offsets
+
+        # The first optimal predecessor in the order of preference, computed on
+        # the booleans: REPLACE (2) < MATCH (3), INSERT (1) < both, DELETE (0)
+        replace = (previous[:-1] + 1 == row[1:]).view(np.uint8)
+        insert = (row[:-1] + 1 == row[1:]).view(np.uint8)
+        delete = previous + 1 == row
+        np.minimum(3 - replace, 3 - 2 * insert, out=d[1:])
+        d[0] = DELETE
+        d *= ~delete
+        pack(i)
+
+        previous, row = row, previous
+        if count_rows:
+            instrumentation.count("dp_cells", n)
+
+    return int(previous[n]), P
+
+
 def levenshtein(seq1, seq2):
-    """Compute the Levenshtein edit distance between two sequences"""
+    """Compute the Levenshtein edit distance between two sequences
+
+    The distance is computed by the selected or the fastest available engine, see
+    engines.
+    """
+    return _cached(_levenshtein, seq1, seq2, engine_name())
+
+
+@lru_cache(maxsize=10)
+def _levenshtein(seq1: Tuple, seq2: Tuple, engine: str):
+    """Compute the Levenshtein edit distance using the given engine.
+
+    This is a LRU cached function not meant to be used directly. Use levenshtein()
+    instead.
+    """
+    codes = {}
+    a = [codes.setdefault(x, len(codes)) for x in seq1]
+    b = [codes.setdefault(x, len(codes)) for x in seq2]
+    if instrumentation.enabled():
+        instrumentation.count("dp_cells", len(a) * len(b))
+    return get_engine(engine)(a, b)
+
+
+def levenshtein_banded(seq1, seq2, k):
+    """Compute the Levenshtein distance between two sequences if it is at most k.
+
+    Only the cells within k diagonals of the main diagonal are computed (see
+    Ukkonen, "Algorithms for approximate string matching", 1985), which takes
+    O(k * len(seq1)) time. Returns None if the distance is greater than k.
+    """
+    seq1 = list(seq1)
+    seq2 = list(seq2)
     m = len(seq1)
     n = len(seq2)
+    if abs(m - n) > k:
+        return None
+
+    # Cells outside of the band are greater than k anyway
+    outside = k + 1
+    count_rows = instrumentation.enabled()
+    previous = list(range(min(n, k) + 1))
+    previous_lo = 0
+    for i in range(1, m + 1):
+        lo = max(0, i - k)
+        hi = min(n, i + k)
+        current = []
+        for j in range(lo, hi + 1):
+            if j == 0:
+                current.append(i)
+                continue
+            diagonal = (
+                previous[j - 1 - previous_lo] if j - 1 >= previous_lo else outside
+            )
+            up = (
+                previous[j - previous_lo]
+                if j - previous_lo < len(previous)
+                else outside
+            )
+            left = current[-1] if current else outside
+            current.append(
+                min(
+                    diagonal + (seq1[i - 1] != seq2[j - 1]),  # Same or Substitution
+                    left + 1,  # Insertion
+                    up + 1,  # Deletion
+                )
+            )
+        previous = current
+        previous_lo = lo
+        if count_rows:
+            instrumentation.count("dp_cells", hi - lo + 1)
+
+    d = previous[n - previous_lo]
+    return d if d <= k else None
 
-    D = levenshtein_matrix(seq1, seq2)
-    return D[m, n]
+
+def levenshtein_bitparallel(seq1, seq2):
+    """Compute the Levenshtein distance between two sequences, bit-parallel.
+
+    This is Myers' bit-vector algorithm, see engines.bitparallel_distance(). A
+    column of the DP matrix is computed by a few integer operations, so this is
+    much faster than computing the matrix for long sequences, but it only
+    computes the distance.
+    """
+    seq1 = list(seq1)
+    seq2 = list(seq2)
+    if instrumentation.enabled():
+        instrumentation.count("dp_cells", len(seq1) * len(seq2))
+    return bitparallel_distance(seq1, seq2)
 
 
 def levenshtein_matrix_cache_clear():
@@ -73,6 +341,8 @@ def levenshtein_matrix_cache_clear():
     usage by not caching results from prior input files.
     """
     _levenshtein_matrix.cache_clear()
+    _levenshtein_directions.cache_clear()
+    _levenshtein.cache_clear()
 
 
 @multimethod
@@ -92,12 +362,237 @@ def distance(s1: ExtractedText, s2: ExtractedText):
     return distance(s1.text, s2.text)
 
 
-def seq_editops(seq1, seq2):
+def seq_editops(seq1, seq2, max_memory=None):
     """
     Return sequence of edit operations transforming one sequence to another.
 
     This aims to return the same/similar results as python-Levenshtein's editops(), just generalized to arbitrary
     sequences.
+
+    With max_memory (in bytes), the alignment algorithm is chosen so that its
+    matrix takes at most max_memory bytes, see alignment_algorithm().
+    """
+    seq1 = list(seq1)
+    seq2 = list(seq2)
+    m = len(seq1)
+    n = len(seq2)
+    algorithm = alignment_algorithm(seq1, seq2, max_memory)
+    instrumentation.count("alignments", algorithm=algorithm)
+
+    if algorithm == "full":
+        _, P = levenshtein_directions(seq1, seq2)
+
+        def direction(i, j):
+            return int(P[i, j >> 2]) >> 2 * (j & 3) & 3
+
+        return _backtrace(m, n, direction)
+
+    a, b = _integer_codes(seq1, seq2)
+    if algorithm == "banded":
+        k = levenshtein(seq1, seq2)
+        P = _banded_directions(a, b, k)
+
+        def direction(i, j):
+            t = j - i + k
+            return int(P[i, t >> 2]) >> 2 * (t & 3) & 3
+
+        return _backtrace(m, n, direction)
+
+    return _seq_editops_linear(a, b, max_memory)
+
+
+def alignment_algorithm(seq1, seq2, max_memory=None):
+    """Return the algorithm seq_editops() uses to align the sequences.
+
+    The memory needed is estimated from the lengths of the sequences before
+    anything is allocated:
+
+    * "full": The backtrace directions of all cells fit into max_memory bytes (2
+      bits per cell). This is always used without max_memory.
+    * "banded": Only the cells within d diagonals of the main diagonal, d being the
+      distance (computed first, in linear space by the edit distance engine), are
+      needed for the backtrace and fit. The edit operations are the same as with
+      "full".
+    * "linear": Otherwise, Hirschberg's algorithm splits the alignment into parts
+      that fit, computing only single rows of the matrix to find the splits. The
+      edit operations have the same cost as with "full", but may differ in the
+      choice between edit operations of the same cost.
+    """
+    m = len(seq1)
+    n = len(seq2)
+    if max_memory is None or _directions_bytes(m, n) <= max_memory:
+        return "full"
+    if _directions_bytes(m, 2 * levenshtein(seq1, seq2)) <= max_memory:
+        return "banded"
+    return "linear"
+
+
+def _directions_bytes(m, width):
+    """Return the size of a packed direction matrix of m + 1 by width + 1 cells."""
+    return (m + 1) * ((width + 4) // 4)
+
+
+def _integer_codes(seq1, seq2):
+    """Code the elements of the sequences as integers, returning two arrays."""
+    codes = {}
+    a = np.array([codes.setdefault(x, len(codes)) for x in seq1], np.int64)
+    b = np.array([codes.setdefault(x, len(codes)) for x in seq2], np.int64)
+    return a.reshape(len(seq1)), b.reshape(len(seq2))
+
+
+def _backtrace(m, n, direction):
+    """Return the edit operations, backtracing the directions from (m, n)."""
+    ops = []
+    i = m
+    j = n
+    while i > 0 or j > 0:
+        d = direction(i, j)
+        if d == DELETE:
+            ops.append(("delete", i - 1, j))
+            i -= 1
+        elif d == INSERT:
+            ops.append(("insert", i, j - 1))
+            j -= 1
+        elif d == REPLACE:
+            ops.append(("replace", i - 1, j - 1))
+            i -= 1
+            j -= 1
+        else:
+            i -= 1
+            j -= 1
+    ops.reverse()
+    return ops
+
+
+def _banded_directions(a, b, k):
+    """Compute the packed backtrace directions of the cells |i - j| <= k.
+
+    a and b are integer coded sequences, k must be at least their distance. Then,
+    the cells on the backtrace have the same values and directions as in the full
+    matrix (see Ukkonen, "Algorithms for approximate string matching", 1985), as
+    all cells on an optimal path to a cell of value v are within v diagonals.
+
+    The direction of cell (i, j) is stored at column t = j - i + k of row i, like
+    in _levenshtein_directions().
+    """
+    m = len(a)
+    n = len(b)
+    width = 2 * k + 1
+    P = np.zeros((m + 1, (width + 3) // 4), np.uint8)
+    directions = np.zeros(P.shape[1] * 4, np.uint8)
+    cells = directions.reshape(P.shape[1], 4)
+    d = directions[:width]
+
+    def pack(i):
+        P[i] = cells[:, 0] | cells[:, 1] << 2 | cells[:, 2] << 4 | cells[:, 3] << 6
+
+    # Larger than any distance, for the cells outside of the matrix
+    infinity = m + n + 2
+    offsets = np.arange(width)
+    # b[j - 1] of the cells j = i - k + t of row i is padded[i + t]
+    padded = np.full(max(m, n) + 2 * k + 2, -1, np.int64)
+    padded[k + 1 : k + 1 + n] = b
+
+    # The previous row, with one more cell, for the cells above the last one
+    previous = np.full(width + 1, infinity, np.int64)
+    first = min(n, k)
+    previous[k : k + first + 1] = np.arange(first + 1)
+    d[k + 1 : k + first + 1] = INSERT
+    pack(0)
+    count_rows = instrumentation.enabled()
+    for i in range(1, m + 1):
+        row = np.empty(width + 1, np.int64)
+        r = row[:width]
+        # Same or Substitution
+        np.add(previous[:width], padded[i : i + width] != a[i - 1], out=r)
+        # Deletion
+        np.minimum(r, previous[1:] + 1, out=r)
+        start = max(0, k - i)  # j >= 0
+        stop = min(width, n - i + k + 1)  # j <= n
+        r[:start] = infinity
+        r[stop:] = infinity
+        if i <= k:
+            r[k - i] = i
+        # Insertion, see _levenshtein_matrix_numpy()
+        r -= offsets
+        np.minimum.accumulate(r, out=r)
+        r += offsets
+        r[stop:] = infinity
+        row[width] = infinity
+
+        replace = (previous[:width] + 1 == r).view(np.uint8)
+        insert = np.zeros(width, np.uint8)
+        insert[1:] = r[:-1] + 1 == r[1:]
+        delete = previous[1:] + 1 == r
+        np.minimum(3 - replace, 3 - 2 * insert, out=d)
+        d *= ~delete
+        pack(i)
+
+        previous = row
+        if count_rows:
+            instrumentation.count("dp_cells", max(0, stop - start))
+    return P
+
+
+def _last_row(a, b):
+    """Return the last row of the Levenshtein matrix of the integer coded a and b."""
+    n = len(b)
+    offsets = np.arange(n + 1)
+    previous = np.arange(n + 1)
+    row = np.empty(n + 1, np.int64)
+    for i in range(1, len(a) + 1):
+        row[0] = i
+        np.add(previous[:-1], b != a[i - 1], out=row[1:])
+        np.minimum(row[1:], previous[1:] + 1, out=row[1:])
+        row -= offsets
+        np.minimum.accumulate(row, out=row)
+        row += offsets
+        previous, row = row, previous
+    if instrumentation.enabled():
+        instrumentation.count("dp_cells", len(a) * n)
+    return previous
+
+
+def _seq_editops_linear(a, b, max_memory):
+    """Return the edit operations of the integer coded a and b in linear space.
+
+    This is Hirschberg's algorithm ("A linear space algorithm for computing
+    maximal common subsequences", 1975): a is split in the middle, and b where the
+    sum of the distances of the first halves and of the reversed second halves is
+    minimal. The parts are split again until their direction matrix fits into
+    max_memory bytes.
+    """
+    ops = []
+
+    def align(i0, i1, j0, j1):
+        if i1 - i0 <= 1 or _directions_bytes(i1 - i0, j1 - j0) <= max_memory:
+            # Not cached, the cache would keep more than max_memory bytes
+            _, P = _levenshtein_directions.__wrapped__(
+                tuple(a[i0:i1].tolist()), tuple(b[j0:j1].tolist())
+            )
+
+            def direction(i, j):
+                return int(P[i, j >> 2]) >> 2 * (j & 3) & 3
+
+            for op, i, j in _backtrace(i1 - i0, j1 - j0, direction):
+                ops.append((op, i0 + i, j0 + j))
+            return
+
+        mid = (i0 + i1) // 2
+        forward = _last_row(a[i0:mid], b[j0:j1])
+        backward = _last_row(a[mid:i1][::-1], b[j0:j1][::-1])[::-1]
+        split = j0 + int(np.argmin(forward + backward))
+        align(i0, mid, j0, split)
+        align(mid, i1, split, j1)
+
+    align(0, len(a), 0, len(b))
+    return ops
+
+
+def _seq_editops_matrix(seq1, seq2):
+    """Return the edit operations, backtracing the whole Levenshtein matrix.
+
+    This is the reference implementation for seq_editops().
     """
     seq1 = list(seq1)
     seq2 = list(seq2)
@@ -0,0 +1,224 @@
+import os
+from importlib.util import find_spec
+
+__all__ = ["available_engines", "engine_name", "register_engine", "set_engine"]
+
+# The environment variable selecting the engine, if not selected by set_engine()
+ENGINE_VARIABLE = "DINGLEHOPPER_ENGINE"
+
+# The registered engines: name -> (priority, distance function)
+_engines = {}
+
+# The engine selected by set_engine()
+_selected = None
+
+
+def register_engine(name, distance, priority=0):
+    """Register an edit distance engine.
+
+    distance(a, b) computes the Levenshtein distance of two sequences of integers (the
+    elements of the compared sequences, coded as integers by the caller). Unless
+    an engine is selected, the registered engine with the highest priority is
+    used.
+    """
+    _engines[name] = (priority, distance)
+
+
+def available_engines():
+    """Return the names of the registered engines, the fastest first."""
+    return sorted(_engines, key=lambda name: -_engines[name][0])
+
+
+def set_engine(name):
+    """Select the engine to use, or with None, the default one.
+
+    The default is the engine named by the environment variable
+    DINGLEHOPPER_ENGINE, if set, or the fastest available engine.
+    """
+    global _selected
+    if name is not None:
+        _check_engine(name)
+    _selected = name
+
+
+def engine_name(name=None):
+    """Return the name of the engine to use, name if given."""
+    if name is None:
+        name = _selected or os.environ.get(ENGINE_VARIABLE) or available_engines()[0]
+    _check_engine(name)
+    return name
+
+
+def get_engine(name=None):
+    """Return the distance function of the engine to use, see engine_name()."""
+    return _engines[engine_name(name)][1]
+
+
+def _check_engine(name):
+    if name not in _engines:
+        raise ValueError(
+            'Unknown edit distance engine "{}", must be one of {}'.format(
+                name, ", ".join(available_engines())
+            )
+        )
+
+
+def python_distance(a, b):
+    """Compute the Levenshtein distance, cell by cell in pure Python.
+
+    This is the reference engine.
+    """
+    if a == b:
+        return 0
+
+    # Common prefixes and suffixes do not change the distance
+    start = 0
+    stop_a = len(a)
+    stop_b = len(b)
+    while start < stop_a and start < stop_b and a[start] == b[start]:
+        start += 1
+    while stop_a > start and stop_b > start and a[stop_a - 1] == b[stop_b - 1]:
+        stop_a -= 1
+        stop_b -= 1
+    a = a[start:stop_a]
+    b = b[start:stop_b]
+
+    # The distance is symmetric, keep the rows short
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        left = i
+        for j, y in enumerate(b, 1):
+            left = min(previous[j - 1] + (x != y), left + 1, previous[j] + 1)
+            current.append(left)
+        previous = current
+    return previous[-1]
+
+
+def bitparallel_distance(a, b):
+    """Compute the Levenshtein distance, bit-parallel.
+
+    This is Myers' bit-vector algorithm (Myers, "A fast bit-vector algorithm for
+    approximate string matching based on dynamic programming", 1999, in the
+    formulation of Hyyrö, 2001), using Python integers as bit vectors of the
+    length of a. A column of the DP matrix is computed by a few integer
+    operations.
+    """
+    m = len(a)
+    if m == 0:
+        return len(b)
+
+    # Bit vectors of the positions of each element in a
+    peq = {}
+    for i, c in enumerate(a):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv = mask  # Vertical +1 deltas
+    mv = 0  # Vertical -1 deltas
+    score = m
+    for c in b:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+def numpy_distance(a, b):
+    """Compute the Levenshtein distance row by row, using vectorized operations.
+
+    See edit_distance._levenshtein_matrix_numpy(), this only keeps the last row.
+    """
+    import numpy as np
+
+    if len(a) < len(b):
+        a, b = b, a
+    n = len(b)
+    b = np.array(b, np.int64).reshape(n)
+    offsets = np.arange(n + 1)
+    previous = np.arange(n + 1)
+    row = np.empty(n + 1, np.int64)
+    for i, x in enumerate(a, 1):
+        row[0] = i
+        np.add(previous[:-1], b != x, out=row[1:])
+        np.minimum(row[1:], previous[1:] + 1, out=row[1:])
+        row -= offsets
+        np.minimum.accumulate(row, out=row)
+        row += offsets
+        previous, row = row, previous
+    return int(previous[n])
+
+
+_numba_kernel = None
+
+
+def numba_distance(a, b):
+    """Compute the Levenshtein distance using a kernel compiled by Numba.
+
+    The kernel is compiled when it is used for the first time.
+    """
+    global _numba_kernel
+    import numpy as np
+
+    if _numba_kernel is None:
+        import numba
+
+        @numba.njit(nogil=True)
+        def kernel(a, b):
+            n = len(b)
+            previous = np.arange(n + 1)
+            current = np.empty(n + 1, np.int64)
+            for i in range(1, len(a) + 1):
+                current[0] = i
+                x = a[i - 1]
+                for j in range(1, n + 1):
+                    current[j] = min(
+                        previous[j - 1] + (x != b[j - 1]),
+                        current[j - 1] + 1,
+                        previous[j] + 1,
+                    )
+                previous, current = current, previous
+            return previous[n]
+
+        _numba_kernel = kernel
+
+    if len(a) < len(b):
+        a, b = b, a
+    return int(
+        _numba_kernel(
+            np.array(a, np.int64).reshape(len(a)), np.array(b, np.int64).reshape(len(b))
+        )
+    )
+
+
+def rapidfuzz_distance(a, b):
+    """Compute the Levenshtein distance using RapidFuzz (a C++ library)."""
+    from rapidfuzz.distance import Levenshtein
+
+    return Levenshtein.distance(a, b)
+
+
+register_engine("python", python_distance, 0)
+register_engine("numpy", numpy_distance, 10)
+register_engine("bitparallel", bitparallel_distance, 20)
+# The optional engines are only imported when used, to keep the startup fast
+if find_spec("numba") is not None:
+    register_engine("numba", numba_distance, 30)
+if find_spec("rapidfuzz") is not None:
+    register_engine("rapidfuzz", rapidfuzz_distance, 40)
@@ -6,9 +6,7 @@ from itertools import repeat
 from typing import Optional
 
 import attr
-import numpy as np
 from lxml import etree as ET
-from ocrd_utils import getLogger
 
 
 class Normalization(enum.Enum):
@@ -239,10 +237,16 @@ def get_textequiv_unicode(text_segment, nsmap) -> str:
 
 def get_first_textequiv(textequivs, segment_id):
     """Get the first TextEquiv based on index or conf order if index is not present."""
-    log = getLogger("processor.OcrdDinglehopperEvaluate")
     if len(textequivs) == 1:
         return textequivs[0]
 
+    # Only import these for the rare case of multiple TextEquivs, see the startup
+    # time test in test_import_time
+    import numpy as np
+    from ocrd_utils import getLogger
+
+    log = getLogger("processor.OcrdDinglehopperEvaluate")
+
     # try ordering by index
     indices = np.array([get_attr(te, "index") for te in textequivs], dtype=float)
     nan_mask = np.isnan(indices)
@@ -270,10 +274,10 @@ def get_attr(te, attr_name) -> float:
     """Extract the attribute for the given name.
 
     Note: currently only handles numeric values!
-    Other or non existend values are encoded as np.nan.
+    Other or non existend values are encoded as NaN.
     """
     attr_value = te.attrib.get(attr_name)
     try:
         return float(attr_value)
     except TypeError:
-        return np.nan
+        return float("nan")
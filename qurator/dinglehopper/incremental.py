@@ -0,0 +1,173 @@
+import json
+import os
+import tempfile
+import unicodedata
+
+from uniseg.graphemecluster import grapheme_clusters
+
+from . import instrumentation
+from .align import seq_align
+from .edit_distance import levenshtein_banded
+from .pair_cache import pair_key
+from .word_error_rate import words_normalized
+
+CACHE_VERSION = 1
+
+# The alignment levels, with the function splitting a line into its elements
+LEVELS = {
+    "characters": lambda text: grapheme_clusters(unicodedata.normalize("NFC", text)),
+    "words": words_normalized,
+}
+
+
+class LineCache:
+    """The per-line alignments of a previous run.
+
+    The alignments are stored by a hash of the level and the GT and OCR line, so
+    changed lines simply miss the cache. save() only keeps the lines used since
+    loading, i.e. those of the current run.
+
+    Lines missing the cache are looked up in pair_cache (a PairCache shared with
+    other documents, see pair_cache), if given.
+    """
+
+    def __init__(self, lines=None, pages=None, pair_cache=None):
+        self.lines = lines or {}
+        self.pair_cache = pair_cache
+        self.pages = set(pages or ())
+        self.used_lines = {}
+        self.used_pages = set()
+
+    @classmethod
+    def load(cls, filename, pair_cache=None):
+        """Load the cache file, or return an empty cache if there is none."""
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(pair_cache=pair_cache)
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return cls(pair_cache=pair_cache)
+        return cls(data["lines"], data["pages"], pair_cache)
+
+    def save(self, filename):
+        """Save the cache file, atomically replacing an existing one."""
+        data = {
+            "version": CACHE_VERSION,
+            "lines": self.used_lines,
+            "pages": sorted(self.used_pages),
+        }
+        fd, tmp_filename = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(filename)), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_filename, filename)
+        except BaseException:
+            os.unlink(tmp_filename)
+            raise
+
+    def line_alignment(self, level, gt_line, ocr_line, max_memory=None):
+        """Return the alignment of a line, computing it if it is not cached.
+
+        With max_memory, the alignment takes at most max_memory bytes, see
+        seq_align().
+        """
+        key = pair_key(level, gt_line, ocr_line)
+        alignment = self.lines.get(key)
+        if alignment is None:
+            instrumentation.count("incremental_line_cache_misses")
+            alignment = self._line_alignment(level, gt_line, ocr_line, max_memory)
+            self.lines[key] = alignment
+        else:
+            instrumentation.count("incremental_line_cache_hits")
+            alignment = [tuple(pair) for pair in alignment]
+        self.used_lines[key] = alignment
+        return alignment
+
+    def _line_alignment(self, level, gt_line, ocr_line, max_memory):
+        kind = "alignment_" + level
+        if self.pair_cache is not None:
+            alignment = self.pair_cache.get(kind, gt_line, ocr_line)
+            if alignment is not None:
+                return [tuple(pair) for pair in alignment]
+
+        split = LEVELS[level]
+        alignment = list(
+            seq_align(list(split(gt_line)), list(split(ocr_line)), max_memory)
+        )
+        if self.pair_cache is not None:
+            self.pair_cache.put(kind, gt_line, ocr_line, alignment)
+        return alignment
+
+    def page_alignment(self, level, gt, ocr, max_memory=None):
+        """Return the alignment of a page, assembled from its line alignments.
+
+        The page alignment is only assembled from the line alignments if the GT and
+        OCR have the same number of lines, and if the assembled alignment is an
+        optimal one, i.e. its cost is the Levenshtein distance of GT and OCR. This
+        is checked by a banded computation of the distance (limited to the cost of
+        the assembled alignment), which is much cheaper than computing the
+        alignment for the whole page. Otherwise, e.g. if the OCR merged lines, the
+        alignment is computed for the whole page.
+
+        With max_memory, each alignment takes at most max_memory bytes, see
+        seq_align().
+        """
+        gt_lines = gt.split("\n")
+        ocr_lines = ocr.split("\n")
+        # "\r\n" is one grapheme cluster, so do not split it
+        if len(gt_lines) == len(ocr_lines) and "\r" not in gt + ocr:
+            alignment = []
+            for k, (gt_line, ocr_line) in enumerate(zip(gt_lines, ocr_lines)):
+                if k > 0 and level == "characters":
+                    alignment.append(("\n", "\n"))
+                alignment.extend(
+                    self.line_alignment(level, gt_line, ocr_line, max_memory)
+                )
+
+            page_key = pair_key(level, gt, ocr)
+            if page_key in self.pages:
+                # Already checked in a previous run
+                self.used_pages.add(page_key)
+                return alignment
+            cost = sum(1 for g, o in alignment if g != o)
+            gt_seq = [g for g, _ in alignment if g is not None]
+            ocr_seq = [o for _, o in alignment if o is not None]
+            if levenshtein_banded(gt_seq, ocr_seq, cost) == cost:
+                self.used_pages.add(page_key)
+                return alignment
+
+        instrumentation.count("incremental_page_fallbacks", level=level)
+        split = LEVELS[level]
+        return list(seq_align(list(split(gt)), list(split(ocr)), max_memory))
+
+
+def incremental_alignments(gt_text, ocr_text, cache, max_memory=None):
+    """Return the character and word alignment of GT and OCR using the line cache.
+
+    GT and OCR are ExtractedTexts. See LineCache.page_alignment() for when the
+    page alignment is assembled from the line alignments, in this case it may
+    differ from the alignment computed for the whole page in the choice between
+    alignments of the same cost, but the error rates are the same.
+    """
+    return tuple(
+        cache.page_alignment(level, gt_text.text, ocr_text.text, max_memory)
+        for level in ("characters", "words")
+    )
+
+
+def alignment_error_rate_n(alignment):
+    """Return the error rate of an alignment and the length of the reference.
+
+    This is the same as character_error_rate_n() and word_error_rate_n() for the
+    alignments of characters and words.
+    """
+    d = sum(1 for g, o in alignment if g != o)
+    n = sum(1 for g, _ in alignment if g is not None)
+    if d == 0:
+        return 0, n
+    if n == 0:
+        return float("inf"), n
+    return d / n, n
@@ -0,0 +1,156 @@
+import os
+import tempfile
+from collections import OrderedDict
+
+# Registered listeners, see add_listener()
+_listeners = []
+
+
+def add_listener(listener):
+    """Register a listener for the instrumentation events.
+
+    A listener has the methods count(name, value, labels) and timing(name,
+    seconds, labels), see Listener.
+    """
+    _listeners.append(listener)
+
+
+def remove_listener(listener):
+    """Unregister a listener registered with add_listener()."""
+    _listeners.remove(listener)
+
+
+def enabled():
+    """Check if there are listeners.
+
+    Instrumented code may use this to skip collecting data nobody listens to.
+    """
+    return bool(_listeners)
+
+
+def count(name, value=1, **labels):
+    """Increase the counter with the given name (and labels) by value."""
+    for listener in _listeners:
+        listener.count(name, value, labels)
+
+
+def timing(name, seconds, **labels):
+    """Report a duration in seconds, e.g. the wall time of a stage."""
+    for listener in _listeners:
+        listener.timing(name, seconds, labels)
+
+
+class Listener:
+    """Base class for listeners, ignoring all events."""
+
+    def count(self, name, value, labels):
+        pass
+
+    def timing(self, name, seconds, labels):
+        pass
+
+    def __enter__(self):
+        add_listener(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        remove_listener(self)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class Counters(Listener):
+    """Accumulate the counters and timings.
+
+    counters maps (name, labels) to the sum of the counts, timings maps (name,
+    labels) to [number of timings, sum of seconds]. labels is a sorted tuple of
+    (label, value) pairs.
+    """
+
+    def __init__(self):
+        self.counters = OrderedDict()
+        self.timings = OrderedDict()
+
+    def count(self, name, value, labels):
+        key = _key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def timing(self, name, seconds, labels):
+        key = _key(name, labels)
+        timing = self.timings.setdefault(key, [0, 0.0])
+        timing[0] += 1
+        timing[1] += seconds
+
+    def get(self, name, **labels):
+        """Return the current value of a counter."""
+        return self.counters.get(_key(name, labels), 0)
+
+
+def _prometheus_labels(labels):
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(
+            '{}="{}"'.format(
+                label,
+                str(value)
+                .replace("\\", "\\\\")
+                .replace('"', '\\"')
+                .replace("\n", "\\n"),
+            )
+            for label, value in labels
+        )
+        + "}"
+    )
+
+
+def prometheus_text(counters, prefix="dinglehopper_"):
+    """Format the Counters in the Prometheus text exposition format.
+
+    Counters become counters named PREFIX + NAME + "_total", timings become
+    summaries named PREFIX + NAME + "_seconds". The samples are grouped by metric
+    family, each family has one TYPE line.
+    """
+    lines = []
+
+    # The samples of a metric family must follow its TYPE line, so sort by name.
+    # The sort is stable, the samples of a family keep their order.
+    def by_name(item):
+        (name, labels), value = item
+        return name
+
+    metric = None
+    for (name, labels), value in sorted(counters.counters.items(), key=by_name):
+        if metric != prefix + name + "_total":
+            metric = prefix + name + "_total"
+            lines.append("# TYPE {} counter".format(metric))
+        lines.append("{}{} {}".format(metric, _prometheus_labels(labels), value))
+    for (name, labels), (n, seconds) in sorted(counters.timings.items(), key=by_name):
+        if metric != prefix + name + "_seconds":
+            metric = prefix + name + "_seconds"
+            lines.append("# TYPE {} summary".format(metric))
+        lines.append(
+            "{}_sum{} {!r}".format(metric, _prometheus_labels(labels), seconds)
+        )
+        lines.append("{}_count{} {}".format(metric, _prometheus_labels(labels), n))
+    return "".join(line + "\n" for line in lines)
+
+
+def write_prometheus_textfile(counters, filename, prefix="dinglehopper_"):
+    """Write the Counters to a file for the Prometheus node exporter.
+
+    The file is replaced atomically, so the textfile collector never reads a
+    partially written file. Its name should end in ".prom".
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_filename = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(prometheus_text(counters, prefix))
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        os.unlink(tmp_filename)
+        raise
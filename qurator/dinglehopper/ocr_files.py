@@ -1,5 +1,7 @@
 from __future__ import division, print_function
 
+import io
+import os
 from typing import Iterator
 from warnings import warn
 import sys
@@ -7,6 +9,7 @@ import sys
 from lxml import etree as ET
 from lxml.etree import XMLSyntaxError
 
+from . import instrumentation
 from .extracted_text import ExtractedText, normalize_sbb
 
 
@@ -126,15 +129,19 @@ def page_text(tree, *, textequiv_level="region"):
 
 def plain_extract(filename):
     with open(filename, "r") as f:
-        return ExtractedText(
-            None,
-            [
-                ExtractedText("line %d" % no, None, None, normalize_sbb(line))
-                for no, line in enumerate(f.readlines())
-            ],
-            "\n",
-            None,
-        )
+        return plain_extract_lines(f.readlines())
+
+
+def plain_extract_lines(lines):
+    return ExtractedText(
+        None,
+        [
+            ExtractedText("line %d" % no, None, None, normalize_sbb(line))
+            for no, line in enumerate(lines)
+        ],
+        "\n",
+        None,
+    )
     # XXX hardcoded SBB normalization
 
 
@@ -147,13 +154,47 @@ def extract(filename, *, textequiv_level="region"):
 
     Supports PAGE, ALTO and falls back to plain text.
     """
+    if instrumentation.enabled():
+        instrumentation.count("bytes_parsed", os.path.getsize(filename))
     try:
         tree = ET.parse(filename)
     except XMLSyntaxError:
+        instrumentation.count("files_parsed", format="text")
         return plain_extract(filename)
+    return extract_tree(tree, textequiv_level=textequiv_level)
+
+
+def extract_string(data, *, textequiv_level="region"):
+    """Extract the text from the given document contents (bytes or str).
+
+    Like extract(), but without reading a file. Supports PAGE, ALTO and falls back
+    to plain text, bytes are decoded as UTF-8 then.
+    """
+    if isinstance(data, str):
+        data_bytes = data.encode("utf-8")
+    else:
+        data_bytes = data
+    if instrumentation.enabled():
+        instrumentation.count("bytes_parsed", len(data_bytes))
+    try:
+        tree = ET.ElementTree(ET.fromstring(data_bytes))
+    except XMLSyntaxError:
+        instrumentation.count("files_parsed", format="text")
+        if not isinstance(data, str):
+            data = data.decode("utf-8")
+        # Read the lines like a file opened in text mode would
+        return plain_extract_lines(io.StringIO(data, newline=None).readlines())
+    return extract_tree(tree, textequiv_level=textequiv_level)
+
+
+def extract_tree(tree, *, textequiv_level="region"):
+    """Extract the text from the given PAGE or ALTO ElementTree."""
     try:
-        return page_extract(tree, textequiv_level=textequiv_level)
+        result = page_extract(tree, textequiv_level=textequiv_level)
+        instrumentation.count("files_parsed", format="page")
+        return result
     except ValueError:
+        instrumentation.count("files_parsed", format="alto")
         return alto_extract(tree)
 
 
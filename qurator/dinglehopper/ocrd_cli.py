@@ -1,5 +1,6 @@
 import json
 import os
+from contextlib import ExitStack
 
 import click
 from ocrd import Processor
@@ -7,8 +8,12 @@ from ocrd.decorators import ocrd_cli_options, ocrd_cli_wrap_processor
 from ocrd_utils import getLogger, make_file_id, assert_file_grp_cardinality
 from pkg_resources import resource_string
 
-from .cli import process as cli_process
+from . import instrumentation
+from .cli import parse_size, process as cli_process
 from .edit_distance import levenshtein_matrix_cache_clear
+from .engines import set_engine
+from .pair_cache import SharedPairCache
+from .progress import Progress, estimate_cost
 
 OCRD_TOOL = json.loads(resource_string(__name__, "ocrd-tool.json").decode("utf8"))
 
@@ -32,50 +37,111 @@ class OcrdDinglehopperEvaluate(Processor):
 
         metrics = self.parameter["metrics"]
         textequiv_level = self.parameter["textequiv_level"]
+        diff_context = self.parameter["diff_context"]
+        if diff_context < 0:
+            diff_context = None
+        lazy_html = self.parameter["lazy_html"]
+        metrics_only = self.parameter["metrics_only"]
+        profile = self.parameter["profile"]
+        incremental = self.parameter["incremental"]
+        processes = self.parameter["processes"]
+        max_memory = None
+        if self.parameter["max_memory"]:
+            max_memory = parse_size(self.parameter["max_memory"])
+        set_engine(self.parameter["engine"] or None)
+        progress = self.parameter["progress"]
+        prometheus_textfile = self.parameter["prometheus_textfile"]
+        counters = instrumentation.Counters()
         gt_grp, ocr_grp = self.input_file_grp.split(",")
 
-        input_file_tuples = self.zip_input_files(on_error='abort')
-        for n, (gt_file, ocr_file) in enumerate(input_file_tuples):
+        input_files = self._input_files()
+        costs = None
+        if progress:
+            # Download all files first, to estimate the cost of the pages for the ETA
+            input_files = list(input_files)
+            costs = [
+                estimate_cost(gt_file.local_filename, ocr_file.local_filename)
+                for _, gt_file, ocr_file in input_files
+            ]
+
+        with ExitStack() as stack:
+            if prometheus_textfile:
+                stack.enter_context(counters)
+            pair_cache = None
+            if self.parameter["pair_cache"]:
+                pair_cache = stack.enter_context(
+                    SharedPairCache(self.parameter["pair_cache"])
+                )
+            page_progress = stack.enter_context(
+                Progress(
+                    pages=len(costs) if costs is not None else None,
+                    cost=sum(costs) if costs is not None else None,
+                    enabled=progress,
+                )
+            )
+
+            for k, (n, gt_file, ocr_file) in enumerate(input_files):
+                page_id = gt_file.pageId
+
+                log.info("INPUT FILES %i / %s↔ %s", n, gt_file, ocr_file)
+
+                file_id = make_file_id(ocr_file, self.output_file_grp)
+                report_prefix = os.path.join(self.output_file_grp, file_id)
+
+                # Process the files
+                try:
+                    os.mkdir(self.output_file_grp)
+                except FileExistsError:
+                    pass
+                cli_process(
+                    gt_file.local_filename,
+                    ocr_file.local_filename,
+                    report_prefix,
+                    metrics=metrics,
+                    textequiv_level=textequiv_level,
+                    diff_context=diff_context,
+                    lazy_html=lazy_html,
+                    metrics_only=metrics_only,
+                    profile=profile,
+                    incremental=incremental,
+                    pair_cache=pair_cache,
+                    processes=processes,
+                    max_memory=max_memory,
+                )
+
+                # Add reports to the workspace
+                reports = [[".html", "text/html"], [".json", "application/json"]]
+                if metrics_only:
+                    reports = reports[1:]
+                for report_suffix, mimetype in reports:
+                    self.workspace.add_file(
+                        ID=file_id + report_suffix,
+                        file_grp=self.output_file_grp,
+                        pageId=page_id,
+                        mimetype=mimetype,
+                        local_filename=report_prefix + report_suffix,
+                    )
+
+                # Clear cache between files
+                levenshtein_matrix_cache_clear()
+
+                page_progress.page_done(costs[k] if costs is not None else 0)
+
+                if prometheus_textfile:
+                    instrumentation.write_prometheus_textfile(
+                        counters, prometheus_textfile
+                    )
+
+    def _input_files(self):
+        """Yield the page number and the downloaded GT and OCR file of each page."""
+        for n, (gt_file, ocr_file) in enumerate(self.zip_input_files(on_error="abort")):
             if not gt_file or not ocr_file:
                 # file/page was not found in this group
                 continue
             gt_file = self.workspace.download_file(gt_file)
             ocr_file = self.workspace.download_file(ocr_file)
-            page_id = gt_file.pageId
-
-            log.info("INPUT FILES %i / %s↔ %s", n, gt_file, ocr_file)
-
-            file_id = make_file_id(ocr_file, self.output_file_grp)
-            report_prefix = os.path.join(self.output_file_grp, file_id)
-
-            # Process the files
-            try:
-                os.mkdir(self.output_file_grp)
-            except FileExistsError:
-                pass
-            cli_process(
-                gt_file.local_filename,
-                ocr_file.local_filename,
-                report_prefix,
-                metrics=metrics,
-                textequiv_level=textequiv_level,
-            )
-
-            # Add reports to the workspace
-            for report_suffix, mimetype in [
-                [".html", "text/html"],
-                [".json", "application/json"],
-            ]:
-                self.workspace.add_file(
-                    ID=file_id + report_suffix,
-                    file_grp=self.output_file_grp,
-                    pageId=page_id,
-                    mimetype=mimetype,
-                    local_filename=report_prefix + report_suffix,
-                )
+            yield n, gt_file, ocr_file
 
-            # Clear cache between files
-            levenshtein_matrix_cache_clear()
 
 if __name__ == "__main__":
     ocrd_dinglehopper()
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+
+from . import instrumentation
+
+__all__ = ["PairCache", "SharedPairCache"]
+
+
+class PairCache:
+    """Bounded in-memory cache of results for (GT, OCR) line pairs.
+
+    Running headers, page numbers and boilerplate repeat across documents, so the
+    same line pairs are compared again and again. The results (e.g. distances or
+    alignments, as JSON-compatible values) are stored by the kind of result and
+    a hash of the pair. At most max_entries results are kept, evicting the least
+    recently used ones.
+
+    The hits and misses are counted in the attributes hits and misses and
+    reported to the instrumentation listeners as pair_cache_hits/_misses with the
+    label kind.
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, kind, gt, ocr):
+        """Return the cached result for the pair, or None."""
+        value = self._get(pair_key(kind, gt, ocr))
+        if value is None:
+            self.misses += 1
+            instrumentation.count("pair_cache_misses", kind=kind)
+        else:
+            self.hits += 1
+            instrumentation.count("pair_cache_hits", kind=kind)
+        return value
+
+    def put(self, kind, gt, ocr, value):
+        """Cache the result for the pair."""
+        self._put(pair_key(kind, gt, ocr), value)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """Return the hit statistics as a JSON-compatible dict."""
+        return OrderedDict(
+            [
+                ("hits", self.hits),
+                ("misses", self.misses),
+                ("hit_rate", self.hit_rate()),
+            ]
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key):
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            return None
+        return self._entries[key]
+
+    def _put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SharedPairCache(PairCache):
+    """PairCache stored in an SQLite database, shared by processes and runs.
+
+    Each process (e.g. each worker of a process pool) opens its own
+    SharedPairCache on the same database file. Results are stored as JSON. When
+    the database has grown beyond max_entries, the least recently used tenth of
+    the entries is evicted.
+    """
+
+    # Number of puts between the checks of the database size
+    PRUNE_INTERVAL = 1000
+
+    def __init__(self, path, max_entries=100000, timeout=30.0):
+        super().__init__(max_entries)
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=timeout)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS pairs"
+                " (key TEXT PRIMARY KEY, value TEXT NOT NULL, used REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS pairs_used ON pairs (used)"
+            )
+        self._puts = 0
+
+    def _get(self, key):
+        with self._connection:
+            row = self._connection.execute(
+                "SELECT value FROM pairs WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE pairs SET used = ? WHERE key = ?", (time.time(), key)
+            )
+        return json.loads(row[0])
+
+    def _put(self, key, value):
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO pairs (key, value, used) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time()),
+            )
+        self._puts += 1
+        if self._puts % self.PRUNE_INTERVAL == 0:
+            self.prune()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM pairs").fetchone()[0]
+
+    def prune(self):
+        """Evict the least recently used entries if there are too many."""
+        with self._connection:
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                self._connection.execute(
+                    "DELETE FROM pairs WHERE key IN"
+                    " (SELECT key FROM pairs ORDER BY used LIMIT ?)",
+                    (excess + self.max_entries // 10,),
+                )
+
+    def close(self):
+        self._connection.close()
+
+
+def pair_key(kind, gt, ocr):
+    """Return the cache key of a result for a (GT, OCR) pair."""
+    data = json.dumps([kind, gt, ocr], ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
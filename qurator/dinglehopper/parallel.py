@@ -0,0 +1,182 @@
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from multiprocessing import Pool
+
+from uniseg.graphemecluster import grapheme_clusters
+
+from . import instrumentation
+from .align import seq_align
+from .edit_distance import levenshtein_bitparallel
+from .word_error_rate import words_normalized
+
+# Minimum number of grapheme clusters of a word to be used as an anchor
+MIN_ANCHOR_LENGTH = 4
+
+
+def unique_anchors(keys1, keys2):
+    """Match the keys occurring exactly once in both sequences.
+
+    Returns the (i, j) positions of the matched keys, keys1[i] == keys2[j], that
+    are in the same order in both sequences, keeping as many as possible (the
+    longest increasing subsequence of the matches, as in the patience diff).
+    None keys are ignored.
+    """
+    count1 = Counter(k for k in keys1 if k is not None)
+    count2 = Counter(k for k in keys2 if k is not None)
+    position2 = {k: j for j, k in enumerate(keys2) if count2.get(k) == 1}
+    matches = [
+        (i, position2[k])
+        for i, k in enumerate(keys1)
+        if count1.get(k) == 1 and k in position2
+    ]
+
+    # Longest increasing subsequence of the j's
+    tails = []  # j of the last match of the best subsequence of each length
+    tail_indices = []
+    predecessors = []
+    for index, (_, j) in enumerate(matches):
+        length = bisect_left(tails, j)
+        predecessors.append(tail_indices[length - 1] if length > 0 else None)
+        if length == len(tails):
+            tails.append(j)
+            tail_indices.append(index)
+        else:
+            tails[length] = j
+            tail_indices[length] = index
+    anchors = []
+    index = tail_indices[-1] if tail_indices else None
+    while index is not None:
+        anchors.append(matches[index])
+        index = predecessors[index]
+    return anchors[::-1]
+
+
+def word_tokens(graphemes):
+    """Split grapheme clusters into words at whitespace.
+
+    Returns (start, stop) spans of the words, for finding anchors in grapheme
+    sequences.
+    """
+    tokens = []
+    start = None
+    for k, g in enumerate(graphemes):
+        if g.isspace():
+            if start is not None:
+                tokens.append((start, k))
+                start = None
+        elif start is None:
+            start = k
+    if start is not None:
+        tokens.append((start, len(graphemes)))
+    return tokens
+
+
+def anchored_blocks(seq1, seq2, tokens1, tokens2, min_anchor_length=1):
+    """Split the alignment of two sequences at anchors.
+
+    The anchors are tokens, given as (start, stop) spans of the sequences, that
+    are identical and unique in both sequences, see unique_anchors(). Returns a
+    list of (start1, stop1, start2, stop2, is_anchor) spans covering both
+    sequences, alternating between the blocks to align and the anchors.
+    """
+
+    def keys(seq, tokens):
+        return [
+            tuple(seq[start:stop]) if stop - start >= min_anchor_length else None
+            for start, stop in tokens
+        ]
+
+    blocks = []
+    pos1 = 0
+    pos2 = 0
+    for t1, t2 in unique_anchors(keys(seq1, tokens1), keys(seq2, tokens2)):
+        start1, stop1 = tokens1[t1]
+        start2, stop2 = tokens2[t2]
+        if start1 > pos1 or start2 > pos2:
+            blocks.append((pos1, start1, pos2, start2, False))
+        blocks.append((start1, stop1, start2, stop2, True))
+        pos1 = stop1
+        pos2 = stop2
+    if pos1 < len(seq1) or pos2 < len(seq2):
+        blocks.append((pos1, len(seq1), pos2, len(seq2), False))
+    return blocks
+
+
+def parallel_seq_align(
+    seq1, seq2, tokens1, tokens2, pool, min_anchor_length=1, max_memory=None
+):
+    """Align two sequences, splitting the alignment at anchors.
+
+    The blocks between the anchors (see anchored_blocks()) are aligned in the
+    given multiprocessing pool and stitched together. As the stitched alignment is
+    not necessarily optimal, its cost is compared to the distance of the whole
+    sequences, computed in parallel by levenshtein_bitparallel(). If they differ,
+    the sequences are aligned as a whole, so the result is always an optimal
+    alignment. It may differ from the alignment of seq_align() in the choice
+    between alignments of the same cost.
+
+    With max_memory, each alignment, of a block or of the whole sequences, takes
+    at most max_memory bytes, see seq_align().
+    """
+    seq1 = list(seq1)
+    seq2 = list(seq2)
+    distance = pool.apply_async(levenshtein_bitparallel, (seq1, seq2))
+
+    blocks = anchored_blocks(seq1, seq2, tokens1, tokens2, min_anchor_length)
+    to_align = [
+        (seq1[start1:stop1], seq2[start2:stop2], max_memory)
+        for start1, stop1, start2, stop2, is_anchor in blocks
+        if not is_anchor
+    ]
+    aligned = iter(pool.imap(_align_block, to_align))
+
+    alignment = []
+    for start1, stop1, start2, stop2, is_anchor in blocks:
+        if is_anchor:
+            alignment.extend(zip(seq1[start1:stop1], seq2[start2:stop2]))
+        else:
+            alignment.extend(next(aligned))
+
+    cost = sum(1 for g, o in alignment if g != o)
+    if cost != distance.get():
+        instrumentation.count("parallel_fallbacks")
+        alignment = list(seq_align(seq1, seq2, max_memory))
+    return alignment
+
+
+def parallel_alignments(gt_text, ocr_text, processes, max_memory=None):
+    """Return the character and word alignment of GT and OCR, using processes.
+
+    Grapheme clusters are anchored at unique words of at least MIN_ANCHOR_LENGTH
+    grapheme clusters, words at unique words. See parallel_seq_align(), also for
+    max_memory.
+    """
+    gt_graphemes = list(grapheme_clusters(unicodedata.normalize("NFC", gt_text.text)))
+    ocr_graphemes = list(grapheme_clusters(unicodedata.normalize("NFC", ocr_text.text)))
+    gt_words = list(words_normalized(gt_text))
+    ocr_words = list(words_normalized(ocr_text))
+    with Pool(processes) as pool:
+        character_alignment = parallel_seq_align(
+            gt_graphemes,
+            ocr_graphemes,
+            word_tokens(gt_graphemes),
+            word_tokens(ocr_graphemes),
+            pool,
+            MIN_ANCHOR_LENGTH,
+            max_memory,
+        )
+        word_alignment = parallel_seq_align(
+            gt_words,
+            ocr_words,
+            [(k, k + 1) for k in range(len(gt_words))],
+            [(k, k + 1) for k in range(len(ocr_words))],
+            pool,
+            max_memory=max_memory,
+        )
+    return character_alignment, word_alignment
+
+
+def _align_block(block):
+    seq1, seq2, max_memory = block
+    return list(seq_align(seq1, seq2, max_memory))
@@ -0,0 +1,123 @@
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from . import instrumentation
+
+
+class Profile(instrumentation.Listener):
+    """Measure the stages of a comparison.
+
+    For each stage, the wall time, the CPU time of the process and, with
+    trace_memory, the peak memory traced by tracemalloc are recorded. While the
+    profile is active (as a context manager), it also counts the DP matrix cells
+    computed by the edit distance.
+
+    A disabled profile measures nothing, so the code to profile does not need to
+    distinguish between profiling or not.
+
+    The wall time of each stage is also reported to the instrumentation listeners
+    as the timing "stage" with the label stage=NAME, enabled or not.
+    """
+
+    def __init__(self, enabled=True, trace_memory=True):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.stages = OrderedDict()
+        self.info = OrderedDict()
+        self.dp_cells = 0
+
+    def __enter__(self):
+        if self.enabled:
+            instrumentation.add_listener(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.enabled:
+            instrumentation.remove_listener(self)
+
+    def count(self, name, value, labels):
+        if name == "dp_cells":
+            self.dp_cells += value
+
+    @contextmanager
+    def stage(self, name):
+        """Measure the stage with the given name (as a context manager)."""
+        if not self.enabled:
+            if not instrumentation.enabled():
+                yield
+                return
+            wall_start = time.perf_counter()
+            try:
+                yield
+            finally:
+                instrumentation.timing(
+                    "stage", time.perf_counter() - wall_start, stage=name
+                )
+            return
+
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            elif hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            measurements = OrderedDict()
+            measurements["wall_seconds"] = time.perf_counter() - wall_start
+            measurements["cpu_seconds"] = time.process_time() - cpu_start
+            if self.trace_memory:
+                measurements["peak_memory"] = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            self.stages[name] = measurements
+            instrumentation.timing("stage", measurements["wall_seconds"], stage=name)
+
+    def to_json(self):
+        """Return the measurements as a JSON-compatible dict.
+
+        The stages are a list of the measurements of each stage, in order, with the
+        name of the stage in "name".
+        """
+        result = OrderedDict()
+        result["stages"] = [
+            OrderedDict([("name", name)] + list(measurements.items()))
+            for name, measurements in self.stages.items()
+        ]
+        result.update(self.info)
+        result["dp_cells"] = self.dp_cells
+        return result
+
+
+def summarize_profiles(profiles):
+    """Aggregate the profiles of several reports (as loaded from JSON).
+
+    Times, sequence lengths and DP cells are summed, peak memory is the maximum.
+    """
+    summary = OrderedDict()
+    summary["num_profiles"] = 0
+    stages = OrderedDict()
+    for profile in profiles:
+        summary["num_profiles"] += 1
+        for measurements in profile["stages"]:
+            stage = stages.setdefault(
+                measurements["name"], OrderedDict(name=measurements["name"])
+            )
+            for key, value in measurements.items():
+                if key == "name":
+                    continue
+                elif key == "peak_memory":
+                    stage[key] = max(stage.get(key, 0), value)
+                else:
+                    stage[key] = stage.get(key, 0) + value
+        for key, value in profile.items():
+            if key != "stages":
+                summary[key] = summary.get(key, 0) + value
+    summary["stages"] = list(stages.values())
+    return summary
@@ -0,0 +1,204 @@
+import os
+import sys
+import threading
+import time
+from multiprocessing import Queue
+
+from . import instrumentation
+
+
+def estimate_cost(gt, ocr):
+    """Estimate the relative cost of comparing the files GT and OCR.
+
+    The edit distance dominates the cost for larger pages, so this is the product
+    of the file sizes, proportional to the number of DP matrix cells. The estimate
+    is only meaningful relative to the estimates of other pages.
+    """
+    return max(os.path.getsize(gt), 1) * max(os.path.getsize(ocr), 1)
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return "{}:{:02d}:{:02d}".format(hours, minutes, seconds)
+
+
+class Progress(instrumentation.Listener):
+    """Report the progress of comparing a batch of pages.
+
+    The caller reports each page done using page_done(), with the cost estimated
+    by estimate_cost() before processing. The ETA is extrapolated from the
+    estimated cost of the pages done and the total cost. The grapheme clusters
+    compared and the DP matrix cells computed are counted from the
+    instrumentation events while the progress is active (as a context manager),
+    so that progress is also visible during long pages.
+
+    The progress line is written to file (default: stderr) at most every
+    min_interval seconds.
+
+    For worker processes, use worker_queue() and WorkerProgress.
+
+    A disabled progress reports nothing, like a disabled profiling.Profile.
+    """
+
+    def __init__(
+        self, pages=None, cost=None, *, enabled=True, file=None, min_interval=0.5
+    ):
+        self.enabled = enabled
+        self.pages_total = pages
+        self.cost_total = cost
+        self.file = file if file is not None else sys.stderr
+        self.min_interval = min_interval
+
+        self.pages = 0
+        self.cost = 0
+        self.graphemes = 0
+        self.dp_cells = 0
+        self.start_time = time.monotonic()
+        self._last_report = None
+        self._lock = threading.Lock()
+        self._queue = None
+        self._queue_thread = None
+        self._pid = os.getpid()
+
+    def __enter__(self):
+        self.start_time = time.monotonic()
+        if self.enabled:
+            instrumentation.add_listener(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.enabled:
+            instrumentation.remove_listener(self)
+        self.close()
+
+    def count(self, name, value, labels):
+        if os.getpid() != self._pid:
+            # Inherited by a forked worker process, see WorkerProgress
+            return
+        if name == "graphemes":
+            self.update(graphemes=value)
+        elif name == "dp_cells":
+            self.update(dp_cells=value)
+
+    def page_done(self, cost=0):
+        """Report a page as done, with its estimated cost."""
+        self.update(pages=1, cost=cost)
+
+    def update(self, pages=0, cost=0, graphemes=0, dp_cells=0):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.pages += pages
+            self.cost += cost
+            self.graphemes += graphemes
+            self.dp_cells += dp_cells
+
+            now = time.monotonic()
+            if (
+                self._last_report is None
+                or now - self._last_report >= self.min_interval
+            ):
+                self._last_report = now
+                self._report(now)
+
+    def eta(self, now=None):
+        """Estimate the remaining time in seconds, None if unknown."""
+        elapsed = (now or time.monotonic()) - self.start_time
+        if self.cost_total and self.cost:
+            done = self.cost / self.cost_total
+        elif self.pages_total and self.pages:
+            done = self.pages / self.pages_total
+        else:
+            return None
+        return elapsed * (1 - done) / done
+
+    def status(self, now=None):
+        """Return the progress line."""
+        now = now or time.monotonic()
+        elapsed = max(now - self.start_time, 1e-9)
+        if self.pages_total is not None:
+            pages = "{}/{} pages".format(self.pages, self.pages_total)
+        else:
+            pages = "{} pages".format(self.pages)
+        parts = [
+            pages,
+            "{:.0f} graphemes/s".format(self.graphemes / elapsed),
+            "{:.3g} DP cells/s".format(self.dp_cells / elapsed),
+            "elapsed {}".format(format_duration(elapsed)),
+        ]
+        eta = self.eta(now)
+        if eta is not None:
+            parts.append("ETA {}".format(format_duration(eta)))
+        return ", ".join(parts)
+
+    def _report(self, now):
+        self.file.write("\r" + self.status(now) + "\x1b[K")
+        self.file.flush()
+
+    def worker_queue(self):
+        """Return a queue to pass to the initializer of worker processes.
+
+        Workers register WorkerProgress(queue) as an instrumentation listener,
+        reporting to this progress.
+        """
+        if self._queue is None:
+            self._queue = Queue()
+            self._queue_thread = threading.Thread(target=self._read_queue)
+            self._queue_thread.daemon = True
+            self._queue_thread.start()
+        return self._queue
+
+    def _read_queue(self):
+        while True:
+            update = self._queue.get()
+            if update is None:
+                break
+            self.update(*update)
+
+    def close(self):
+        """Stop reading the worker queue and finish the progress line."""
+        if self._queue is not None:
+            self._queue.put(None)
+            self._queue_thread.join()
+            self._queue = None
+        if not self.enabled:
+            return
+        with self._lock:
+            self._report(time.monotonic())
+            self.file.write("\n")
+            self.file.flush()
+
+
+class WorkerProgress(instrumentation.Listener):
+    """Forward the progress of a worker process to a Progress.
+
+    See Progress.worker_queue(). Grapheme and DP cell counts are batched until the
+    next page or min_interval seconds, to keep the queue traffic low.
+    """
+
+    def __init__(self, queue, min_interval=0.5):
+        self.queue = queue
+        self.min_interval = min_interval
+        self._pending = [0, 0, 0, 0]
+        self._last_put = time.monotonic()
+
+    def count(self, name, value, labels):
+        if name == "graphemes":
+            self._pending[2] += value
+        elif name == "dp_cells":
+            self._pending[3] += value
+        else:
+            return
+        if time.monotonic() - self._last_put >= self.min_interval:
+            self._put()
+
+    def page_done(self, cost=0):
+        self._pending[0] += 1
+        self._pending[1] += cost
+        self._put()
+
+    def _put(self):
+        self.queue.put(tuple(self._pending))
+        self._pending = [0, 0, 0, 0]
+        self._last_put = time.monotonic()
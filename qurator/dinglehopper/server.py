@@ -0,0 +1,291 @@
+import ipaddress
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+
+import click
+
+from .cli import parse_size, process, template_environment
+from .engines import set_engine
+from .pair_cache import SharedPairCache
+
+# Options of process() a job may set, and "engine"
+JOB_OPTIONS = (
+    "metrics",
+    "textequiv_level",
+    "diff_context",
+    "lazy_html",
+    "metrics_only",
+    "export_alignment_format",
+    "profile",
+    "incremental",
+    "pair_cache",
+    "processes",
+    "max_memory",
+    "engine",
+)
+
+# The engine, the instrumentation listeners and the profiling (tracemalloc) are
+# global to the process, so a process only runs one job at a time
+_job_lock = threading.Lock()
+
+
+class JobError(ValueError):
+    """An invalid evaluation job."""
+
+
+def evaluate(job):
+    """Run an evaluation job and return the JSON report.
+
+    A job is a dict with the GT and OCR file names in "gt" and "ocr", the
+    optional "report_prefix" and options of process() (see JOB_OPTIONS). Without
+    a report_prefix, the reports are written to a temporary directory and only
+    the JSON report is returned.
+
+    The "pair_cache" is the file name of a SharedPairCache, "max_memory" may be
+    given as a size like "512M" and "engine" selects the edit distance engine for
+    this job.
+    """
+    if not isinstance(job, dict):
+        raise JobError("The job must be a JSON object")
+    job = dict(job)
+    for required in ("gt", "ocr"):
+        if not isinstance(job.get(required), str):
+            raise JobError('The job needs a file name in "{}"'.format(required))
+        if not os.path.exists(job[required]):
+            raise JobError('File "{}" does not exist'.format(job[required]))
+    gt = job.pop("gt")
+    ocr = job.pop("ocr")
+    report_prefix = job.pop("report_prefix", None)
+    unknown = sorted(set(job) - set(JOB_OPTIONS))
+    if unknown:
+        raise JobError("Unknown job options: {}".format(", ".join(unknown)))
+    if isinstance(job.get("max_memory"), str):
+        try:
+            job["max_memory"] = parse_size(job["max_memory"])
+        except ValueError as e:
+            raise JobError(str(e))
+    engine = job.pop("engine", None) or None
+    pair_cache_fn = job.pop("pair_cache", None)
+
+    with _job_lock:
+        pair_cache = None
+        tmp_dir = None
+        try:
+            set_engine(engine)
+            if pair_cache_fn:
+                pair_cache = SharedPairCache(pair_cache_fn)
+            if report_prefix is None:
+                tmp_dir = tempfile.mkdtemp(prefix="dinglehopper-")
+                report_prefix = os.path.join(tmp_dir, "report")
+            process(gt, ocr, report_prefix, pair_cache=pair_cache, **job)
+            with open(report_prefix + ".json", "r") as f:
+                return json.load(f)
+        finally:
+            set_engine(None)
+            if pair_cache is not None:
+                pair_cache.close()
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir)
+
+
+class EvaluationRequestHandler(BaseHTTPRequestHandler):
+    """Handle evaluation requests.
+
+    * GET /health: {"status": "ok"}
+    * POST /evaluate with a JSON job (see evaluate()): the JSON report, or
+      {"error": message} with status 400 for an invalid job and 500 for a failed
+      evaluation.
+    """
+
+    server_version = "dinglehopper"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(200, {"status": "ok"})
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/evaluate":
+            self.send_json(404, {"error": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = json.loads(self.rfile.read(length).decode("utf-8"))
+            report = self.server.run_job(job)
+        except ValueError as e:
+            # Invalid JSON or job
+            self.send_json(400, {"error": str(e)})
+        except Exception as e:
+            self.send_json(500, {"error": "{}: {}".format(type(e).__name__, e)})
+        else:
+            self.send_json(200, report)
+
+    def send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Clients of a Unix socket have no address
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix"
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class _EvaluationServerMixIn(ThreadingMixIn):
+    daemon_threads = True
+    executor = None
+    quiet = False
+
+    def run_job(self, job):
+        if self.executor is None:
+            return evaluate(job)
+        return self.executor.submit(evaluate, job).result()
+
+
+class EvaluationServer(_EvaluationServerMixIn, HTTPServer):
+    """Evaluation server on a TCP socket, see EvaluationRequestHandler."""
+
+    def __init__(self, address, *, executor=None, quiet=False):
+        self.executor = executor
+        self.quiet = quiet
+        super().__init__(address, EvaluationRequestHandler)
+
+
+class UnixEvaluationServer(_EvaluationServerMixIn, UnixStreamServer):
+    """Evaluation server on a Unix socket, see EvaluationRequestHandler."""
+
+    def __init__(self, path, *, executor=None, quiet=False):
+        self.executor = executor
+        self.quiet = quiet
+        if os.path.exists(path) and _is_stale_socket(path):
+            os.unlink(path)
+        super().__init__(path, EvaluationRequestHandler)
+
+    def server_bind(self):
+        super().server_bind()
+        # Only the user running the server may submit jobs
+        os.chmod(self.server_address, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def _is_stale_socket(path):
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(path)
+    except ConnectionRefusedError:
+        return True
+    except OSError:
+        return False
+    finally:
+        s.close()
+    return False
+
+
+def _loopback_host(ctx, param, value):
+    if value != "localhost":
+        try:
+            loopback = ipaddress.ip_address(value).is_loopback
+        except ValueError:
+            loopback = False
+        if not loopback:
+            raise click.BadParameter(
+                "Refusing to listen on {}, the server reads and writes any file a "
+                "job names, without authentication. Use a loopback address or "
+                "--socket".format(value)
+            )
+    return value
+
+
+def warm_up():
+    """Compile the report templates before the first job."""
+    env = template_environment()
+    for template_fn in ("report.html.j2", "report.json.j2"):
+        env.get_template(template_fn)
+
+
+@click.command()
+@click.option(
+    "--host",
+    default="127.0.0.1",
+    callback=_loopback_host,
+    help="Listen on this loopback address",
+)
+@click.option("--port", type=int, default=8089, help="Listen on this TCP port")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Listen on this Unix socket instead of TCP",
+    metavar="PATH",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Run the evaluations in N worker processes (default: one at a time)",
+    metavar="N",
+)
+@click.option("--quiet", "-q", is_flag=True, help="Do not log the requests")
+def main(host, port, socket_path, jobs, quiet):
+    """
+    Run a long-lived dinglehopper evaluation server.
+
+    The server keeps the imports, the compiled report templates and the
+    caches warm, which saves most of the runtime for small documents. It
+    accepts jobs concurrently on localhost HTTP or, with --socket, on a Unix
+    socket only accessible to the user running the server. Use
+    dinglehopper-client to submit jobs.
+
+    The server reads and writes any file a job names, without authentication,
+    so it only listens on loopback addresses. Any local user may submit jobs
+    over TCP, use --socket to restrict this to the user running the server.
+
+    By default, the jobs run one at a time in the server process. Use --jobs N
+    to run them in parallel in N worker processes, which are started with the
+    imports already done.
+    """
+    warm_up()
+    executor = ProcessPoolExecutor(jobs) if jobs > 0 else None
+    if socket_path:
+        server = UnixEvaluationServer(socket_path, executor=executor, quiet=quiet)
+        click.echo("Listening on {}".format(socket_path), err=True)
+    else:
+        server = EvaluationServer((host, port), executor=executor, quiet=quiet)
+        click.echo(
+            "Listening on http://{}:{}".format(*server.server_address[:2]), err=True
+        )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if executor is not None:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,104 @@ function find_diff_class(classes) {
     return $('.' + classes.split(/\s+/).find(x => x.match(/.diff\d.*/)));
 }
 
+/* Number of alignment data items rendered at once by render_diff_data() */
+const diff_data_chunk_size = 500;
+
+function append_text(element, text) {
+    text.split('\n').forEach(function(line, i) {
+        if (i > 0) {
+            element.appendChild(document.createElement('br'));
+        }
+        element.appendChild(document.createTextNode(line));
+    });
+}
+
+function append_diff(element, css_classes, t, none, id) {
+    const span = document.createElement('span');
+    span.className = css_classes;
+    if (t === null) {
+        span.className += ' ellipsis';
+        t = none;
+    }
+    if (id !== null) {
+        /* Set Bootstrap tooltip to the segment id */
+        span.setAttribute('data-toggle', 'tooltip');
+        span.setAttribute('title', id);
+    }
+    append_text(span, t);
+    element.appendChild(span);
+}
+
+function append_collapsed(element, n) {
+    const span = document.createElement('span');
+    span.className = 'ellipsis collapsed';
+    span.textContent = '[… ' + n + ' …]';
+    element.appendChild(span);
+}
+
+function render_diff_chunk(row, container, data, start) {
+    const css_prefix = container.dataset.cssPrefix;
+    const joiner = container.dataset.joiner;
+    const none = container.dataset.none;
+    const gt = row.querySelector('.gt');
+    const ocr = row.querySelector('.ocr');
+
+    const stop = Math.min(start + diff_data_chunk_size, data.length);
+    for (let k = start; k < stop; k++) {
+        const item = data[k];
+        if (typeof item === 'string') {
+            append_text(gt, joiner + item);
+            append_text(ocr, joiner + item);
+        } else if (typeof item === 'number') {
+            append_collapsed(gt, item);
+            append_collapsed(ocr, item);
+        } else {
+            const css_classes = css_prefix + 'diff' + k + ' diff';
+            append_text(gt, joiner);
+            append_text(ocr, joiner);
+            append_diff(gt, css_classes, item[0], none, item[2]);
+            append_diff(ocr, css_classes, item[1], none, item[3]);
+        }
+    }
+    row.style.minHeight = '';
+}
+
+function render_diff_data(container) {
+    /* Create placeholder rows for the chunks of the alignment data and render them
+     * when they become visible */
+    const data = JSON.parse(container.querySelector('script').textContent);
+
+    const observer = new IntersectionObserver(function(entries) {
+        entries.forEach(function(entry) {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                const start = parseInt(entry.target.dataset.start);
+                render_diff_chunk(entry.target, container, data, start);
+            }
+        });
+    }, {rootMargin: '100% 0px'});
+
+    for (let start = 0; start < data.length; start += diff_data_chunk_size) {
+        const row = document.createElement('div');
+        row.className = 'row';
+        row.dataset.start = start;
+        row.style.minHeight = '20em';
+        row.innerHTML = '<div class="col-md-6 gt"></div><div class="col-md-6 ocr"></div>';
+        container.appendChild(row);
+        observer.observe(row);
+    }
+}
+
 $(document).ready(function() {
-    /* Enable Bootstrap tooltips */
-    $('[data-toggle="tooltip"]').tooltip();
+    /* Enable Bootstrap tooltips, lazily on the first hover */
+    $('body').tooltip({selector: '[data-toggle="tooltip"]'});
+
+    document.querySelectorAll('.diff-data').forEach(render_diff_data);
 
-    $('.diff').mouseover(function() {
+    $(document).on('mouseover', '.diff', function() {
         find_diff_class($(this).attr('class')).addClass('diff-highlight');
     });
-    $('.diff').mouseout(function() {
+    $(document).on('mouseout', '.diff', function() {
         find_diff_class($(this).attr('class')).removeClass('diff-highlight');
     });
 });
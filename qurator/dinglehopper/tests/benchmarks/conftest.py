@@ -0,0 +1,56 @@
+import os
+import tracemalloc
+
+import pytest
+
+from ...edit_distance import levenshtein_matrix_cache_clear
+
+# Sizes (in grapheme clusters) and error rates of the synthetic documents
+SIZES = [100, 1000, 10000, 100000]
+ERROR_RATES = [0.01, 0.1, 0.3]
+
+# Maximum number of DP matrix cells for the quadratic stages, larger sizes are
+# skipped
+MAX_CELLS = int(os.environ.get("DINGLEHOPPER_BENCH_MAX_CELLS", 10**8))
+
+
+def pytest_collection_modifyitems(config, items):
+    """Only run the benchmarks if explicitly selected using "-m benchmark"."""
+    if "benchmark" in (config.getoption("markexpr") or ""):
+        return
+    skip = pytest.mark.skip(reason='benchmarks only run with "-m benchmark"')
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+def skip_if_too_large(m, n):
+    if m * n > MAX_CELLS:
+        pytest.skip(
+            "{} × {} cells > DINGLEHOPPER_BENCH_MAX_CELLS={}".format(m, n, MAX_CELLS)
+        )
+
+
+def run_benchmark(benchmark, function, *args, cache_clear=False):
+    """Benchmark function(*args), recording its peak traced memory.
+
+    With cache_clear, the Levenshtein matrix cache is cleared before each run, so
+    that the DP is not skipped.
+    """
+    setup = levenshtein_matrix_cache_clear if cache_clear else None
+
+    # Measure the peak memory in a separate run, as tracing slows everything down
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        function(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["peak_memory"] = peak
+
+    def target():
+        return function(*args)
+
+    return benchmark.pedantic(target, setup=setup, rounds=3, warmup_rounds=0)
@@ -0,0 +1,95 @@
+import random
+from xml.sax.saxutils import escape, quoteattr
+
+from uniseg.graphemecluster import grapheme_clusters
+
+# Graphemes to build synthetic (historical German) text from, including private use
+# area/MUFI characters, precomposed and combining characters
+LETTERS = list("abcdefghiklmnoprstuvwzäöüßſ") + ["aͤ", "oͤ", "uͤ", "", ""]
+CAPITALS = list("ABDEFGHKLMNPRSTUVWZ")
+PUNCTUATION = list(",.;:⸗-") + ["—"]
+
+
+def synthetic_text(n, seed=0, line_length=60):
+    """Generate a text of about n grapheme clusters, with lines of line_length."""
+    rng = random.Random(seed)
+    lines = []
+    line = []
+    length = 0
+    while length < n:
+        word = [rng.choice(CAPITALS if rng.random() < 0.2 else LETTERS)]
+        word += [rng.choice(LETTERS) for _ in range(rng.randint(1, 9))]
+        if rng.random() < 0.1:
+            word.append(rng.choice(PUNCTUATION))
+        line.append("".join(word))
+        length += len(word) + 1
+        if sum(len(w) + 1 for w in line) >= line_length:
+            lines.append(" ".join(line))
+            line = []
+    if line:
+        lines.append(" ".join(line))
+    return "\n".join(lines)
+
+
+def add_errors(text, error_rate, seed=0):
+    """Add substitutions, insertions and deletions of grapheme clusters to text.
+
+    Newlines are kept, so that the line structure stays intact.
+    """
+    rng = random.Random(seed)
+    result = []
+    for g in grapheme_clusters(text):
+        if g == "\n" or rng.random() >= error_rate:
+            result.append(g)
+            continue
+        error = rng.randrange(3)
+        if error == 0:  # Substitution
+            result.append(rng.choice(LETTERS))
+        elif error == 1:  # Insertion
+            result.append(g)
+            result.append(rng.choice(LETTERS))
+        else:  # Deletion
+            pass
+    return "".join(result)
+
+
+def synthetic_page(text, lines_per_region=10):
+    """Wrap the lines of text in a PAGE document, on TextRegion and TextLine level."""
+    lines = text.split("\n")
+    xml = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<PcGts xmlns="http://schema.primaresearch.org/PAGE/gts/pagecontent/'
+        '2019-07-15">\n<Page imageFilename="synthetic.tif" imageWidth="1000"'
+        ' imageHeight="1000">\n'
+    ]
+    for r in range(0, len(lines), lines_per_region):
+        region_lines = lines[r : r + lines_per_region]
+        xml.append('<TextRegion id="r{}">\n'.format(r))
+        for line_no, line in enumerate(region_lines):
+            xml.append(
+                '<TextLine id="r{}l{}"><TextEquiv><Unicode>{}</Unicode></TextEquiv>'
+                "</TextLine>\n".format(r, line_no, escape(line))
+            )
+        xml.append(
+            "<TextEquiv><Unicode>{}</Unicode></TextEquiv>\n</TextRegion>\n".format(
+                escape("\n".join(region_lines))
+            )
+        )
+    xml.append("</Page>\n</PcGts>\n")
+    return "".join(xml).encode("utf-8")
+
+
+def synthetic_alto(text):
+    """Wrap the lines of text in an ALTO document, one String per word."""
+    xml = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<alto xmlns="http://www.loc.gov/standards/alto/ns-v4#">\n'
+        '<Layout><Page ID="p"><PrintSpace><TextBlock ID="b">\n'
+    ]
+    for line_no, line in enumerate(text.split("\n")):
+        xml.append('<TextLine ID="l{}">'.format(line_no))
+        for word in line.split():
+            xml.append("<String CONTENT={}/>".format(quoteattr(word)))
+        xml.append("</TextLine>\n")
+    xml.append("</TextBlock></PrintSpace></Page></Layout>\n</alto>\n")
+    return "".join(xml).encode("utf-8")
@@ -0,0 +1,92 @@
+import pytest
+
+from .conftest import (
+    ERROR_RATES,
+    MAX_CELLS,
+    SIZES,
+    run_benchmark,
+    skip_if_too_large,
+)
+from .util import synthetic_graphemes, synthetic_pair
+from ...batch import batch_distance
+from ...character_error_rate import character_error_rate_n
+from ...cli import gen_diff_report
+from ...edit_distance import levenshtein_matrix, seq_editops
+from ...engines import available_engines, get_engine
+
+pytest.importorskip("pytest_benchmark")
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.parametrize("error_rate", ERROR_RATES)
+@pytest.mark.parametrize("size", SIZES)
+def test_levenshtein_matrix(benchmark, size, error_rate):
+    gt, ocr = synthetic_graphemes(size, error_rate)
+    skip_if_too_large(len(gt), len(ocr))
+    benchmark.group = "levenshtein_matrix"
+    run_benchmark(benchmark, levenshtein_matrix, gt, ocr, cache_clear=True)
+
+
+@pytest.mark.parametrize("error_rate", ERROR_RATES)
+@pytest.mark.parametrize("size", SIZES)
+def test_seq_editops(benchmark, size, error_rate):
+    gt, ocr = synthetic_graphemes(size, error_rate)
+    skip_if_too_large(len(gt), len(ocr))
+    benchmark.group = "seq_editops"
+    run_benchmark(benchmark, seq_editops, gt, ocr, cache_clear=True)
+
+
+@pytest.mark.parametrize("error_rate", ERROR_RATES)
+@pytest.mark.parametrize("size", SIZES)
+def test_gen_diff_report(benchmark, size, error_rate):
+    gt, ocr = synthetic_graphemes(size, error_rate)
+    skip_if_too_large(len(gt), len(ocr))
+    benchmark.group = "gen_diff_report"
+
+    def render():
+        return "".join(
+            gen_diff_report(list(gt), list(ocr), css_prefix="c", joiner="", none="·")
+        )
+
+    run_benchmark(benchmark, render, cache_clear=True)
+
+
+def line_pairs(size, error_rate):
+    gt, ocr = synthetic_pair(size, error_rate)
+    return list(zip(gt.split("\n"), ocr.split("\n")))
+
+
+@pytest.mark.parametrize("error_rate", ERROR_RATES)
+@pytest.mark.parametrize("size", SIZES)
+def test_line_pairs_character_error_rate_n(benchmark, size, error_rate):
+    pairs = line_pairs(size, error_rate)
+    benchmark.group = "line_pairs"
+
+    def per_pair():
+        return [character_error_rate_n(gt, ocr) for gt, ocr in pairs]
+
+    run_benchmark(benchmark, per_pair, cache_clear=True)
+
+
+@pytest.mark.parametrize("error_rate", ERROR_RATES)
+@pytest.mark.parametrize("size", SIZES)
+def test_line_pairs_batch_distance(benchmark, size, error_rate):
+    pairs = line_pairs(size, error_rate)
+    benchmark.group = "line_pairs"
+    run_benchmark(benchmark, batch_distance, pairs)
+
+
+@pytest.mark.parametrize("engine", available_engines())
+@pytest.mark.parametrize("error_rate", ERROR_RATES)
+@pytest.mark.parametrize("size", SIZES)
+def test_engine_distance(benchmark, size, error_rate, engine):
+    gt, ocr = synthetic_graphemes(size, error_rate)
+    skip_if_too_large(len(gt), len(ocr))
+    # The pure Python reference engine is about 100 times slower
+    if engine == "python" and len(gt) * len(ocr) > MAX_CELLS // 100:
+        pytest.skip("too large for the python engine")
+    benchmark.group = "engine_distance"
+    codes = {}
+    a = [codes.setdefault(g, len(codes)) for g in gt]
+    b = [codes.setdefault(g, len(codes)) for g in ocr]
+    run_benchmark(benchmark, get_engine(engine), a, b)
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+from lxml import etree as ET
+
+from .conftest import SIZES, run_benchmark, skip_if_too_large
+from .synthetic import synthetic_alto, synthetic_page
+from .util import DATA_PAIRS, data_dir, synthetic_pair
+from ...cli import process
+from ...extracted_text import substitute_equivalences
+from ...ocr_files import alto_extract, extract, page_extract
+from ...word_error_rate import words
+
+pytest.importorskip("pytest_benchmark")
+pytestmark = pytest.mark.benchmark
+
+DATA_FILES = sorted(set(fn for pair in DATA_PAIRS for fn in pair))
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_substitute_equivalences(benchmark, size):
+    _, ocr = synthetic_pair(size, 0.1)
+    benchmark.group = "substitute_equivalences"
+    run_benchmark(benchmark, substitute_equivalences, ocr)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_words(benchmark, size):
+    gt, _ = synthetic_pair(size, 0.1)
+    benchmark.group = "words"
+    run_benchmark(benchmark, lambda text: list(words(text)), gt)
+
+
+@pytest.mark.parametrize("textequiv_level", ["region", "line"])
+@pytest.mark.parametrize("size", SIZES)
+def test_page_extract(benchmark, size, textequiv_level):
+    gt, _ = synthetic_pair(size, 0.1)
+    tree = ET.ElementTree(ET.fromstring(synthetic_page(gt)))
+    benchmark.group = "page_extract"
+    run_benchmark(
+        benchmark, lambda: page_extract(tree, textequiv_level=textequiv_level)
+    )
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_alto_extract(benchmark, size):
+    gt, _ = synthetic_pair(size, 0.1)
+    tree = ET.ElementTree(ET.fromstring(synthetic_alto(gt)))
+    benchmark.group = "alto_extract"
+    run_benchmark(benchmark, alto_extract, tree)
+
+
+@pytest.mark.parametrize("fn", DATA_FILES)
+def test_extract_data_files(benchmark, fn):
+    benchmark.group = "extract (test data)"
+    run_benchmark(benchmark, extract, os.path.join(data_dir, fn))
+
+
+@pytest.mark.parametrize("gt, ocr", DATA_PAIRS)
+def test_process_data_files(benchmark, tmp_path, gt, ocr):
+    gt = os.path.join(data_dir, gt)
+    ocr = os.path.join(data_dir, ocr)
+    skip_if_too_large(len(extract(gt).text), len(extract(ocr).text))
+    benchmark.group = "process (test data)"
+    run_benchmark(
+        benchmark,
+        process,
+        gt,
+        ocr,
+        str(tmp_path / "report"),
+        cache_clear=True,
+    )
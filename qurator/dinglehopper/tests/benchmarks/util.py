@@ -0,0 +1,45 @@
+import os
+import unicodedata
+from functools import lru_cache
+
+from uniseg.graphemecluster import grapheme_clusters
+
+from .synthetic import add_errors, synthetic_text
+
+data_dir = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"
+)
+
+# Realistic GT/OCR document pairs from the test data
+DATA_PAIRS = [
+    ("test-gt.page2018.xml", "test-fake-ocr.page2018.xml"),
+    (
+        "lorem-ipsum/lorem-ipsum-scan.gt.page.xml",
+        "lorem-ipsum/lorem-ipsum-scan.ocr.tesseract.alto.xml",
+    ),
+    (
+        "brochrnx_73075507X/00000139.gt.page.xml",
+        "brochrnx_73075507X/00000139.ocrd-tess.ocr.page.xml",
+    ),
+    (
+        "actevedef_718448162/OCR-D-GT-PAGE/00000024.page.xml",
+        "actevedef_718448162/OCR-D-OCR-CALAMARI/OCR-D-OCR-CALAMARI_0001.xml",
+    ),
+]
+
+
+@lru_cache(maxsize=None)
+def synthetic_pair(size, error_rate, seed=0):
+    """Return a synthetic GT text of about size grapheme clusters and its "OCR"."""
+    gt = synthetic_text(size, seed=seed)
+    ocr = add_errors(gt, error_rate, seed=seed)
+    return gt, ocr
+
+
+@lru_cache(maxsize=None)
+def synthetic_graphemes(size, error_rate, seed=0):
+    """Return synthetic_pair() as tuples of NFC grapheme clusters."""
+    return tuple(
+        tuple(grapheme_clusters(unicodedata.normalize("NFC", text)))
+        for text in synthetic_pair(size, error_rate, seed)
+    )
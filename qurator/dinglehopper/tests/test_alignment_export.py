@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from .. import ExtractedText
+from ..alignment_export import (
+    LEVEL_CHARACTER,
+    LEVEL_WORD,
+    OP_DELETE,
+    OP_EQUAL,
+    OP_INSERT,
+    OP_REPLACE,
+    alignment_arrays,
+    export_alignment,
+)
+
+
+def example_texts():
+    gt = ExtractedText(
+        None,
+        [
+            ExtractedText("l1", None, None, "ab c"),
+            ExtractedText("l2", None, None, "de"),
+        ],
+        "\n",
+        None,
+    )
+    ocr = ExtractedText(
+        None,
+        [
+            ExtractedText("o1", None, None, "ab cx"),
+            ExtractedText("o2", None, None, "e"),
+        ],
+        "\n",
+        None,
+    )
+    return gt, ocr
+
+
+def test_alignment_arrays():
+    gt, ocr = example_texts()
+    arrays = alignment_arrays(gt, ocr)
+
+    assert arrays["op"].dtype == np.uint8
+    assert arrays["gt_pos"].dtype == np.int32
+    assert arrays["gt_segment"].dtype == np.int32
+
+    c = arrays["level"] == LEVEL_CHARACTER
+    assert arrays["op"][c].tolist() == [
+        OP_EQUAL,
+        OP_EQUAL,
+        OP_EQUAL,
+        OP_EQUAL,
+        OP_INSERT,
+        OP_EQUAL,
+        OP_DELETE,
+        OP_EQUAL,
+    ]
+    assert arrays["gt_pos"][c].tolist() == [0, 1, 2, 3, -1, 4, 5, 6]
+    assert arrays["ocr_pos"][c].tolist() == [0, 1, 2, 3, 4, 5, -1, 6]
+
+    segment_ids = arrays["segment_ids"].tolist()
+
+    def segments(column):
+        return [segment_ids[s] if s >= 0 else None for s in arrays[column][c]]
+
+    assert segments("gt_segment") == ["l1"] * 4 + [None, None, "l2", "l2"]
+    assert segments("ocr_segment") == ["o1"] * 5 + [None, None, "o2"]
+
+    w = arrays["level"] == LEVEL_WORD
+    assert arrays["op"][w].tolist() == [OP_EQUAL, OP_REPLACE, OP_REPLACE]
+    assert np.all(arrays["gt_segment"][w] == -1)
+
+
+def test_export_alignment_npz(tmp_path):
+    gt, ocr = example_texts()
+    fn = str(tmp_path / "alignment.npz")
+    export_alignment(gt, ocr, fn)
+
+    expected = alignment_arrays(gt, ocr)
+    with np.load(fn) as npz:
+        assert set(npz.files) == set(expected)
+        for name in expected:
+            assert np.array_equal(npz[name], expected[name])
+
+
+@pytest.mark.parametrize("format", ["arrow", "parquet"])
+def test_export_alignment_arrow(tmp_path, format):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    gt, ocr = example_texts()
+    fn = str(tmp_path / ("alignment." + format))
+    export_alignment(gt, ocr, fn, format=format)
+
+    if format == "arrow":
+        table = pa.ipc.open_file(pa.memory_map(fn)).read_all()
+    else:
+        table = pq.read_table(fn)
+    expected = alignment_arrays(gt, ocr)
+    assert table.column("op").to_pylist() == expected["op"].tolist()
+    assert table.column("gt_segment").to_pylist()[:8] == ["l1"] * 4 + [
+        None,
+        None,
+        "l2",
+        "l2",
+    ]
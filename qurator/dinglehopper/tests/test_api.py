@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+from lxml import etree as ET
+
+from .util import working_directory
+from .. import ExtractedText, EvaluationResult, evaluate, extract, load_document
+
+data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def test_evaluate_strings():
+    result = evaluate("Hallo Welt", "Hallo Wclt")
+    assert isinstance(result, EvaluationResult)
+    assert result.cer == pytest.approx(0.1)
+    assert result.wer == pytest.approx(0.5)
+    assert result.n_characters == 10
+    assert result.n_words == 2
+    assert result.character_alignment[6:] == [
+        ("W", "W"),
+        ("e", "c"),
+        ("l", "l"),
+        ("t", "t"),
+    ]
+    assert result.word_alignment == [("Hallo", "Hallo"), ("Welt", "Wclt")]
+    assert result.confusion == [["e", "c", 1]]
+    assert result.reports == {}
+
+
+def test_evaluate_metrics_only():
+    result = evaluate("AAAAA", "AAAAB", metrics_only=True, reports=["json"])
+    assert result.cer == pytest.approx(0.2)
+    assert result.character_alignment is None
+    assert result.confusion is None
+    assert json.loads(result.reports["json"].decode("utf-8"))["cer"] == 0.2
+
+    with pytest.raises(ValueError):
+        evaluate("AAAAA", "AAAAB", metrics_only=True, reports=["html"])
+    with pytest.raises(ValueError):
+        evaluate("AAAAA", "AAAAB", reports=["pdf"])
+
+
+def test_evaluate_reports_without_files(tmp_path):
+    with working_directory(str(tmp_path)):
+        result = evaluate(
+            b"AAAAA", b"AAAAB", reports=("html", "json"), gt_name="gt.txt"
+        )
+        assert os.listdir(".") == []
+
+    report = json.loads(result.reports["json"].decode("utf-8"))
+    assert report["gt"] == "gt.txt"
+    assert report["cer"] == pytest.approx(0.2)
+    assert report["confusion"] == [["A", "B", 1]]
+    html = result.reports["html"].decode("utf-8")
+    assert html.startswith("<!doctype html>")
+    assert 'class="cdiff4 diff"' in html
+
+
+def test_load_document():
+    fn = os.path.join(data_dir, "test-gt.page2018.xml")
+    with open(fn, "rb") as f:
+        data = f.read()
+    tree = ET.parse(fn)
+
+    text = load_document(data)
+    assert load_document(data.decode("utf-8")).text == text.text
+    assert load_document(tree).text == text.text
+    assert load_document(tree.getroot()).text == text.text
+    assert load_document(text) is text
+    assert "Amtmännin" in text.text
+
+    assert load_document(tree, textequiv_level="line").segments[0].segment_id
+    assert isinstance(load_document("foo"), ExtractedText)
+    with pytest.raises(TypeError):
+        load_document(42)
+
+
+def test_load_document_plain_text(tmp_path):
+    # Same as reading a file
+    with working_directory(str(tmp_path)):
+        with open("plain.txt", "wb") as f:
+            f.write(b"foo\r\nbar\n")
+        assert load_document(b"foo\r\nbar\n") == extract("plain.txt")
+
+
+def test_evaluate_same_as_cli(tmp_path):
+    from ..cli import process
+
+    gt = os.path.join(data_dir, "test-gt.page2018.xml")
+    ocr = os.path.join(data_dir, "test-fake-ocr.page2018.xml")
+    with working_directory(str(tmp_path)):
+        process(gt, ocr, "report")
+        with open("report.json", "r") as f:
+            report = json.load(f)
+
+    with open(gt, "rb") as gt_f, open(ocr, "rb") as ocr_f:
+        result = evaluate(gt_f.read(), ET.parse(ocr_f))
+    assert result.cer == pytest.approx(report["cer"])
+    assert result.wer == pytest.approx(report["wer"])
+    assert result.n_characters == report["n_characters"]
+    assert result.confusion == report["confusion"]
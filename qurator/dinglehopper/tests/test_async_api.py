@@ -0,0 +1,129 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from lxml import etree as ET
+
+from ..api import evaluate
+from ..async_api import AsyncEvaluator
+
+data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_evaluate():
+    async def main():
+        async with AsyncEvaluator(max_workers=2) as evaluator:
+            return await asyncio.gather(
+                evaluator.evaluate("AAAAA", "AAAAB"),
+                evaluator.evaluate("Hallo Welt", "Hallo Wclt", metrics_only=True),
+            )
+
+    first, second = run(main())
+    assert first.cer == pytest.approx(0.2)
+    assert second.wer == pytest.approx(0.5)
+    assert second.character_alignment is None
+
+
+def test_evaluate_processes():
+    gt = ET.parse(os.path.join(data_dir, "test-gt.page2018.xml"))
+    ocr = ET.parse(os.path.join(data_dir, "test-fake-ocr.page2018.xml"))
+
+    async def main():
+        async with AsyncEvaluator(max_workers=2, processes=True) as evaluator:
+            return await asyncio.gather(
+                evaluator.evaluate(gt, ocr.getroot()),
+                evaluator.evaluate(b"AAAAA", "AAAAB", reports=["json"]),
+            )
+
+    first, second = run(main())
+    assert first.cer == pytest.approx(evaluate(gt, ocr).cer)
+    assert second.cer == pytest.approx(0.2)
+    assert b'"cer": 0.2' in second.reports["json"]
+
+
+def test_evaluate_many_as_completed():
+    pairs = [("A" * n, "A" * (n - 1) + "B") for n in range(1, 11)]
+
+    async def main():
+        async with AsyncEvaluator(max_workers=3) as evaluator:
+            results = []
+            async for result in evaluator.evaluate_many(iter(pairs)):
+                results.append(result)
+            return results
+
+    results = run(main())
+    assert sorted(i for i, _ in results) == list(range(10))
+    for i, result in results:
+        assert result.cer == pytest.approx(1 / (i + 1))
+
+
+def test_evaluate_many_exceptions():
+    pairs = [("AAAAA", "AAAAB"), ("AAAAA", 42)]
+
+    async def main(return_exceptions):
+        async with AsyncEvaluator(max_workers=2) as evaluator:
+            stream = evaluator.evaluate_many(pairs, return_exceptions=return_exceptions)
+            results = {}
+            async for i, result in stream:
+                results[i] = result
+            return results
+
+    results = run(main(True))
+    assert results[0].cer == pytest.approx(0.2)
+    assert isinstance(results[1], TypeError)
+    with pytest.raises(TypeError):
+        run(main(False))
+
+
+def test_backpressure_and_cancellation():
+    release = threading.Event()
+    running = []
+
+    def blocking(*args, **kwargs):
+        running.append(1)
+        release.wait(10)
+
+    executor = ThreadPoolExecutor(4)
+    evaluator = AsyncEvaluator(executor=executor, max_pending=2)
+
+    async def main():
+        # Submit the jobs directly to count them, evaluate() only submits
+        # max_pending at a time
+        evaluator.executor = _SubmitCounter(executor, blocking)
+        tasks = [asyncio.ensure_future(evaluator.evaluate("A", "B")) for _ in range(5)]
+        await asyncio.sleep(0.2)
+        submitted = evaluator.executor.submitted
+        for task in tasks[2:]:
+            task.cancel()
+        release.set()
+        await asyncio.wait(tasks)
+        return submitted, [t.cancelled() for t in tasks]
+
+    submitted, cancelled = run(main())
+    assert submitted == 2
+    assert cancelled == [False, False, True, True, True]
+    evaluator.close()
+    # Not our executor
+    assert executor.submit(lambda: 42).result() == 42
+    executor.shutdown()
+
+
+class _SubmitCounter:
+    def __init__(self, executor, function):
+        self.executor = executor
+        self.function = function
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return self.executor.submit(self.function)
@@ -0,0 +1,73 @@
+import random
+import unicodedata
+
+import numpy as np
+import pytest
+
+from .. import ExtractedText, batch_distance, distance, word_error_rate_n
+from ..engines import available_engines
+
+
+def test_batch_distance_graphemes():
+    pairs = [
+        ("Fnord", "Food"),
+        ("Müll", "Mull"),
+        (
+            unicodedata.normalize("NFC", "Schlyñ"),
+            unicodedata.normalize("NFD", "Schlyñ"),
+        ),
+        ("", ""),
+        ("", "abc"),
+        ("abc", ""),
+        ("Fnord", "Food"),
+        (ExtractedText(None, None, None, "foo"), "for"),
+    ]
+    distances, lengths = batch_distance(pairs)
+    assert distances.dtype == np.int64
+    assert list(distances) == [2, 1, 0, 0, 3, 3, 2, 1]
+    assert list(lengths) == [5, 4, 6, 0, 0, 3, 5, 3]
+
+
+def test_batch_distance_words():
+    pairs = [
+        ("Dies ist ein Beispielsatz!", "Dies isi ein Beispielsatz!"),
+        ("Dies ist ein Beispielsatz!", "Dies ist ein Beispielsatz!"),
+        ("Schlyñ lorem ipsum.", "Schlym̃ lorem ipsum."),
+        ("", "foo bar"),
+    ]
+    distances, lengths = batch_distance(pairs, unit="word")
+    for (reference, compared), d, n in zip(pairs, distances, lengths):
+        wer, n_words = word_error_rate_n(reference, compared)
+        assert n == n_words
+        assert (d / n if d else 0) == pytest.approx(wer)
+
+
+def test_batch_distance_processes():
+    rng = random.Random(42)
+    pairs = [
+        (
+            "".join(rng.choice("abcä") for _ in range(rng.randrange(20))),
+            "".join(rng.choice("abcä") for _ in range(rng.randrange(20))),
+        )
+        for _ in range(100)
+    ]
+    distances, lengths = batch_distance(pairs, processes=2, chunk_size=30)
+    assert list(distances) == [distance(r, c) for r, c in pairs]
+    assert list(lengths) == [len(r) for r, _ in pairs]
+
+
+@pytest.mark.parametrize("engine", available_engines())
+def test_batch_distance_engine(engine):
+    pairs = [("Fnord", "Food"), ("Müll", "Mull"), ("", "Foo"), ("Foo", "Foo")]
+    distances, _ = batch_distance(pairs, engine=engine)
+    assert list(distances) == [2, 1, 3, 0]
+
+
+def test_batch_distance_empty():
+    distances, lengths = batch_distance([])
+    assert distances.shape == lengths.shape == (0,)
+
+
+def test_batch_distance_unknown_unit():
+    with pytest.raises(ValueError):
+        batch_distance([("a", "b")], unit="line")
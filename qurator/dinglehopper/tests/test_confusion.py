@@ -0,0 +1,50 @@
+from collections import Counter
+
+from .. import seq_align
+from ..confusion import (
+    alignment_confusion,
+    character_confusion,
+    confusion_from_json,
+    confusion_to_json,
+    seq_confusion,
+)
+
+
+def test_seq_confusion():
+    assert seq_confusion("abc", "abc") == Counter()
+    assert seq_confusion("", "") == Counter()
+    assert seq_confusion("abc", "axc") == Counter({("b", "x"): 1})
+    assert seq_confusion("bcd", "abcef") == Counter(
+        {(None, "a"): 1, ("d", "e"): 1, (None, "f"): 1}
+    )
+    assert seq_confusion("Foo", "") == Counter({("F", None): 1, ("o", None): 2})
+
+
+def test_seq_confusion_matches_alignment():
+    s1 = "Die Verſprochene Stelle, ein ſehr ſchönes Buch"
+    s2 = "Dle Verfprochene Stclle ein fehr ſchones Buchh"
+    expected = Counter((g, o) for g, o in seq_align(s1, s2) if g != o)
+    assert seq_confusion(s1, s2) == expected
+
+
+def test_character_confusion():
+    # Grapheme clusters and normalization
+    assert character_confusion("Schlyñ", "Schlym̃") == Counter({("ñ", "m̃"): 1})
+    assert character_confusion("ñ", "ñ") == Counter()
+
+
+def test_confusion_json():
+    confusion = seq_confusion("aabbc", "aXbYY")
+    confusion_json = confusion_to_json(confusion)
+    assert confusion_json == [["a", "X", 1], ["b", "Y", 1], ["c", "Y", 1]]
+    assert confusion_from_json(confusion_json) == confusion
+
+    merged = confusion_from_json([["a", "b", 2], [None, "c", 1]])
+    merged.update(confusion_from_json([["a", "b", 1]]))
+    assert confusion_to_json(merged) == [["a", "b", 3], [None, "c", 1]]
+
+
+def test_alignment_confusion():
+    s1 = "Die Verſprochene Stelle ein ſehr ſchönes Buch"
+    s2 = "Dle Verfprochene Stclle ein fehr ſchones Buchh"
+    assert alignment_confusion(seq_align(s1, s2)) == seq_confusion(s1, s2)
@@ -0,0 +1,123 @@
+import json
+from types import GeneratorType
+
+from .. import ExtractedText
+from ..cli import collapsed_runs, gen_diff_data, gen_diff_report
+
+
+def test_gen_diff_report_is_streamed():
+    report = gen_diff_report(
+        ["a", "b", "c"], ["a", "x", "c"], css_prefix="c", joiner="", none="·"
+    )
+    assert isinstance(report, GeneratorType)
+
+    html = "".join(report)
+    assert html.count('<span class="cdiff1 diff" >b</span>') == 1
+    assert html.count('<span class="cdiff1 diff" >x</span>') == 1
+
+
+def test_gen_diff_report_escapes():
+    html = "".join(
+        gen_diff_report(["<", "a"], ["<", "&"], css_prefix="c", joiner="", none="·")
+    )
+    assert "&lt;" in html
+    assert '<span class="cdiff1 diff" >&amp;</span>' in html
+
+
+def test_gen_diff_report_segment_ids():
+    gt = ExtractedText(
+        None,
+        [
+            ExtractedText("r1", None, None, "abc"),
+            ExtractedText("r2", None, None, "def"),
+        ],
+        "\n",
+        None,
+    )
+    ocr = ExtractedText(None, None, None, "abc\ndxf")
+    html = "".join(gen_diff_report(gt, ocr, css_prefix="c", joiner="", none="·"))
+    assert 'data-toggle="tooltip" title="r2">e</span>' in html
+
+
+def test_collapsed_runs():
+    alignment = [(c, c) for c in "abcdefghij"]
+    alignment[5] = ("f", "x")
+    assert collapsed_runs(alignment, 2) == {0: 3, 8: 10}
+    assert collapsed_runs(alignment, 0) == {0: 5, 6: 10}
+    assert collapsed_runs(alignment, 5) == {}
+    assert collapsed_runs([(c, c) for c in "abc"], 1) == {0: 3}
+
+
+def test_gen_diff_report_context():
+    gt = list("abcdefghij")
+    ocr = list("abcdexghij")
+    html = "".join(
+        gen_diff_report(gt, ocr, css_prefix="c", joiner="", none="·", context=1)
+    )
+    assert html.count("[… 4 …]") == 2
+    assert html.count("[… 3 …]") == 2
+    assert 'e<span class="cdiff5 diff" >f</span>g' in html
+    assert 'e<span class="cdiff5 diff" >x</span>g' in html
+
+
+def test_gen_diff_report_context_segment_ids():
+    gt = ExtractedText(
+        None,
+        [
+            ExtractedText("r1", None, None, "abc"),
+            ExtractedText("r2", None, None, "def"),
+        ],
+        "\n",
+        None,
+    )
+    ocr = ExtractedText(None, None, None, "abc\ndxf")
+    html = "".join(
+        gen_diff_report(gt, ocr, css_prefix="c", joiner="", none="·", context=0)
+    )
+    assert 'data-toggle="tooltip" title="r2">e</span>' in html
+
+
+def diff_data(html):
+    """Extract the alignment data from the data-driven HTML diff report"""
+    start = html.index('<script type="application/json">') + len(
+        '<script type="application/json">'
+    )
+    stop = html.index("</script>")
+    return json.loads(html[start:stop])
+
+
+def test_gen_diff_data():
+    report = gen_diff_data(
+        list("abc<ef"), list("abc<xf"), css_prefix="c", joiner="", none="·"
+    )
+    assert isinstance(report, GeneratorType)
+
+    html = "".join(report)
+    assert 'data-css-prefix="c"' in html
+    assert "<e" not in html
+    assert diff_data(html) == ["abc<", ["e", "x", None, None], "f"]
+
+
+def test_gen_diff_data_words_context():
+    gt = "the quick brown fox jumps over the lazy dog".split()
+    ocr = "the quick brown fox jumps ower the lazy dog".split()
+    html = "".join(
+        gen_diff_data(gt, ocr, css_prefix="w", joiner=" ", none="⋯", context=1)
+    )
+    assert 'data-joiner=" "' in html
+    assert diff_data(html) == [4, "jumps", ["over", "ower", None, None], "the", 2]
+
+
+def test_gen_diff_data_segment_ids():
+    gt = ExtractedText(
+        None,
+        [
+            ExtractedText("r1", None, None, "abc"),
+            ExtractedText("r2", None, None, "def"),
+        ],
+        "\n",
+        None,
+    )
+    ocr = ExtractedText(None, None, None, "abc\ndf")
+    html = "".join(gen_diff_data(gt, ocr, css_prefix="c", joiner="", none="·"))
+    assert diff_data(html) == ["abc\nd", ["e", None, "r2", None], "f"]
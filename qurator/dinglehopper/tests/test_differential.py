@@ -0,0 +1,255 @@
+"""Differential tests of the fast paths against the reference implementations.
+
+Hypothesis generates random texts, including combining marks, PUA characters,
+MUFI ligatures and empty strings, and every registered edit distance engine and
+alignment algorithm must agree exactly with the reference implementation.
+"""
+
+import unicodedata
+
+import pytest
+import regex
+from hypothesis import given, settings, strategies as st
+from uniseg.graphemecluster import grapheme_clusters
+
+from .. import batch_distance, distance, seq_editops
+from ..edit_distance import (
+    _levenshtein_matrix_numpy,
+    _levenshtein_matrix_python,
+    _seq_editops_matrix,
+    alignment_algorithm,
+    levenshtein,
+    levenshtein_banded,
+    levenshtein_bitparallel,
+)
+from ..engines import available_engines, get_engine, set_engine
+from ..extracted_text import ExtractedText, substitute_equivalences
+
+# Characters that are special to the segmentation or the normalization, with a
+# few letters to have some matches
+SPECIAL_CHARACTERS = [
+    "a",
+    "o",
+    "u",
+    "q",
+    "f",
+    "s",
+    "=",
+    " ",
+    "́",  # COMBINING ACUTE ACCENT
+    "̃",  # COMBINING TILDE
+    "̈",  # COMBINING DIAERESIS
+    "ͤ",  # COMBINING LATIN SMALL LETTER E
+    "ſ",  # LATIN SMALL LETTER LONG S
+    "ĳ",  # LATIN SMALL LIGATURE IJ
+    "ﬁ",  # LATIN SMALL LIGATURE FI
+    "ﬆ",  # LATIN SMALL LIGATURE ST
+    "—",  # EM DASH
+    "’",  # RIGHT SINGLE QUOTATION MARK
+    "⸗",  # DOUBLE OBLIQUE HYPHEN
+    "\ue72b",  # LATIN SMALL LETTER U WITH LATIN SMALL LETTER E ABOVE (PUA)
+    "\ue8bf",  # MUFI: LATIN SMALL LETTER Q LIGATED WITH FINAL ET
+    "\ueba5",  # MUFI: LATIN SMALL LIGATURE LONG S P
+    "\ueba6",  # MUFI: LATIN SMALL LIGATURE LONG S LONG S
+    "\uf502",  # MUFI: LATIN SMALL LIGATURE CH
+    "\uf50e",  # LATIN SMALL LETTER Q WITH ACUTE ACCENT (PUA)
+    "\U000f0000",  # Supplementary PUA
+    "\u200d",  # ZERO WIDTH JOINER
+    "\r",
+    "\n",
+]
+characters = st.one_of(
+    st.sampled_from(SPECIAL_CHARACTERS + ["\U0001f600"]),  # GRINNING FACE
+    st.characters(blacklist_categories=("Cs",)),
+)
+texts = st.text(characters, max_size=30)
+
+# uniseg implements the segmentation rules of an older Unicode version than regex,
+# so the segmentation is compared on the scripts of (historical) prints only, where
+# the rules and character properties did not change
+segmentation_characters = st.one_of(
+    st.sampled_from(SPECIAL_CHARACTERS),
+    st.characters(max_codepoint=0x52F, blacklist_characters="\xa9\xae"),
+    st.characters(min_codepoint=0x1DC0, max_codepoint=0x1DE6),
+    st.characters(min_codepoint=0x1E00, max_codepoint=0x1EFF),
+    st.characters(min_codepoint=0xA720, max_codepoint=0xA7FF),
+    st.characters(min_codepoint=0xE000, max_codepoint=0xF8FF),
+    st.characters(min_codepoint=0xFB00, max_codepoint=0xFB4F),
+)
+segmentation_texts = st.text(segmentation_characters, max_size=30)
+
+# Lines, without any line breaks
+lines = st.text(
+    characters.filter(lambda c: len(("x" + c + "x").splitlines()) == 1),
+    max_size=15,
+)
+
+
+def graphemes(text):
+    return list(grapheme_clusters(unicodedata.normalize("NFC", text)))
+
+
+def integer_codes(seq1, seq2):
+    codes = {}
+    a = [codes.setdefault(x, len(codes)) for x in seq1]
+    b = [codes.setdefault(x, len(codes)) for x in seq2]
+    return a, b
+
+
+def reference_distance(seq1, seq2):
+    return int(_levenshtein_matrix_python(tuple(seq1), tuple(seq2))[-1, -1])
+
+
+def apply_editops(seq1, seq2, ops):
+    result = list(seq1)
+    for op, i, j in reversed(ops):
+        if op == "delete":
+            del result[i]
+        elif op == "insert":
+            result.insert(i, seq2[j])
+        else:
+            result[i] = seq2[j]
+    return result
+
+
+# The Numba engine is compiled in the first example
+differential = settings(max_examples=200, deadline=None)
+
+
+@pytest.mark.parametrize("engine", available_engines())
+@differential
+@given(texts, texts)
+def test_engine_distance(engine, s1, s2):
+    seq1 = graphemes(s1)
+    seq2 = graphemes(s2)
+    expected = reference_distance(seq1, seq2)
+
+    a, b = integer_codes(seq1, seq2)
+    assert get_engine(engine)(a, b) == expected
+
+    set_engine(engine)
+    try:
+        assert levenshtein(seq1, seq2) == expected
+        assert distance(s1, s2) == expected
+    finally:
+        set_engine(None)
+    distances, lengths = batch_distance([(s1, s2)], engine=engine)
+    assert list(distances) == [expected]
+    assert list(lengths) == [len(seq1)]
+
+
+@differential
+@given(texts, texts, st.integers(min_value=0, max_value=30))
+def test_levenshtein_variants(s1, s2, k):
+    seq1 = graphemes(s1)
+    seq2 = graphemes(s2)
+    expected = reference_distance(seq1, seq2)
+
+    assert levenshtein_bitparallel(seq1, seq2) == expected
+    assert levenshtein_banded(seq1, seq2, k) == (expected if expected <= k else None)
+    assert (
+        _levenshtein_matrix_numpy(tuple(seq1), tuple(seq2))
+        == _levenshtein_matrix_python(tuple(seq1), tuple(seq2))
+    ).all()
+
+
+@differential
+@given(texts, texts, st.integers(min_value=1, max_value=300))
+def test_seq_editops(s1, s2, max_memory):
+    seq1 = graphemes(s1)
+    seq2 = graphemes(s2)
+    expected = _seq_editops_matrix(seq1, seq2)
+    assert seq_editops(seq1, seq2) == expected
+
+    ops = seq_editops(seq1, seq2, max_memory)
+    if alignment_algorithm(seq1, seq2, max_memory) == "linear":
+        # Same cost, but possibly another choice between operations of that cost
+        assert len(ops) == len(expected)
+        assert apply_editops(seq1, seq2, ops) == seq2
+    else:
+        assert ops == expected
+
+
+@differential
+@given(segmentation_texts)
+def test_grapheme_clusters(text):
+    """Test the segmentation against the extended grapheme clusters of regex"""
+    assert list(grapheme_clusters(text)) == regex.findall(r"\X", text)
+
+
+@differential
+@given(st.lists(lines, min_size=1, max_size=5))
+def test_grapheme_clusters_lines(text_lines):
+    """Test that line by line segmentation is the same as for the whole text
+
+    The incremental and parallel alignments rely on this.
+    """
+    line_graphemes = []
+    for i, line in enumerate(text_lines):
+        if i > 0:
+            line_graphemes.append("\n")
+        line_graphemes.extend(graphemes(line))
+    assert graphemes("\n".join(text_lines)) == line_graphemes
+
+
+# The substitutions of substitute_equivalences(), in the order they are applied,
+# kept here to detect any change of its results
+REFERENCE_LIGATURES = [
+    ("\ueba6", "ſſ"),
+    ("\ueba7", "ſſi"),
+    ("\uf502", "ch"),
+    ("\ueec4", "ck"),
+    ("\uf4f9", "ll"),
+    ("\ueba2", "ſi"),
+    ("\ueada", "ſt"),
+    ("\ufb01", "fi"),
+    ("\ufb00", "ff"),
+    ("\ufb02", "fl"),
+    ("\ufb03", "ffi"),
+    ("\ueec5", "ct"),
+    ("\ueedc", "tz"),
+    ("\uf532", "as"),
+    ("\uf533", "is"),
+    ("\uf534", "us"),
+    ("\uf535", "Qu"),
+    ("\u0133", "ij"),
+    ("\ue8bf", "q&"),
+    ("\ueba5", "ſp"),
+    ("\ufb06", "st"),
+]
+REFERENCE_EQUIVALENCES = [
+    ("\ue72b", "ü"),
+    ("\ue42c", "ä"),
+    ("==", "\u2013"),
+    ("\u2014", "\u2013"),
+    ("\ue644", "ö"),
+    ("\u2019", "'"),
+    ("\u2e17", "-"),
+    ("a\u0364", "ä"),
+    ("o\u0364", "ö"),
+    ("u\u0364", "ü"),
+    ("\uf50e", "q\u0301"),
+]
+
+
+def reference_substitute_equivalences(text):
+    text = unicodedata.normalize("NFC", text)
+    for fr, to in REFERENCE_LIGATURES + REFERENCE_EQUIVALENCES:
+        text = text.replace(fr, to)
+    return text
+
+
+@differential
+@given(texts)
+def test_substitute_equivalences(text):
+    expected = reference_substitute_equivalences(text)
+    assert substitute_equivalences(text) == expected
+    assert ExtractedText.from_str(text).text == expected
+
+
+@differential
+@given(st.lists(lines, min_size=1, max_size=5))
+def test_substitute_equivalences_lines(text_lines):
+    assert substitute_equivalences("\n".join(text_lines)) == "\n".join(
+        substitute_equivalences(line) for line in text_lines
+    )
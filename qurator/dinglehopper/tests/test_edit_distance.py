@@ -2,7 +2,18 @@ from __future__ import division, print_function
 
 import unicodedata
 
-from .. import levenshtein, distance
+import random
+
+import numpy as np
+
+from .. import levenshtein, levenshtein_banded, levenshtein_bitparallel, distance
+from .. import edit_distance
+from ..edit_distance import (
+    _levenshtein_matrix_numpy,
+    _levenshtein_matrix_python,
+    _matrix_dtype,
+)
+from ..instrumentation import Counters
 
 
 def test_levenshtein():
@@ -42,3 +53,71 @@ def test_distance():
         len(word2) == 7
     )  # This, OTOH, ends with LATIN SMALL LETTER M + COMBINING TILDE, 7 code points
     assert distance(word1, word2) == 1
+
+
+def test_levenshtein_banded():
+    assert levenshtein_banded("Foo", "Bar", 3) == 3
+    assert levenshtein_banded("Foo", "Bar", 2) is None
+    assert levenshtein_banded("Abstand", "Sand", 4) == 4
+    assert levenshtein_banded("Abstand", "Sand", 3) is None
+    assert levenshtein_banded("", "", 0) == 0
+    assert levenshtein_banded("Foo", "Foo", 0) == 0
+
+    rng = random.Random(0)
+    for _ in range(200):
+        s1 = "".join(rng.choice("ab") for _ in range(rng.randrange(10)))
+        s2 = "".join(rng.choice("ab") for _ in range(rng.randrange(10)))
+        d = levenshtein(s1, s2)
+        for k in range(10):
+            assert levenshtein_banded(s1, s2, k) == (d if d <= k else None)
+
+
+def test_levenshtein_bitparallel():
+    assert levenshtein_bitparallel("Foo", "Bar") == 3
+    assert levenshtein_bitparallel("Abstand", "Sand") == 4
+    assert levenshtein_bitparallel("", "Foo") == 3
+    assert levenshtein_bitparallel("Foo", "") == 3
+    assert levenshtein_bitparallel("", "") == 0
+    assert levenshtein_bitparallel(["Foo", "Bar"], ["Foo", "Baz"]) == 1
+
+    rng = random.Random(0)
+    for _ in range(500):
+        s1 = "".join(rng.choice("abc") for _ in range(rng.randrange(80)))
+        s2 = "".join(rng.choice("abc") for _ in range(rng.randrange(80)))
+        assert levenshtein_bitparallel(s1, s2) == levenshtein(s1, s2)
+
+
+def test_levenshtein_matrix_numpy():
+    rng = random.Random(0)
+    for _ in range(500):
+        s1 = tuple(rng.choice("abc") for _ in range(rng.randrange(20)))
+        s2 = tuple(rng.choice("abc") for _ in range(rng.randrange(20)))
+        expected = _levenshtein_matrix_python(s1, s2)
+        D = _levenshtein_matrix_numpy(s1, s2)
+        assert D.shape == expected.shape
+        assert (D == expected).all()
+
+    words = ("Foo", "Bar", "Baz", "Foo", "Bar")
+    assert (
+        _levenshtein_matrix_numpy(words, words[::-1])
+        == _levenshtein_matrix_python(words, words[::-1])
+    ).all()
+
+
+def test_levenshtein_matrix_dtype():
+    assert _levenshtein_matrix_numpy(tuple("Foo"), tuple("Bar")).dtype == np.uint16
+    assert _matrix_dtype(65534, 10) == np.uint16
+    assert _matrix_dtype(10, 65535) == np.uint32
+
+
+def test_levenshtein_matrix_memmap(monkeypatch):
+    monkeypatch.setattr(edit_distance, "MATRIX_MEMORY_BUDGET", 100)
+    s1 = tuple("Die Verſprochene Stelle")
+    s2 = tuple("Dle Verfprochene Stclle")
+    with Counters() as counters:
+        D = _levenshtein_matrix_numpy(s1, s2)
+    assert counters.get("levenshtein_matrix_memmaps") == 1
+    assert isinstance(D, np.memmap)
+    assert D[-1, -1] == 3
+    monkeypatch.undo()
+    assert (D == _levenshtein_matrix_numpy(s1, s2)).all()
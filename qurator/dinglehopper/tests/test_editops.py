@@ -1,6 +1,13 @@
+import random
 import unicodedata
 
 from .. import seq_editops, editops
+from ..edit_distance import (
+    _seq_editops_matrix,
+    alignment_algorithm,
+    levenshtein,
+    levenshtein_directions,
+)
 
 
 def test_trivial():
@@ -61,3 +68,68 @@ def test_editops_canonically_equivalent():
     assert left != right
     assert unicodedata.normalize("NFC", left) == unicodedata.normalize("NFC", right)
     assert editops(left, right) == []
+
+
+def test_seq_editops_matrix():
+    """Test that the directions give the same backtrace as the whole matrix"""
+    rng = random.Random(0)
+    for _ in range(1000):
+        s1 = "".join(rng.choice("abc") for _ in range(rng.randrange(20)))
+        s2 = "".join(rng.choice("abc") for _ in range(rng.randrange(20)))
+        assert seq_editops(s1, s2) == _seq_editops_matrix(s1, s2)
+
+
+def test_levenshtein_directions():
+    d, P = levenshtein_directions("Foo", "Fooo")
+    assert d == 1
+    # 2 bits per cell, 4 cells per byte
+    assert P.shape == (4, 2)
+    assert P.nbytes == 8
+
+
+def apply_editops(s1, s2, ops):
+    """Apply the edit operations to s1, which should result in s2"""
+    result = list(s1)
+    for op, i, j in reversed(ops):
+        if op == "delete":
+            del result[i]
+        elif op == "insert":
+            result.insert(i, s2[j])
+        else:
+            result[i] = s2[j]
+    return "".join(result)
+
+
+def test_alignment_algorithm():
+    s1 = "Dies ist ein Beispielsatz!" * 4
+    s2 = "Dies isi ein Beispielsatz!" * 4
+    assert alignment_algorithm(s1, s2) == "full"
+    assert alignment_algorithm(s1, s2, max_memory=10**6) == "full"
+    assert alignment_algorithm(s1, s2, max_memory=1000) == "banded"
+    assert alignment_algorithm(s1, s2[::-1], max_memory=1000) == "linear"
+
+
+def test_seq_editops_banded():
+    """Test that the banded alignment gives the same edit operations"""
+    rng = random.Random(0)
+    for _ in range(300):
+        s1 = "".join(rng.choice("abc") for _ in range(rng.randrange(40)))
+        s2 = list(s1)
+        for _ in range(rng.randrange(4)):
+            s2.insert(rng.randrange(len(s2) + 1), rng.choice("abcd"))
+        s2 = "".join(s2)
+        max_memory = (len(s1) + 1) * ((len(s2) + 4) // 4) - 1
+        if alignment_algorithm(s1, s2, max_memory) == "banded":
+            assert seq_editops(s1, s2, max_memory) == seq_editops(s1, s2)
+
+
+def test_seq_editops_linear():
+    """Test that the linear space alignment gives edit operations of minimal cost"""
+    rng = random.Random(0)
+    for _ in range(300):
+        s1 = "".join(rng.choice("abc") for _ in range(rng.randrange(40)))
+        s2 = "".join(rng.choice("abc") for _ in range(rng.randrange(40)))
+        max_memory = rng.choice([1, 10, 40])
+        ops = seq_editops(s1, s2, max_memory)
+        assert len(ops) == levenshtein(s1, s2)
+        assert apply_editops(s1, s2, ops) == s2
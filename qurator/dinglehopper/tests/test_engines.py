@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from .. import engines
+from ..edit_distance import _levenshtein_matrix_python, levenshtein
+from ..engines import available_engines, engine_name, get_engine, set_engine
+
+
+@pytest.fixture
+def reset_engine():
+    yield
+    set_engine(None)
+
+
+@pytest.mark.parametrize("engine", available_engines())
+def test_engine(engine):
+    distance = get_engine(engine)
+    assert distance([], []) == 0
+    assert distance([1, 2, 3], []) == 3
+    assert distance([], [1, 2, 3]) == 3
+    assert distance([1, 2, 3], [1, 2, 3]) == 0
+    assert distance([1, 2, 3], [3, 2, 1]) == 2
+
+    rng = random.Random(0)
+    for _ in range(300):
+        a = tuple(rng.randrange(4) for _ in range(rng.randrange(30)))
+        b = tuple(rng.randrange(4) for _ in range(rng.randrange(30)))
+        assert distance(a, b) == _levenshtein_matrix_python(a, b)[-1, -1]
+
+
+def test_available_engines():
+    names = available_engines()
+    assert {"python", "numpy", "bitparallel"} <= set(names)
+    # The fastest first
+    assert names.index("bitparallel") < names.index("python")
+    assert engine_name() == names[0]
+
+
+def test_set_engine(reset_engine, monkeypatch):
+    monkeypatch.setenv("DINGLEHOPPER_ENGINE", "numpy")
+    assert engine_name() == "numpy"
+    set_engine("python")
+    assert engine_name() == "python"
+    assert levenshtein("Foo", "Bar") == 3
+    set_engine(None)
+    assert engine_name() == "numpy"
+
+    with pytest.raises(ValueError):
+        set_engine("fortran")
+    monkeypatch.setenv("DINGLEHOPPER_ENGINE", "fortran")
+    with pytest.raises(ValueError):
+        engine_name()
+
+
+def test_register_engine(reset_engine, monkeypatch):
+    monkeypatch.setattr(engines, "_engines", dict(engines._engines))
+    calls = []
+
+    def distance(a, b):
+        calls.append((a, b))
+        return engines.python_distance(a, b)
+
+    engines.register_engine("test", distance, 1000)
+    assert available_engines()[0] == "test"
+    assert levenshtein(["Foo", "Bar"], ["Bar"]) == 1
+    assert calls == [([0, 1], [1])]
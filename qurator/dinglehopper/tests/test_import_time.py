@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Modules the console scripts (and the package itself) must not import on
+# startup, because only some code paths need them
+HEAVY_MODULES = ("jinja2", "markupsafe", "ocrd", "ocrd_utils", "ocrd_models", "tqdm")
+NOT_IMPORTED = {
+    "qurator.dinglehopper": HEAVY_MODULES + ("numpy", "lxml", "uniseg", "multimethod"),
+    "qurator.dinglehopper.cli_extract": HEAVY_MODULES + ("numpy",),
+    "qurator.dinglehopper.cli": HEAVY_MODULES,
+    "qurator.dinglehopper.cli_summarize": HEAVY_MODULES,
+    "qurator.dinglehopper.cli_bench": HEAVY_MODULES,
+    "qurator.dinglehopper.server": ("ocrd", "ocrd_utils", "ocrd_models", "tqdm"),
+    "qurator.dinglehopper.client": HEAVY_MODULES
+    + ("numpy", "lxml", "uniseg", "multimethod"),
+}
+
+# Import time budgets in seconds, can be scaled for slow machines using
+# DINGLEHOPPER_IMPORT_BUDGET_FACTOR
+BUDGETS = {
+    "qurator.dinglehopper": 0.5,
+    "qurator.dinglehopper.cli_extract": 0.75,
+    "qurator.dinglehopper.cli": 1.0,
+    "qurator.dinglehopper.cli_summarize": 1.0,
+    "qurator.dinglehopper.cli_bench": 1.0,
+    "qurator.dinglehopper.server": 1.0,
+    "qurator.dinglehopper.client": 0.5,
+    "qurator.dinglehopper.ocrd_cli": 3.0,
+}
+BUDGET_FACTOR = float(os.environ.get("DINGLEHOPPER_IMPORT_BUDGET_FACTOR", 1))
+
+
+def run_python(code, *args):
+    return subprocess.run(
+        [sys.executable] + list(args) + ["-c", code],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+
+def top_level_import_times(code):
+    """Return the cumulative import time in seconds of each top-level import."""
+    times = {}
+    for line in run_python(code, "-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit() and not name[1:].startswith(" "):
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+@pytest.mark.parametrize("module", sorted(NOT_IMPORTED))
+def test_heavy_modules_not_imported(module):
+    imported = run_python(
+        "import sys, {}; print(' '.join(sys.modules))".format(module)
+    ).stdout.split()
+    assert [m for m in NOT_IMPORTED[module] if m in imported] == []
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="needs python -X importtime")
+@pytest.mark.parametrize("module", sorted(BUDGETS))
+def test_import_time_budget(module):
+    interpreter = top_level_import_times("pass")
+    times = top_level_import_times("import " + module)
+    import_time = sum(t for name, t in times.items() if name not in interpreter)
+    assert import_time <= BUDGETS[module] * BUDGET_FACTOR
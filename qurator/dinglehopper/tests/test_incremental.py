@@ -0,0 +1,123 @@
+import json
+import os
+
+import pytest
+
+from .util import working_directory
+from .. import seq_align
+from ..cli import process
+from ..confusion import alignment_confusion, character_confusion
+from ..incremental import LineCache, alignment_error_rate_n, incremental_alignments
+from ..instrumentation import Counters
+from ..ocr_files import plain_extract_lines
+
+GT = ["Die Verſprochene Stelle", "ein ſehr ſchönes Buch", "", "mit Bildern"]
+OCR = ["Dle Verfprochene Stclle", "ein fehr ſchones Buchh", "", "mit Bildern"]
+
+
+def texts(gt_lines, ocr_lines):
+    return plain_extract_lines(gt_lines), plain_extract_lines(ocr_lines)
+
+
+def test_incremental_alignments():
+    gt_text, ocr_text = texts(GT, OCR)
+    cache = LineCache()
+    with Counters() as counters:
+        characters, words = incremental_alignments(gt_text, ocr_text, cache)
+    assert counters.get("incremental_line_cache_misses") == 8
+    assert counters.get("incremental_page_fallbacks", level="characters") == 0
+
+    expected = list(seq_align(gt_text.text, ocr_text.text))
+    assert alignment_error_rate_n(characters) == alignment_error_rate_n(expected)
+    assert alignment_confusion(characters) == character_confusion(gt_text, ocr_text)
+    gt_words = "Die Verſprochene Stelle ein ſehr ſchönes Buch mit Bildern"
+    assert [g for g, _ in words] == gt_words.split()
+    assert alignment_error_rate_n(words) == (pytest.approx(6 / 9), 9)
+
+    # Only the changed line is aligned again
+    ocr_lines = list(OCR)
+    ocr_lines[1] = "ein ſehr ſchönes Buch"
+    gt_text, ocr_text = texts(GT, ocr_lines)
+    with Counters() as counters:
+        characters, _ = incremental_alignments(gt_text, ocr_text, cache)
+    assert counters.get("incremental_line_cache_misses") == 2
+    assert counters.get("incremental_line_cache_hits") == 6
+    assert alignment_error_rate_n(characters) == (pytest.approx(3 / 58), 58)
+
+
+def test_incremental_alignments_fallback():
+    # The OCR merged lines, so the line alignments are not an optimal alignment
+    gt_text, ocr_text = texts(["xxxxab", "cd"], ["xxxx", "abcd"])
+    cache = LineCache()
+    with Counters() as counters:
+        characters, words = incremental_alignments(gt_text, ocr_text, cache)
+    assert counters.get("incremental_page_fallbacks", level="characters") == 1
+    assert characters == list(seq_align(gt_text.text, ocr_text.text))
+    assert alignment_error_rate_n(characters) == (pytest.approx(2 / 9), 9)
+
+    # Different number of lines
+    gt_text, ocr_text = texts(["foo", "bar"], ["foo bar"])
+    characters, _ = incremental_alignments(gt_text, ocr_text, cache)
+    assert characters == list(seq_align(gt_text.text, ocr_text.text))
+
+
+def test_incremental_alignments_max_memory():
+    gt_text, ocr_text = texts(["foo", "bar"], ["foo bar"])
+    with Counters() as counters:
+        characters, _ = incremental_alignments(
+            gt_text, ocr_text, LineCache(), max_memory=4
+        )
+    # The page fallback is aligned in linear space
+    assert counters.get("incremental_page_fallbacks", level="characters") == 1
+    assert counters.get("alignments", algorithm="linear") == 1
+    assert alignment_error_rate_n(characters) == (pytest.approx(1 / 7), 7)
+
+
+def test_line_cache_file(tmp_path):
+    fn = str(tmp_path / "cache.json")
+    assert LineCache.load(fn).lines == {}
+
+    gt_text, ocr_text = texts(GT, OCR)
+    cache = LineCache()
+    expected = incremental_alignments(gt_text, ocr_text, cache)
+    cache.save(fn)
+
+    cache = LineCache.load(fn)
+    with Counters() as counters:
+        assert incremental_alignments(gt_text, ocr_text, cache) == expected
+    assert counters.get("incremental_line_cache_misses") == 0
+
+    # Only the lines used are saved
+    cache = LineCache.load(fn)
+    incremental_alignments(*texts(["foo"], ["bar"]), cache)
+    cache.save(fn)
+    assert len(LineCache.load(fn).lines) == 2
+
+    with open(fn, "w") as f:
+        f.write("garbage")
+    assert LineCache.load(fn).lines == {}
+
+
+@pytest.mark.integration
+def test_process_incremental(tmp_path):
+    def run(ocr_lines, incremental):
+        with open("gt.txt", "w") as f:
+            f.write("\n".join(GT))
+        with open("ocr.txt", "w") as f:
+            f.write("\n".join(ocr_lines))
+        process("gt.txt", "ocr.txt", "report", incremental=incremental)
+        with open("report.json", "r") as f:
+            return json.load(f)
+
+    with working_directory(str(tmp_path)):
+        expected = run(OCR, False)
+        assert run(OCR, True) == expected
+        assert os.path.exists("report.incremental.json")
+        assert run(OCR, True) == expected
+
+        ocr_lines = list(OCR)
+        ocr_lines[0] = "Die Verſprochene Stelle"
+        expected = run(ocr_lines, False)
+        with Counters() as counters:
+            assert run(ocr_lines, True) == expected
+        assert counters.get("incremental_line_cache_misses") == 2
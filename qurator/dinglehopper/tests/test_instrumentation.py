@@ -0,0 +1,129 @@
+import pytest
+from click.testing import CliRunner
+
+from .util import working_directory
+from .. import instrumentation
+from ..cli import main
+from ..edit_distance import levenshtein, levenshtein_matrix_cache_clear
+from ..instrumentation import Counters, prometheus_text, write_prometheus_textfile
+from ..profiling import Profile
+
+
+def test_no_listeners():
+    assert not instrumentation.enabled()
+    instrumentation.count("something")
+    instrumentation.timing("something", 1.0)
+
+
+def test_counters():
+    with Counters() as counters:
+        assert instrumentation.enabled()
+        instrumentation.count("files_parsed", format="page")
+        instrumentation.count("files_parsed", 2, format="page")
+        instrumentation.count("files_parsed", format="alto")
+        instrumentation.timing("stage", 0.5, stage="extract")
+        instrumentation.timing("stage", 1.5, stage="extract")
+    assert not instrumentation.enabled()
+
+    instrumentation.count("files_parsed", format="page")
+    assert counters.get("files_parsed", format="page") == 3
+    assert counters.get("files_parsed", format="alto") == 1
+    assert counters.get("files_parsed", format="text") == 0
+    assert counters.timings[("stage", (("stage", "extract"),))] == [2, 2.0]
+
+
+def test_counters_edit_distance():
+    levenshtein_matrix_cache_clear()
+    with Counters() as counters:
+        levenshtein("abc", "abcd")
+        levenshtein("abc", "abcd")
+    assert counters.get("dp_cells") == 3 * 4
+    assert counters.get("levenshtein_matrix_cache_misses") == 1
+    assert counters.get("levenshtein_matrix_cache_hits") == 1
+
+
+def test_counters_stage_timing():
+    with Counters() as counters:
+        with Profile(enabled=False) as profile:
+            with profile.stage("extract"):
+                pass
+        with Profile(trace_memory=False) as profile:
+            with profile.stage("extract"):
+                pass
+    n, seconds = counters.timings[("stage", (("stage", "extract"),))]
+    assert n == 2
+    assert seconds >= 0
+
+
+def test_prometheus_text():
+    counters = Counters()
+    counters.count("dp_cells", 12, {})
+    counters.count("files_parsed", 1, {"format": 'say "page"'})
+    counters.timing("stage", 0.25, {"stage": "extract"})
+    assert prometheus_text(counters) == (
+        "# TYPE dinglehopper_dp_cells_total counter\n"
+        "dinglehopper_dp_cells_total 12\n"
+        "# TYPE dinglehopper_files_parsed_total counter\n"
+        'dinglehopper_files_parsed_total{format="say \\"page\\""} 1\n'
+        "# TYPE dinglehopper_stage_seconds summary\n"
+        'dinglehopper_stage_seconds_sum{stage="extract"} 0.25\n'
+        'dinglehopper_stage_seconds_count{stage="extract"} 1\n'
+    )
+
+
+def test_prometheus_text_groups_families():
+    counters = Counters()
+    counters.count("alignments", 1, {"algorithm": "full"})
+    counters.count("dp_cells", 12, {})
+    counters.count("alignments", 2, {"algorithm": "banded"})
+    counters.timing("stage", 0.25, {"stage": "extract"})
+    counters.timing("align", 0.5, {})
+    counters.timing("stage", 0.5, {"stage": "align"})
+    assert prometheus_text(counters) == (
+        "# TYPE dinglehopper_alignments_total counter\n"
+        'dinglehopper_alignments_total{algorithm="full"} 1\n'
+        'dinglehopper_alignments_total{algorithm="banded"} 2\n'
+        "# TYPE dinglehopper_dp_cells_total counter\n"
+        "dinglehopper_dp_cells_total 12\n"
+        "# TYPE dinglehopper_align_seconds summary\n"
+        "dinglehopper_align_seconds_sum 0.5\n"
+        "dinglehopper_align_seconds_count 1\n"
+        "# TYPE dinglehopper_stage_seconds summary\n"
+        'dinglehopper_stage_seconds_sum{stage="extract"} 0.25\n'
+        'dinglehopper_stage_seconds_count{stage="extract"} 1\n'
+        'dinglehopper_stage_seconds_sum{stage="align"} 0.5\n'
+        'dinglehopper_stage_seconds_count{stage="align"} 1\n'
+    )
+
+
+def test_write_prometheus_textfile(tmp_path):
+    counters = Counters()
+    counters.count("pages", 1, {})
+    fn = tmp_path / "dinglehopper.prom"
+    write_prometheus_textfile(counters, str(fn))
+    assert fn.read_text() == prometheus_text(counters)
+    assert [p.name for p in tmp_path.iterdir()] == ["dinglehopper.prom"]
+
+
+@pytest.mark.integration
+def test_cli_prometheus_textfile(tmp_path):
+    with working_directory(str(tmp_path)):
+        with open("gt.txt", "w") as gtf:
+            gtf.write("AAAAA")
+        with open("ocr.txt", "w") as ocrf:
+            ocrf.write("AAAAB")
+
+        levenshtein_matrix_cache_clear()
+        result = CliRunner().invoke(
+            main, ["--prometheus-textfile", "dinglehopper.prom", "gt.txt", "ocr.txt"]
+        )
+        assert result.exit_code == 0, result.output
+        assert not instrumentation.enabled()
+
+        with open("dinglehopper.prom") as f:
+            lines = f.read().splitlines()
+        assert "dinglehopper_pages_total 1" in lines
+        assert "dinglehopper_graphemes_total 5" in lines
+        assert "dinglehopper_bytes_parsed_total 10" in lines
+        assert 'dinglehopper_files_parsed_total{format="text"} 2' in lines
+        assert 'dinglehopper_stage_seconds_count{stage="render"} 1' in lines
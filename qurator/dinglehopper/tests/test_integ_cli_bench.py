@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from .util import working_directory
+from ..cli_bench import STAGES, fit_power_law, main
+from ..engines import engine_name
+
+
+def test_fit_power_law():
+    fit = fit_power_law([10, 100, 1000], [0.3, 30, 3000])
+    assert fit["exponent"] == pytest.approx(2)
+    assert fit["coefficient"] == pytest.approx(0.003)
+
+    assert fit_power_law([10, 10], [1, 2]) is None
+    assert fit_power_law([0, 10], [1, 2]) is None
+
+
+@pytest.mark.integration
+def test_cli_bench(tmp_path):
+    with working_directory(str(tmp_path)):
+        for name, text in [
+            ("gt1.txt", "Lorem ipsum dolor sit amet"),
+            ("ocr1.txt", "Lorern ipsum dolor slt amet"),
+            ("gt2.txt", "Lorem ipsum dolor sit amet, consectetur adipiscing elit"),
+            ("ocr2.txt", "Lorem ipsum dolor sit arnet, consectetur adipiscing eIit"),
+        ]:
+            with open(name, "w") as f:
+                f.write(text)
+        with open("pairs.txt", "w") as f:
+            f.write("# GT OCR\n")
+            f.write("gt1.txt ocr1.txt\n")
+            f.write("gt2.txt\tocr2.txt\n")
+
+        result = CliRunner().invoke(main, ["--no-memory", "pairs.txt"])
+        assert result.exit_code == 0, result.output
+
+        with open("capacity.json", "r") as jsonf:
+            report = json.load(jsonf)
+        assert len(report["pairs"]) == 2
+        for m in report["pairs"]:
+            for stage in STAGES:
+                assert m[stage + "_seconds"] >= 0
+                assert stage + "_peak_memory" not in m
+        engine = engine_name()
+        assert report["engines"] == [engine]
+        assert set(report["fits"][engine]) == set(STAGES)
+        assert [t["jobs"] for t in report["throughput"]] == [1]
+
+        result = CliRunner().invoke(
+            main,
+            ["--no-memory", "-j", "1", "-j", "2"]
+            + ["--engine", "python", "--engine", "bitparallel", "pairs.txt"],
+        )
+        assert result.exit_code == 0, result.output
+        with open("capacity.json", "r") as jsonf:
+            report = json.load(jsonf)
+        assert report["engines"] == ["python", "bitparallel"]
+        assert [m["engine"] for m in report["pairs"]] == [
+            "python",
+            "python",
+            "bitparallel",
+            "bitparallel",
+        ]
+        assert set(report["fits"]) == {"python", "bitparallel"}
+        assert [(t["engine"], t["jobs"]) for t in report["throughput"]] == [
+            ("python", 1),
+            ("python", 2),
+            ("bitparallel", 1),
+            ("bitparallel", 2),
+        ]
+
+        result = CliRunner().invoke(main, ["-o", "capacity.csv", "pairs.txt"])
+        assert result.exit_code == 0, result.output
+        with open("capacity.csv", "r") as csvf:
+            header = csvf.readline()
+        assert "render_peak_memory" in header
+
+
+def test_cli_bench_no_pairs(tmp_path):
+    with working_directory(str(tmp_path)):
+        with open("pairs.txt", "w") as f:
+            f.write("\n")
+        result = CliRunner().invoke(main, ["pairs.txt"])
+        assert result.exit_code != 0
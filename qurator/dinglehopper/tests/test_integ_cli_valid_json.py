@@ -1,4 +1,5 @@
 import json
+import os
 
 import pytest
 from .util import working_directory
@@ -40,3 +41,81 @@ def test_cli_json_cer_is_infinity(tmp_path):
         with open("report.json", "r") as jsonf:
             j = json.load(jsonf)
             assert j["cer"] == pytest.approx(float("inf"))
+
+
+@pytest.mark.integration
+def test_cli_json_metrics_only(tmp_path):
+    """Test that the cli/process() only writes the JSON report with metrics_only"""
+
+    with working_directory(str(tmp_path)):
+        with open("gt.txt", "w") as gtf:
+            gtf.write("AAAAA")
+        with open("ocr.txt", "w") as ocrf:
+            ocrf.write("AAAAB")
+
+        process("gt.txt", "ocr.txt", "report", metrics_only=True)
+        assert not os.path.exists("report.html")
+        with open("report.json", "r") as jsonf:
+            j = json.load(jsonf)
+            assert j["cer"] == pytest.approx(0.2)
+            assert j["wer"] == pytest.approx(1.0)
+
+
+@pytest.mark.integration
+def test_cli_json_profile(tmp_path):
+    """Test that the cli/process() writes the profile to the JSON report"""
+
+    with working_directory(str(tmp_path)):
+        with open("gt.txt", "w") as gtf:
+            gtf.write("AAAAA AA")
+        with open("ocr.txt", "w") as ocrf:
+            ocrf.write("AAAAB")
+
+        process("gt.txt", "ocr.txt", "report", profile=True)
+        with open("report.json", "r") as jsonf:
+            j = json.load(jsonf)
+        profile = j["profile"]
+        assert [stage["name"] for stage in profile["stages"]] == [
+            "extract",
+            "character_error_rate",
+            "word_error_rate",
+            "confusion",
+            "align",
+            "render",
+        ]
+        for measurements in profile["stages"]:
+            assert measurements["wall_seconds"] >= 0
+            assert measurements["cpu_seconds"] >= 0
+            assert measurements["peak_memory"] >= 0
+        assert profile["n_characters"] == 8
+        assert profile["n_ocr_characters"] == 5
+        assert profile["n_words"] == 2
+        assert profile["n_ocr_words"] == 1
+        assert profile["dp_cells"] >= 8 * 5 + 2 * 1
+
+        process("gt.txt", "ocr.txt", "report")
+        with open("report.json", "r") as jsonf:
+            assert "profile" not in json.load(jsonf)
+
+
+@pytest.mark.integration
+def test_cli_json_max_memory(tmp_path):
+    """Test that the cli/process() reports the alignment algorithms with max_memory"""
+
+    with working_directory(str(tmp_path)):
+        with open("gt.txt", "w") as gtf:
+            gtf.write("Dies ist ein Beispielsatz! " * 20)
+        with open("ocr.txt", "w") as ocrf:
+            ocrf.write("Dies isi ein Beispielsatz! " * 20)
+
+        process("gt.txt", "ocr.txt", "report")
+        with open("report.json", "r") as jsonf:
+            expected = json.load(jsonf)
+        assert "alignment_algorithms" not in expected
+
+        process("gt.txt", "ocr.txt", "report", max_memory=10000)
+        with open("report.json", "r") as jsonf:
+            j = json.load(jsonf)
+        assert j["alignment_algorithms"] == {"characters": "banded", "words": "full"}
+        assert j["cer"] == pytest.approx(expected["cer"])
+        assert j["wer"] == pytest.approx(expected["wer"])
@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pytest
+from click.testing import CliRunner
+
+from .util import working_directory
+from .. import client
+from .. import server as server_module
+from ..client import EvaluationError, evaluate
+from ..edit_distance import levenshtein_matrix_cache_clear
+from ..engines import engine_name
+from ..server import EvaluationServer, UnixEvaluationServer
+
+
+@contextmanager
+def running(server):
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def write_texts(gt, ocr):
+    with open("gt.txt", "w") as gtf:
+        gtf.write(gt)
+    with open("ocr.txt", "w") as ocrf:
+        ocrf.write(ocr)
+
+
+@pytest.mark.integration
+def test_server(tmp_path):
+    with working_directory(str(tmp_path)), running(
+        EvaluationServer(("127.0.0.1", 0), quiet=True)
+    ) as server:
+        url = "http://127.0.0.1:{}".format(server.server_address[1])
+        write_texts("AAAAA", "AAAAB")
+
+        report = evaluate({"gt": "gt.txt", "ocr": "ocr.txt"}, url=url)
+        assert report["cer"] == pytest.approx(0.2)
+        assert sorted(os.listdir(".")) == ["gt.txt", "ocr.txt"]
+
+        report = evaluate(
+            {
+                "gt": "gt.txt",
+                "ocr": "ocr.txt",
+                "report_prefix": "report",
+                "metrics_only": True,
+            },
+            url=url,
+        )
+        assert report["wer"] == pytest.approx(1.0)
+        assert os.path.exists("report.json")
+        assert not os.path.exists("report.html")
+
+        with pytest.raises(EvaluationError, match="Unknown job options: bogus"):
+            evaluate({"gt": "gt.txt", "ocr": "ocr.txt", "bogus": 1}, url=url)
+        with pytest.raises(EvaluationError, match="does not exist"):
+            evaluate({"gt": "gt.txt", "ocr": "missing.txt"}, url=url)
+        with pytest.raises(EvaluationError, match="Unknown edit distance engine"):
+            evaluate({"gt": "gt.txt", "ocr": "ocr.txt", "engine": "bogus"}, url=url)
+        with pytest.raises(EvaluationError, match="Invalid size"):
+            evaluate({"gt": "gt.txt", "ocr": "ocr.txt", "max_memory": "x"}, url=url)
+
+
+@pytest.mark.integration
+def test_server_options(tmp_path):
+    with working_directory(str(tmp_path)), running(
+        EvaluationServer(("127.0.0.1", 0), quiet=True)
+    ) as server:
+        url = "http://127.0.0.1:{}".format(server.server_address[1])
+        write_texts("Dies ist ein Beispielsatz!", "Dies isi ein Beispielsatz!")
+
+        report = evaluate(
+            {
+                "gt": "gt.txt",
+                "ocr": "ocr.txt",
+                "report_prefix": "report",
+                "incremental": True,
+                "pair_cache": "pairs.sqlite",
+                "engine": "python",
+            },
+            url=url,
+        )
+        assert report["cer"] == pytest.approx(1 / 26)
+        assert os.path.exists("report.incremental.json")
+        assert os.path.exists("pairs.sqlite")
+        # The engine is only selected for the job
+        assert engine_name() != "python"
+
+        report = evaluate(
+            {"gt": "gt.txt", "ocr": "ocr.txt", "max_memory": "100"}, url=url
+        )
+        assert report["alignment_algorithms"]["characters"] == "banded"
+
+
+@pytest.mark.integration
+def test_server_profile_jobs_run_one_at_a_time(tmp_path, monkeypatch):
+    running_jobs = []
+    overlapped = []
+    process = server_module.process
+
+    def checked_process(*args, **kwargs):
+        running_jobs.append(None)
+        overlapped.append(len(running_jobs) > 1)
+        # Compute the same DP cells in every job
+        levenshtein_matrix_cache_clear()
+        try:
+            return process(*args, **kwargs)
+        finally:
+            running_jobs.pop()
+
+    monkeypatch.setattr(server_module, "process", checked_process)
+    with working_directory(str(tmp_path)), running(
+        EvaluationServer(("127.0.0.1", 0), quiet=True)
+    ) as server:
+        url = "http://127.0.0.1:{}".format(server.server_address[1])
+        write_texts("AAAAA" * 100, "AAAAB" * 100)
+
+        job = {"gt": "gt.txt", "ocr": "ocr.txt", "profile": True}
+        with ThreadPoolExecutor(4) as executor:
+            reports = list(executor.map(lambda _: evaluate(job, url=url), range(8)))
+    assert not any(overlapped)
+    dp_cells = [r["profile"]["dp_cells"] for r in reports]
+    assert dp_cells[0] > 0
+    assert dp_cells == [dp_cells[0]] * 8
+
+
+def test_server_refuses_remote_hosts():
+    result = CliRunner().invoke(server_module.main, ["--host", "0.0.0.0"])
+    assert result.exit_code != 0
+    assert "Refusing to listen on 0.0.0.0" in result.output
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("jobs", [0, 2])
+def test_server_concurrent(tmp_path, jobs):
+    executor = ProcessPoolExecutor(jobs) if jobs else None
+    with working_directory(str(tmp_path)), running(
+        EvaluationServer(("127.0.0.1", 0), executor=executor, quiet=True)
+    ) as server:
+        url = "http://127.0.0.1:{}".format(server.server_address[1])
+        write_texts("AAAAA", "AAAAB")
+
+        jobs = [
+            {"gt": "gt.txt", "ocr": "ocr.txt", "report_prefix": "report{}".format(i)}
+            for i in range(8)
+        ]
+        with ThreadPoolExecutor(4) as executor:
+            reports = list(executor.map(lambda job: evaluate(job, url=url), jobs))
+        assert [r["cer"] for r in reports] == [pytest.approx(0.2)] * 8
+        assert all(os.path.exists("report{}.html".format(i)) for i in range(8))
+    if executor is not None:
+        executor.shutdown()
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs Unix sockets")
+def test_server_unix_socket_and_client_cli(tmp_path):
+    socket_path = str(tmp_path / "dinglehopper.sock")
+    with working_directory(str(tmp_path)), running(
+        UnixEvaluationServer(socket_path, quiet=True)
+    ):
+        write_texts("AAAAA", "AAAAB")
+
+        result = CliRunner().invoke(
+            client.main, ["--socket", socket_path, "gt.txt", "ocr.txt"]
+        )
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output)["cer"] == pytest.approx(0.2)
+        assert os.path.exists("report.html")
+        assert os.stat(socket_path).st_mode & 0o777 == 0o600
+    assert not os.path.exists(socket_path)
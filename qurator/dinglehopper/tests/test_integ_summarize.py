@@ -0,0 +1,49 @@
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from .util import working_directory
+from ..cli import process
+from ..cli_summarize import main
+
+
+@pytest.mark.integration
+def test_summarize(tmp_path):
+    with working_directory(str(tmp_path)):
+        os.mkdir("reports")
+        for gt, ocr, name in [
+            ("AAAAA", "AAAAB", "report1"),
+            ("AB AB", "AB AB", "report2"),
+            ("", "Not important", "report3"),
+        ]:
+            with open("gt.txt", "w") as gtf:
+                gtf.write(gt)
+            with open("ocr.txt", "w") as ocrf:
+                ocrf.write(ocr)
+            process(
+                "gt.txt",
+                "ocr.txt",
+                os.path.join("reports", name),
+                profile=(name != "report3"),
+            )
+
+        result = CliRunner().invoke(main, ["reports"])
+        assert result.exit_code == 0
+
+        with open(os.path.join("reports", "summary.json"), "r") as jsonf:
+            summary = json.load(jsonf)
+        assert summary["num_reports"] == 3
+        assert summary["n_characters"] == 10
+        assert summary["cer"] == pytest.approx(0.1)
+        assert summary["wer"] == pytest.approx(1 / 3)
+        assert ["A", "B", 1] in summary["confusion"]
+        assert summary["profile"]["num_profiles"] == 2
+        assert summary["profile"]["n_characters"] == 10
+        assert summary["profile"]["stages"][0]["name"] == "extract"
+
+        # Summarizing again does not include the summary itself
+        result = CliRunner().invoke(main, ["reports"])
+        with open(os.path.join("reports", "summary.json"), "r") as jsonf:
+            assert json.load(jsonf)["num_reports"] == 3
@@ -0,0 +1,121 @@
+import json
+from multiprocessing import Pool
+
+import pytest
+
+from .util import working_directory
+from .. import PairCache, SharedPairCache, batch_distance
+from ..cli import process
+from ..incremental import LineCache, incremental_alignments
+from ..instrumentation import Counters
+from ..ocr_files import plain_extract_lines
+
+
+def test_pair_cache():
+    cache = PairCache(max_entries=2)
+    assert cache.get("distance", "a", "b") is None
+    cache.put("distance", "a", "b", 1)
+    cache.put("distance", "a", "a", 0)
+    assert cache.get("distance", "a", "b") == 1
+    assert cache.get("distance", "a", "a") == 0
+    assert cache.get("alignment", "a", "b") is None
+
+    # Evicts the least recently used
+    cache.get("distance", "a", "b")
+    cache.put("distance", "b", "b", 0)
+    assert len(cache) == 2
+    assert cache.get("distance", "a", "a") is None
+    assert cache.get("distance", "a", "b") == 1
+
+    assert cache.stats() == {"hits": 4, "misses": 3, "hit_rate": 4 / 7}
+
+
+def test_shared_pair_cache(tmp_path):
+    fn = str(tmp_path / "cache.sqlite")
+    with SharedPairCache(fn) as cache:
+        cache.put("alignment", "ab", "b", [["a", None], ["b", "b"]])
+        with Counters() as counters:
+            assert cache.get("alignment", "ab", "b") == [["a", None], ["b", "b"]]
+            assert cache.get("alignment", "ab", "c") is None
+        assert counters.get("pair_cache_hits", kind="alignment") == 1
+        assert counters.get("pair_cache_misses", kind="alignment") == 1
+
+    with SharedPairCache(fn) as cache:
+        assert cache.get("alignment", "ab", "b") == [["a", None], ["b", "b"]]
+
+
+def test_shared_pair_cache_prune(tmp_path):
+    with SharedPairCache(str(tmp_path / "cache.sqlite"), max_entries=10) as cache:
+        cache.PRUNE_INTERVAL = 5
+        for i in range(20):
+            cache.put("distance", str(i), "", i)
+        assert len(cache) <= 10
+        assert cache.get("distance", "19", "") == 19
+        assert cache.get("distance", "0", "") is None
+
+
+def put_and_get(args):
+    fn, i = args
+    with SharedPairCache(fn) as cache:
+        cache.put("distance", str(i), "", i)
+        return [cache.get("distance", str(j), "") for j in range(i + 1)]
+
+
+def test_shared_pair_cache_processes(tmp_path):
+    fn = str(tmp_path / "cache.sqlite")
+    SharedPairCache(fn).close()
+    with Pool(4) as pool:
+        pool.map(put_and_get, [(fn, i) for i in range(20)])
+    with SharedPairCache(fn) as cache:
+        assert [cache.get("distance", str(i), "") for i in range(20)] == list(range(20))
+
+
+def test_batch_distance_cache():
+    cache = PairCache()
+    pairs = [("Fnord", "Food"), ("Müll", "Mull"), ("Fnord", "Food")]
+    distances, lengths = batch_distance(pairs, cache=cache)
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["misses"] == 2
+
+    with Counters() as counters:
+        cached = batch_distance(pairs + [("Foo", "")], cache=cache)
+    assert cache.stats()["hits"] == 3
+    assert list(cached[0]) == list(distances) + [3]
+    assert list(cached[1]) == list(lengths) + [3]
+    # Only the new pair was computed
+    assert counters.get("pair_cache_misses", kind="distance_grapheme") == 1
+
+
+def test_line_cache_with_pair_cache():
+    gt_text = plain_extract_lines(["Kopfzeile 1", "Inhalt"])
+    ocr_text = plain_extract_lines(["Kopfzeile l", "Inha1t"])
+    pair_cache = PairCache()
+    expected = incremental_alignments(gt_text, ocr_text, LineCache())
+    assert (
+        incremental_alignments(gt_text, ocr_text, LineCache(pair_cache=pair_cache))
+        == expected
+    )
+    assert pair_cache.stats()["misses"] == 4
+    assert (
+        incremental_alignments(gt_text, ocr_text, LineCache(pair_cache=pair_cache))
+        == expected
+    )
+    assert pair_cache.stats()["hits"] == 4
+
+
+@pytest.mark.integration
+def test_process_pair_cache(tmp_path):
+    with working_directory(str(tmp_path)):
+        with open("gt.txt", "w") as f:
+            f.write("Kopfzeile 1\nDie Verſprochene Stelle\n")
+        with open("ocr.txt", "w") as f:
+            f.write("Kopfzeile l\nDle Verfprochene Stclle\n")
+
+        process("gt.txt", "ocr.txt", "expected")
+        with SharedPairCache("cache.sqlite") as cache:
+            process("gt.txt", "ocr.txt", "report", pair_cache=cache)
+            process("gt.txt", "ocr.txt", "report", pair_cache=cache)
+            assert cache.stats()["hit_rate"] == 0.5
+
+        with open("expected.json") as f, open("report.json") as g:
+            assert json.load(f) == json.load(g)
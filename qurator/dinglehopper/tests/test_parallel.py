@@ -0,0 +1,118 @@
+import json
+from multiprocessing import Pool
+
+import pytest
+
+from .util import working_directory
+from .. import levenshtein, seq_align
+from ..cli import process
+from ..incremental import alignment_error_rate_n
+from ..instrumentation import Counters
+from ..ocr_files import plain_extract_lines
+from ..parallel import (
+    anchored_blocks,
+    parallel_alignments,
+    parallel_seq_align,
+    unique_anchors,
+    word_tokens,
+)
+from ..word_error_rate import word_error_rate_n
+
+GT = [
+    "Die Verſprochene Stelle wird hier gedruckt",
+    "ein ſehr ſchönes Buch mit vielen Bildern",
+    "und die Amtmännin ſprach zu ihrem Manne",
+]
+OCR = [
+    "Dle Verfprochene Stclle wird hier gedruckt",
+    "ein fehr ſchones Buchh mit vielen Bildern",
+    "und die Amtmannin ſprach zu ihrem Manne",
+]
+
+
+def test_unique_anchors():
+    assert unique_anchors(list("abc"), list("abc")) == [(0, 0), (1, 1), (2, 2)]
+    # Repeated keys are not anchors
+    assert unique_anchors(list("abac"), list("abc")) == [(1, 1), (3, 2)]
+    # Only anchors in the same order in both sequences are kept
+    assert unique_anchors(list("abcd"), list("bcda")) == [(1, 0), (2, 1), (3, 2)]
+    assert unique_anchors(["a", None, "b"], ["a", None, "b"]) == [(0, 0), (2, 2)]
+    assert unique_anchors([], list("abc")) == []
+
+
+def test_anchored_blocks():
+    gt = list("foo bar baz")
+    ocr = list("fo bar bax")
+    blocks = anchored_blocks(gt, ocr, word_tokens(gt), word_tokens(ocr))
+    assert blocks == [
+        (0, 4, 0, 3, False),
+        (4, 7, 3, 6, True),
+        (7, 11, 6, 10, False),
+    ]
+    assert word_tokens(list(" a  bc ")) == [(1, 2), (4, 6)]
+
+
+def test_parallel_seq_align():
+    gt = list("\n".join(GT))
+    ocr = list("\n".join(OCR))
+    with Pool(2) as pool:
+        with Counters() as counters:
+            alignment = parallel_seq_align(
+                gt, ocr, word_tokens(gt), word_tokens(ocr), pool, 4
+            )
+    assert counters.get("parallel_fallbacks") == 0
+    assert [g for g, _ in alignment if g is not None] == gt
+    assert [o for _, o in alignment if o is not None] == ocr
+    assert sum(1 for g, o in alignment if g != o) == levenshtein(gt, ocr)
+
+
+def test_parallel_seq_align_fallback():
+    # The anchor "yyyy" forces a suboptimal alignment of the "xxxx" blocks
+    gt = list("xxxx yyyy aaaa")
+    ocr = list("aaaa yyyy xxxx")
+    with Pool(2) as pool:
+        with Counters() as counters:
+            alignment = parallel_seq_align(
+                gt, ocr, word_tokens(gt), word_tokens(ocr), pool, 4
+            )
+    assert counters.get("parallel_fallbacks") == 1
+    assert alignment == list(seq_align(gt, ocr))
+
+
+def test_parallel_seq_align_max_memory():
+    gt = list("xxxx yyyy aaaa")
+    ocr = list("aaaa yyyy xxxx")
+    with Pool(2) as pool:
+        with Counters() as counters:
+            alignment = parallel_seq_align(
+                gt, ocr, word_tokens(gt), word_tokens(ocr), pool, 4, max_memory=20
+            )
+    assert counters.get("parallel_fallbacks") == 1
+    # The blocks are aligned in the pool, the fallback is not aligned as a whole
+    assert counters.get("alignments", algorithm="full") == 0
+    assert sum(1 for g, o in alignment if g != o) == levenshtein(gt, ocr)
+
+
+def test_parallel_alignments():
+    gt_text = plain_extract_lines(GT)
+    ocr_text = plain_extract_lines(OCR)
+    characters, words = parallel_alignments(gt_text, ocr_text, 2)
+
+    expected = list(seq_align(gt_text.text, ocr_text.text))
+    assert alignment_error_rate_n(characters) == alignment_error_rate_n(expected)
+    assert alignment_error_rate_n(words) == word_error_rate_n(gt_text, ocr_text)
+
+
+@pytest.mark.integration
+def test_process_processes(tmp_path):
+    def run(processes):
+        with open("gt.txt", "w") as f:
+            f.write("\n".join(GT))
+        with open("ocr.txt", "w") as f:
+            f.write("\n".join(OCR))
+        process("gt.txt", "ocr.txt", "report", processes=processes)
+        with open("report.json", "r") as f:
+            return json.load(f)
+
+    with working_directory(str(tmp_path)):
+        assert run(2) == run(None)
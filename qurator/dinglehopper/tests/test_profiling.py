@@ -0,0 +1,71 @@
+import pytest
+
+from ..edit_distance import levenshtein, levenshtein_matrix_cache_clear
+from ..profiling import Profile, summarize_profiles
+
+
+def test_profile_stage():
+    with Profile() as profile:
+        with profile.stage("allocate"):
+            data = [0] * 100000
+        with profile.stage("nothing"):
+            pass
+    del data
+
+    assert list(profile.stages) == ["allocate", "nothing"]
+    assert profile.stages["allocate"]["wall_seconds"] >= 0
+    assert profile.stages["allocate"]["cpu_seconds"] >= 0
+    assert profile.stages["allocate"]["peak_memory"] >= 100000 * 8
+    assert profile.stages["nothing"]["peak_memory"] < 100000
+
+
+def test_profile_stage_exception():
+    profile = Profile(trace_memory=False)
+    with pytest.raises(ValueError):
+        with profile.stage("fail"):
+            raise ValueError()
+    assert "peak_memory" not in profile.stages["fail"]
+
+
+def test_profile_disabled():
+    with Profile(enabled=False) as profile:
+        with profile.stage("something"):
+            pass
+    assert not profile.stages
+
+
+def test_profile_dp_cells():
+    levenshtein_matrix_cache_clear()
+    with Profile() as profile:
+        levenshtein("abc", "abcd")
+        levenshtein("abc", "abcd")  # cached
+    levenshtein("abcd", "abc")
+    assert profile.dp_cells == 3 * 4
+    assert profile.to_json()["dp_cells"] == 3 * 4
+
+
+def test_summarize_profiles():
+    summary = summarize_profiles(
+        [
+            {
+                "stages": [{"name": "extract", "wall_seconds": 1.0, "peak_memory": 10}],
+                "n_characters": 5,
+                "dp_cells": 25,
+            },
+            {
+                "stages": [
+                    {"name": "extract", "wall_seconds": 2.0, "peak_memory": 20},
+                    {"name": "render", "wall_seconds": 0.5, "peak_memory": 5},
+                ],
+                "n_characters": 3,
+                "dp_cells": 9,
+            },
+        ]
+    )
+    assert summary["num_profiles"] == 2
+    assert summary["stages"] == [
+        {"name": "extract", "wall_seconds": 3.0, "peak_memory": 20},
+        {"name": "render", "wall_seconds": 0.5, "peak_memory": 5},
+    ]
+    assert summary["n_characters"] == 8
+    assert summary["dp_cells"] == 34
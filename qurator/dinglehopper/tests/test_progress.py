@@ -0,0 +1,83 @@
+import io
+from multiprocessing import Pool
+
+import pytest
+
+from .. import instrumentation
+from ..edit_distance import levenshtein, levenshtein_matrix_cache_clear
+from ..progress import Progress, WorkerProgress, estimate_cost, format_duration
+
+
+def test_format_duration():
+    assert format_duration(0) == "0:00:00"
+    assert format_duration(3725.5) == "1:02:05"
+
+
+def test_estimate_cost(tmp_path):
+    (tmp_path / "gt.txt").write_text("a" * 10)
+    (tmp_path / "ocr.txt").write_text("a" * 20)
+    (tmp_path / "empty.txt").write_text("")
+    assert estimate_cost(str(tmp_path / "gt.txt"), str(tmp_path / "ocr.txt")) == 200
+    assert estimate_cost(str(tmp_path / "gt.txt"), str(tmp_path / "empty.txt")) == 10
+
+
+def test_progress():
+    f = io.StringIO()
+    with Progress(pages=4, cost=100, file=f, min_interval=3600) as progress:
+        levenshtein_matrix_cache_clear()
+        levenshtein("abc", "abcd")
+        instrumentation.count("graphemes", 3)
+        progress.page_done(25)
+        assert progress.dp_cells == 3 * 4
+        assert progress.graphemes == 3
+
+        progress.start_time -= 10
+        assert progress.eta() == pytest.approx(30, abs=1)
+        assert progress.status().startswith("1/4 pages, ")
+        assert "ETA 0:00:3" in progress.status()
+    assert not instrumentation.enabled()
+
+    # Throttled to the first update and the final line
+    lines = f.getvalue().split("\r")[1:]
+    assert len(lines) == 2
+    assert lines[-1].endswith("\n")
+
+
+def test_progress_eta_pages():
+    progress = Progress(pages=4, file=io.StringIO())
+    assert progress.eta() is None
+    progress.page_done()
+    progress.start_time -= 10
+    assert progress.eta() == pytest.approx(30, abs=1)
+
+
+def test_progress_disabled():
+    f = io.StringIO()
+    with Progress(pages=1, enabled=False, file=f) as progress:
+        assert not instrumentation.enabled()
+        progress.page_done()
+    assert f.getvalue() == ""
+
+
+_worker_progress = None
+
+
+def _init_worker(queue):
+    global _worker_progress
+    _worker_progress = WorkerProgress(queue)
+
+
+def _work(graphemes):
+    _worker_progress.count("graphemes", graphemes, {})
+    _worker_progress.page_done(cost=10)
+
+
+def test_progress_workers():
+    f = io.StringIO()
+    with Progress(pages=3, cost=30, file=f) as progress:
+        with Pool(2, _init_worker, (progress.worker_queue(),)) as pool:
+            pool.map(_work, [1, 2, 3])
+    assert progress.pages == 3
+    assert progress.cost == 30
+    assert progress.graphemes == 6
+    assert "3/3 pages" in f.getvalue()
@@ -7,7 +7,7 @@ from multimethod import multimethod
 import uniseg.wordbreak
 
 from .edit_distance import levenshtein
-from . import ExtractedText
+from .extracted_text import ExtractedText
 
 
 @multimethod
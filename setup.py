@@ -26,7 +26,11 @@ setup(
     entry_points={
         "console_scripts": [
             "dinglehopper=qurator.dinglehopper.cli:main",
+            "dinglehopper-bench=qurator.dinglehopper.cli_bench:main",
+            "dinglehopper-client=qurator.dinglehopper.client:main",
             "dinglehopper-extract=qurator.dinglehopper.cli_extract:main",
+            "dinglehopper-summarize=qurator.dinglehopper.cli_summarize:main",
+            "dinglehopper-server=qurator.dinglehopper.server:main",
             "ocrd-dinglehopper=qurator.dinglehopper.ocrd_cli:ocrd_dinglehopper",
         ]
     },